@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:40:12 2026
+
+@author: vrrodovalho
+
+This script benchmarks the startup time of the bioinformatics command line
+interface, comparing `python -m bioinformatics --help` with a bare
+interpreter, and reports the cumulative import time of the package as given
+by `python -X importtime`.
+
+Usage: python benchmarks/bench_cli_startup.py [repeats]
+
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+src_dir = os.path.join(os.path.dirname(bench_dir), 'src')
+
+
+def time_command(args, repeats):
+    '''
+    Runs a python command several times and returns the best wall time.
+
+    Parameters
+    ----------
+    args : LIST
+        The arguments given to the python interpreter.
+    repeats : INT
+        How many times the command is run.
+
+    Returns
+    -------
+    best : FLOAT
+        The best wall time, in seconds.
+
+    '''
+    env = dict(os.environ, PYTHONPATH=src_dir)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def import_times(module):
+    '''
+    Returns the cumulative import time of each module imported by a module,
+    in microseconds, as reported by `python -X importtime`.
+    '''
+    env = dict(os.environ, PYTHONPATH=src_dir)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                              'import ' + module],
+                             env=env, check=True, capture_output=True,
+                             text=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if not fields[1].strip().isdigit():
+            continue
+        times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+if __name__ == '__main__':
+
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    baseline = time_command(['-c', 'pass'], repeats)
+    cli = time_command(['-m', 'bioinformatics', '--help'], repeats)
+    print('{:<36} {:>10.1f} ms'.format('python -c pass', baseline * 1e3))
+    print('{:<36} {:>10.1f} ms'.format('python -m bioinformatics --help',
+                                       cli * 1e3))
+    print('{:<36} {:>10.1f} ms'.format('overhead', (cli - baseline) * 1e3))
+
+    times = import_times('bioinformatics.cli')
+    print('\ncumulative import time (ms)')
+    for module in ('bioinformatics', 'bioinformatics.cli', 'argparse'):
+        if module in times:
+            print('{:<36} {:>10.1f}'.format(module, times[module] / 1e3))
+    heavy = [name for name in ('numpy', 'pandas', 'matplotlib', 'seaborn')
+             if name in times]
+    if heavy:
+        print('\nheavy modules imported at startup: ' + ', '.join(heavy))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 03:21:05 2026
+
+@author: vrrodovalho
+
+This script benchmarks the organism and function counting of diamond_counts
+against the two passes of SAMSA2's DIAMOND_analysis_counter.py (-O and -F),
+each one loading the descriptions of the RefSeq database into a dictionary,
+on a synthetic RefSeq database and DIAMOND tabular files.
+
+Usage: python benchmarks/bench_diamond_counts.py [n_records] [n_hits] [n_files]
+
+"""
+
+import os
+import sys
+import time
+import tempfile
+from collections import Counter
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+src_dir = os.path.join(os.path.dirname(bench_dir), 'src')
+sys.path.insert(0, src_dir)
+sys.path.insert(0, bench_dir)
+
+from bioinformatics.diamond_counts import (aggregate_diamond_files,
+                                           subject_index)
+from synthetic import write_refseq, write_diamond_tab
+
+
+def legacy_counter(tab_file, reference, level):
+    '''
+    Counts one level of a DIAMOND tabular file as DIAMOND_analysis_counter.py
+    does: the descriptions of every reference sequence are read into a
+    dictionary, and the hits are counted line by line.
+    '''
+    descriptions = {}
+    with open(reference) as fasta:
+        for line in fasta:
+            if line.startswith('>'):
+                subject_id, _, description = line[1:].rstrip().partition(' ')
+                descriptions.setdefault(subject_id, description)
+    counts = Counter()
+    with open(tab_file) as tab:
+        for line in tab:
+            description = descriptions.get(line.split('\t')[1])
+            if description is None:
+                continue
+            start = description.rfind('[')
+            if level == 'organism':
+                counts[description[start + 1:description.rfind(']')]] += 1
+            else:
+                counts[description[:start].strip()] += 1
+    return counts
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+
+    n_records = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1000000
+    n_hits = int(float(sys.argv[2])) if len(sys.argv) > 2 else 1000000
+    n_files = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        reference = os.path.join(tmp_dir, 'RefSeq_bac.fa')
+        ids = write_refseq(reference, n_records)
+        files = [os.path.join(tmp_dir, 'sample{}.RefSeq_annotated'.format(i))
+                 for i in range(n_files)]
+        for i, path in enumerate(files):
+            write_diamond_tab(path, n_hits, ids, seed=i)
+        print('{} reference sequences, {} files of {} hits'.format(
+            n_records, n_files, n_hits))
+
+        elapsed, _ = timed(lambda: [legacy_counter(path, reference, level)
+                                    for path in files
+                                    for level in ('organism', 'function')])
+        print('DIAMOND_analysis_counter.py (-O and -F): {:.2f} s'.format(
+            elapsed))
+        elapsed, _ = timed(subject_index, reference, verbose=False)
+        print('subject index (built once): {:.2f} s'.format(elapsed))
+        for workers in sorted({1, n_files}):
+            elapsed, _ = timed(aggregate_diamond_files, files, reference,
+                               workers=workers, verbose=False)
+            print('diamond_counts, {} process(es): {:.2f} s'.format(
+                workers, elapsed))
+
+        counts = legacy_counter(files[0], reference, 'function')
+        with open(files[0] + '_function.tsv') as table:
+            tables = {line.rstrip('\n').split('\t')[2]:
+                      int(line.split('\t')[1]) for line in table}
+        assert tables == dict(counts)
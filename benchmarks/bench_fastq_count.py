@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:58:31 2026
+
+@author: vrrodovalho
+
+This script benchmarks the FASTQ read counter of fastq_stats against the
+line-by-line counting of SAMSA2's raw_read_counter.py, on synthetic plain
+and gzipped FASTQ files, and counts several files with 1 and n processes.
+
+Usage: python benchmarks/bench_fastq_count.py [size in GB] [n_files]
+
+"""
+
+import os
+import sys
+import gzip
+import time
+import tempfile
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+src_dir = os.path.join(os.path.dirname(bench_dir), 'src')
+sys.path.insert(0, src_dir)
+sys.path.insert(0, bench_dir)
+
+from bioinformatics.fastq_stats import (count_fastq_reads, fastq_stats,
+                                        count_fastq_files)
+from synthetic import write_fastq
+
+
+def legacy_counter(path):
+    '''
+    Counts the lines one at a time, as raw_read_counter.py does (after the
+    gunzip of samsa5.sh, so gzipped files are read with gzip.open).
+    '''
+    opener = gzip.open if path.endswith('.gz') else open
+    n_lines = 0
+    with opener(path, 'rt') as fastq:
+        for _ in fastq:
+            n_lines += 1
+    return n_lines // 4
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    n_files = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    size = int(size * 1e9)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plain = os.path.join(tmp_dir, 'reads.fastq')
+        gzipped = os.path.join(tmp_dir, 'reads.fastq.gz')
+        n_reads = write_fastq(plain, size)
+        write_fastq(gzipped, size, compresslevel=1)
+        gb = os.path.getsize(plain) / 1e9
+        print('{} reads, {:.2f} GB ({:.2f} GB gzipped)'.format(
+            n_reads, gb, os.path.getsize(gzipped) / 1e9))
+
+        print('{:<28} {:>10} {:>8}'.format('', 'time (s)', 'GB/s'))
+        for name, function, path in [
+                ('line by line, plain', legacy_counter, plain),
+                ('blocks, plain', count_fastq_reads, plain),
+                ('line by line, gzip', legacy_counter, gzipped),
+                ('blocks, gzip', count_fastq_reads, gzipped),
+                ('blocks + histograms, plain', fastq_stats, plain)]:
+            elapsed, result = timed(function, path)
+            reads = result['reads'] if isinstance(result, dict) else result
+            assert reads == n_reads, (name, reads, n_reads)
+            print('{:<28} {:>10.2f} {:>8.2f}'.format(name, elapsed,
+                                                      gb / elapsed))
+
+        files = [os.path.join(tmp_dir, 'sample{}.fastq.gz'.format(i))
+                 for i in range(n_files)]
+        for i, path in enumerate(files):
+            write_fastq(path, size // n_files, compresslevel=1, seed=i)
+        for workers in sorted({1, n_files}):
+            elapsed, _ = timed(count_fastq_files, files, workers=workers)
+            print('{} gzip files, {} process(es): {:.2f} s'.format(
+                n_files, workers, elapsed))
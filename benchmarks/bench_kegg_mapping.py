@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:20:53 2026
+
+@author: vrrodovalho
+
+This script benchmarks the parsing of KEGG conv tables by KeggMapping against
+the previous regex-per-line parser, on a synthetic hsa-sized table and on a
+multi-organism table.
+
+Usage: python benchmarks/bench_kegg_mapping.py [n_organisms]
+
+"""
+
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+src_dir = os.path.join(os.path.dirname(bench_dir), 'src')
+sys.path.insert(0, src_dir)
+sys.path.insert(0, bench_dir)
+
+from bioinformatics.conversion_kegg_uniprot import KeggMapping
+from synthetic import kegg_conv_lines
+
+
+def legacy_parser(format_map, format1='hsa'):
+    '''
+    The previous implementation, matching an uncompiled pattern on each line
+    and building both directions as lists, followed by the extend + set()
+    used to get the unique UniProt ids.
+    '''
+    pattern = '[\\S]+:([\\S]+)\\t{}:([\\S]+)'.format(format1)
+    conv1 = {}
+    conv2 = {}
+    for string in format_map:
+        match_obj = re.match(pattern, string)
+        (key, value) = (match_obj.group(1), match_obj.group(2))
+        if key in conv1:
+            conv1[key].append(value)
+        else:
+            conv1[key] = [value]
+        if value in conv2:
+            conv2[value].append(key)
+        else:
+            conv2[value] = [key]
+    all_uniprot_ids = []
+    for kegg_id in conv2:
+        all_uniprot_ids.extend(conv2[kegg_id])
+    return conv1, conv2, set(all_uniprot_ids)
+
+def new_parser(tables, keep_prefix):
+    mapping = KeggMapping.from_tables(tables, keep_prefix=keep_prefix)
+    return mapping, set(mapping.uniprot_ids())
+
+def measure(function, *args):
+    '''
+    Returns the best time of 5 runs and the memory retained by the result of
+    one run, in MB.
+    '''
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = function(*args)
+    retained = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del result
+    return best, retained
+
+
+if __name__ == '__main__':
+
+    n_organisms = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    organisms = ['o{:03d}'.format(i) for i in range(n_organisms)]
+    # response bodies, as returned by the KEGG REST API
+    benchmarks = [
+        ('hsa', ['hsa'], ['\n'.join(kegg_conv_lines('hsa', 20_000,
+                                                    mean_uniprot=2.0))]),
+        ('{} organisms'.format(n_organisms), organisms,
+         ['\n'.join(kegg_conv_lines(organism, 4_000, numeric=False))
+          for organism in organisms]),
+        ]
+
+    print('{:<16} {:>9} {:>12} {:>10} {:>12} {:>10}'.format(
+        'table', 'lines', 'legacy (s)', 'MB', 'mapping (s)', 'MB'))
+    for name, table_organisms, tables in benchmarks:
+        # the legacy parser handles one organism table per call
+        def legacy(tables):
+            return [legacy_parser(table.splitlines(), organism)
+                    for table, organism in zip(tables, table_organisms)]
+        keep_prefix = len(table_organisms) > 1
+        old_time, old_peak = measure(legacy, tables)
+        new_time, new_peak = measure(new_parser, tables, keep_prefix)
+        n_lines = sum(table.count('\n') + 1 for table in tables)
+        print('{:<16} {:>9} {:>12.3f} {:>10.1f} {:>12.3f} {:>10.1f}'.format(
+            name, n_lines, old_time, old_peak, new_time, new_peak))
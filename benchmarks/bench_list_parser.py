@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:20:05 2026
+
+@author: vrrodovalho
+
+This script benchmarks list_parser on synthetic id lists from 10k to 10M
+ids, comparing it with the previous list-based implementation where that
+one still finishes in reasonable time.
+
+Usage: python benchmarks/bench_list_parser.py [max_ids]
+
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+src_dir = os.path.join(os.path.dirname(bench_dir), 'src')
+sys.path.insert(0, src_dir)
+sys.path.insert(0, bench_dir)
+
+from bioinformatics.fasta_filters import list_parser
+from synthetic import write_id_list
+
+
+def legacy_list_parser(list_file, forbidden_lines=['',' ']):
+    '''
+    The previous implementation, with O(n) membership tests on a list.
+    '''
+    ids = []
+    duplicated_ids = []
+    with open(list_file, 'r') as input_file:
+        for line in input_file:
+            line = line.strip()
+            if line not in forbidden_lines:
+                if line not in ids:
+                    ids.append(line)
+                else:
+                    duplicated_ids.append(line)
+    return ids, duplicated_ids
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    max_ids = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    legacy_max_ids = 10_000
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000)
+             if n <= max_ids]
+
+    print('{:>12} {:>12} {:>12}'.format('ids', 'dict (s)', 'list (s)'))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_ids in sizes:
+            list_file = os.path.join(tmp_dir, 'ids_{}.txt'.format(n_ids))
+            write_id_list(list_file, n_ids, n_records=n_ids)
+            new = timed(list_parser, list_file, verbose=False)
+            if n_ids <= legacy_max_ids:
+                old = '{:12.3f}'.format(timed(legacy_list_parser, list_file))
+            else:
+                old = '{:>12}'.format('skipped')
+            print('{:>12} {:12.3f} {}'.format(n_ids, new, old))
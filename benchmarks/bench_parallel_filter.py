@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:02:48 2026
+
+@author: vrrodovalho
+
+This script benchmarks filter_fasta_parallel on a synthetic proteome with
+1, 2, 4, 8 and 16 workers.
+
+Usage: python benchmarks/bench_parallel_filter.py [n_records]
+
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+src_dir = os.path.join(os.path.dirname(bench_dir), 'src')
+sys.path.insert(0, src_dir)
+sys.path.insert(0, bench_dir)
+
+from bioinformatics.fasta_parallel import filter_fasta_parallel
+from synthetic import accession, write_proteome
+
+
+if __name__ == '__main__':
+
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    id_filters = [accession(i) for i in range(0, n_records, 2)]
+    filter_by = {'seq_size':True, 'seq_char':True,
+                 'id_list_in':True, 'id_list_out':False}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fasta_file = os.path.join(tmp_dir, 'proteome.fasta')
+        write_proteome(fasta_file, n_records)
+        print('{} records, {:.1f} MB'.format(
+            n_records, os.path.getsize(fasta_file) / 1e6))
+        print('{:>8} {:>10} {:>8}'.format('workers', 'time (s)', 'speedup'))
+        baseline = None
+        for workers in (1, 2, 4, 8, 16):
+            start = time.perf_counter()
+            filter_fasta_parallel(fasta_file, workers=workers,
+                                  id_filters=id_filters, filter_by=filter_by,
+                                  id_match='accession', explain=False)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print('{:>8} {:10.2f} {:8.2f}'.format(workers, elapsed,
+                                                  baseline / elapsed))
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:35:22 2026
+
+@author: vrrodovalho
+
+This script benchmarks the line wrapping of FastaWriter (wrap_sequence)
+against insert_newlines, on random sequences from a short protein to a
+bacterial chromosome.
+
+Usage: python benchmarks/bench_wrap.py [every]
+
+"""
+
+import os
+import sys
+import random
+import timeit
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+src_dir = os.path.join(os.path.dirname(bench_dir), 'src')
+sys.path.insert(0, src_dir)
+
+from bioinformatics.fasta_filters import insert_newlines, wrap_sequence
+
+
+LENGTHS = [60, 350, 2000, 20_000, 200_000, 5_000_000]
+
+
+def per_call(function, sequence, every):
+    '''
+    Returns the time of one call, in microseconds.
+    '''
+    number = max(1, 2_000_000 // len(sequence))
+    seconds = min(timeit.repeat(lambda: function(sequence, every),
+                                number=number, repeat=3))
+    return seconds / number * 1e6
+
+
+if __name__ == '__main__':
+
+    every = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    random.seed(0)
+    print('{:>10} {:>18} {:>16} {:>8}'.format(
+        'length', 'insert_newlines', 'wrap_sequence', 'speedup'))
+    for length in LENGTHS:
+        sequence = ''.join(random.choices('ACDEFGHIKLMNPQRSTVWY', k=length))
+        assert wrap_sequence(sequence, every) == insert_newlines(sequence,
+                                                                 every)
+        old = per_call(insert_newlines, sequence, every)
+        new = per_call(wrap_sequence, sequence, every)
+        print('{:>10} {:>15.2f} us {:>13.2f} us {:>7.1f}x'.format(
+            length, old, new, old / new))
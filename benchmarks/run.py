@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:05:27 2026
+
+@author: vrrodovalho
+
+This script runs the benchmark suite of the fasta_filters hot paths
+(fasta_parser, list_parser, filter_sequences and fasta_dict2file) on
+synthetic proteomes, measuring wall time and peak RSS of each one in a
+separate process, and appends the results to a JSON history.
+
+Usage examples:
+    python benchmarks/run.py --sizes 10k,100k,1M
+    python benchmarks/run.py --sizes 1M --duplicate-rate 0.05 --compare
+    python benchmarks/run.py --sizes 10M --data-dir /scratch/bench_data
+
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import contextlib
+import argparse
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+
+bench_dir = os.path.dirname(os.path.realpath(__file__))
+main_dir = os.path.dirname(bench_dir)
+src_dir = os.path.join(main_dir, 'src')
+sys.path.insert(0, src_dir)
+sys.path.insert(0, bench_dir)
+
+import synthetic
+
+
+BENCHMARKS = ['fasta_parser', 'list_parser', 'filter_sequences',
+              'fasta_dict2file']
+FILTER_BY = {'seq_size':True, 'seq_char':True,
+             'id_list_in':True, 'id_list_out':False}
+DEFAULT_HISTORY = os.path.join(bench_dir, 'results', 'history.json')
+
+
+def parse_size(size):
+    '''
+    Converts sizes such as '10k' or '1M' to integers.
+    '''
+    multipliers = {'k': 10**3, 'm': 10**6}
+    size = size.strip().lower()
+    if size[-1] in multipliers:
+        return int(float(size[:-1]) * multipliers[size[-1]])
+    return int(size)
+
+def _unique(parsed):
+    # parsers return (unique, duplicated) when there are duplicates
+    return parsed[0] if isinstance(parsed, tuple) else parsed
+
+def setup_benchmark(name, files):
+    '''
+    Prepares the inputs of a benchmark, outside of the measured section.
+    '''
+    from bioinformatics import fasta_filters
+    if name in ['filter_sequences', 'fasta_dict2file']:
+        sequences = _unique(fasta_filters.fasta_parser(files['fasta'],
+                                                       verbose=False))
+        ids = _unique(fasta_filters.list_parser(files['list'],
+                                                verbose=False))
+        return {'sequences': sequences, 'ids': ids}
+    return {}
+
+def run_benchmark(name, files, state):
+    '''
+    Runs the measured section of a benchmark.
+    '''
+    from bioinformatics import fasta_filters
+    if name == 'fasta_parser':
+        fasta_filters.fasta_parser(files['fasta'], verbose=False)
+    elif name == 'list_parser':
+        fasta_filters.list_parser(files['list'], verbose=False)
+    elif name == 'filter_sequences':
+        fasta_filters.filter_sequences(state['sequences'],
+                                       id_filters=state['ids'],
+                                       filter_by=FILTER_BY,
+                                       id_match='accession',
+                                       explain=False)
+    elif name == 'fasta_dict2file':
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fasta_filters.fasta_dict2file(state['sequences'], tmp_dir,
+                                          'output.fasta')
+
+def _measure(name, files, queue):
+    '''
+    Child process: sets up and runs one benchmark, reporting its wall time
+    and peak RSS.
+    '''
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            state = setup_benchmark(name, files)
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.perf_counter()
+            run_benchmark(name, files, state)
+            wall = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    queue.put({'wall_s': wall,
+               'peak_rss_bytes': rss_after * scale,
+               'peak_rss_increase_bytes': (rss_after - rss_before) * scale})
+
+def measure(name, files):
+    '''
+    Runs one benchmark in a fresh process, so peak RSS is not shared
+    between benchmarks.
+    '''
+    context = multiprocessing.get_context()
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(name, files, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def generate_data(data_dir, n_records, args):
+    '''
+    Generates (or reuses) the synthetic inputs for one size.
+    '''
+    tag = '{}_{}_{}_{}_{}'.format(n_records, args.length_dist,
+                                  args.mean_length, args.duplicate_rate,
+                                  args.seed)
+    n_ids = args.id_list_size or max(n_records // 4, 1)
+    files = {'fasta': os.path.join(data_dir, 'proteome_{}.fasta'.format(tag)),
+             'list': os.path.join(data_dir, 'ids_{}_{}.txt'.format(tag,
+                                                                  n_ids))}
+    if not os.path.exists(files['fasta']):
+        synthetic.write_proteome(files['fasta'], n_records,
+                                 distribution=args.length_dist,
+                                 mean_length=args.mean_length,
+                                 duplicate_rate=args.duplicate_rate,
+                                 seed=args.seed)
+    if not os.path.exists(files['list']):
+        synthetic.write_id_list(files['list'], n_ids, n_records,
+                                duplicate_rate=args.duplicate_rate,
+                                seed=args.seed)
+    return files, n_ids
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=main_dir, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(history_file):
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, 'r') as input_file:
+        return json.load(input_file)
+
+def save_history(history_file, history):
+    os.makedirs(os.path.dirname(history_file), exist_ok=True)
+    tmp_file = history_file + '.tmp'
+    with open(tmp_file, 'w') as out:
+        json.dump(history, out, indent=1)
+    os.replace(tmp_file, history_file)
+
+def previous_result(history, params, benchmark):
+    '''
+    Finds the last recorded result of a benchmark with the same parameters.
+    '''
+    for run in reversed(history):
+        if run['params'] == params:
+            for result in run['results']:
+                if result['benchmark'] == benchmark:
+                    return result
+    return None
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='fasta_filters benchmarks')
+    parser.add_argument('--sizes', default='10k,100k',
+                        help='comma-separated numbers of records '
+                             '(e.g. 10k,100k,1M,10M)')
+    parser.add_argument('--benchmarks', default=','.join(BENCHMARKS),
+                        help='comma-separated benchmarks to run')
+    parser.add_argument('--length-dist', default='lognormal',
+                        choices=synthetic.LENGTH_DISTRIBUTIONS)
+    parser.add_argument('--mean-length', type=int, default=350)
+    parser.add_argument('--duplicate-rate', type=float, default=0.01)
+    parser.add_argument('--id-list-size', type=parse_size, default=None,
+                        help='number of ids in the list '
+                             '(default: a quarter of the records)')
+    parser.add_argument('--seed', type=int, default=22)
+    parser.add_argument('--data-dir', default=None,
+                        help='where synthetic inputs are kept and reused '
+                             '(default: a temporary directory)')
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--compare', action='store_true',
+                        help='compare with the last run with the same '
+                             'parameters')
+    args = parser.parse_args()
+
+    benchmarks = args.benchmarks.split(',')
+    for name in benchmarks:
+        if name not in BENCHMARKS:
+            parser.error('unknown benchmark {}'.format(name))
+
+    history = load_history(args.history)
+    tmp_dir = None
+    data_dir = args.data_dir
+    if data_dir is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = tmp_dir.name
+    os.makedirs(data_dir, exist_ok=True)
+
+    print('{:>10} {:>18} {:>10} {:>12} {:>10}'.format(
+        'records', 'benchmark', 'wall (s)', 'peak RSS MB', 'vs last'))
+    for n_records in map(parse_size, args.sizes.split(',')):
+        files, n_ids = generate_data(data_dir, n_records, args)
+        params = {'n_records': n_records, 'n_ids': n_ids,
+                  'length_dist': args.length_dist,
+                  'mean_length': args.mean_length,
+                  'duplicate_rate': args.duplicate_rate, 'seed': args.seed}
+        run = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'commit': git_commit(),
+               'python': platform.python_version(),
+               'machine': platform.node(),
+               'params': params,
+               'results': []}
+        for name in benchmarks:
+            result = dict(benchmark=name, **measure(name, files))
+            last = previous_result(history, params, name)
+            change = ''
+            if args.compare and last:
+                change = '{:+.1f} %'.format(
+                    100.0 * (result['wall_s'] / last['wall_s'] - 1))
+            print('{:>10} {:>18} {:10.3f} {:12.1f} {:>10}'.format(
+                n_records, name, result['wall_s'],
+                result['peak_rss_bytes'] / 1e6, change))
+            run['results'].append(result)
+        history.append(run)
+        save_history(args.history, history)
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    print('\nResults appended to {}'.format(args.history))
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+
+@author: vrrodovalho
+
+This script contains functions to generate synthetic proteomes, id lists,
+KEGG conversion tables, FASTQ files, RefSeq databases and DIAMOND tabular
+files for the benchmarks.
+
+"""
+
+import random
+
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+RARE_RESIDUES = 'BJOUXZ'
+LENGTH_DISTRIBUTIONS = ['lognormal', 'uniform', 'fixed']
+
+
+def accession(i):
+    '''
+    Returns a UniProt-like accession for a record number.
+    '''
+    return 'Q{:09d}'.format(i)
+
+def sequence_length(rng, distribution='lognormal', mean_length=350):
+    '''
+    Draws a sequence length from one of the LENGTH_DISTRIBUTIONS.
+    '''
+    if distribution == 'lognormal':
+        # median close to mean_length / 1.2, long right tail as in proteomes
+        return max(1, int(rng.lognormvariate(0, 0.6) * mean_length / 1.2))
+    elif distribution == 'uniform':
+        return rng.randint(1, 2 * mean_length)
+    elif distribution == 'fixed':
+        return mean_length
+    raise ValueError("Unknown length distribution '{}'. Choose one of: {}"
+                     .format(distribution, LENGTH_DISTRIBUTIONS))
+
+def write_proteome(path, n_records, distribution='lognormal', mean_length=350,
+                   duplicate_rate=0.0, rare_rate=0.01, width=60, seed=22):
+    '''
+    Writes a synthetic proteome in UniProt fasta format.
+
+    Parameters
+    ----------
+    path : PATH
+        Path of the fasta file.
+    n_records : INT
+        Number of records.
+    distribution : STR, optional
+        Distribution of the sequence lengths, one of LENGTH_DISTRIBUTIONS.
+        The default is 'lognormal'.
+    mean_length : INT, optional
+        Mean sequence length. The default is 350.
+    duplicate_rate : FLOAT, optional
+        Fraction of records reusing the id of a previous record.
+        The default is 0.0.
+    rare_rate : FLOAT, optional
+        Fraction of records containing one of the RARE_RESIDUES.
+        The default is 0.01.
+    width : INT, optional
+        Number of residues per line. The default is 60.
+    seed : INT, optional
+        Random seed. The default is 22.
+
+    Returns
+    -------
+    None.
+
+    '''
+    rng = random.Random(seed)
+    # a pool of residues sampled once, sliced at random offsets
+    pool = ''.join(rng.choices(AMINO_ACIDS, k=1 << 20))
+    pool += pool[:20 * mean_length]
+    with open(path, 'w', buffering=1 << 20) as out:
+        for i in range(n_records):
+            number = i
+            if i and rng.random() < duplicate_rate:
+                number = rng.randrange(i)
+            length = min(sequence_length(rng, distribution, mean_length),
+                         20 * mean_length)
+            start = rng.randrange(1 << 20)
+            sequence = pool[start:start + length]
+            if rng.random() < rare_rate:
+                position = rng.randrange(length)
+                sequence = (sequence[:position] + rng.choice(RARE_RESIDUES) +
+                            sequence[position + 1:])
+            out.write('>sp|{}|P{}_SYNTH Synthetic protein {} OS=Homo sapiens '
+                      'OX=9606\n'.format(accession(number), number, number))
+            for j in range(0, length, width):
+                out.write(sequence[j:j + width])
+                out.write('\n')
+    return None
+
+def write_id_list(path, n_ids, n_records, hit_rate=0.9, duplicate_rate=0.01,
+                  seed=22):
+    '''
+    Writes a synthetic list of accessions.
+
+    Parameters
+    ----------
+    path : PATH
+        Path of the list file.
+    n_ids : INT
+        Number of lines.
+    n_records : INT
+        Number of records of the matching proteome (see write_proteome).
+    hit_rate : FLOAT, optional
+        Fraction of ids present in the proteome. The default is 0.9.
+    duplicate_rate : FLOAT, optional
+        Fraction of lines repeating a previous id. The default is 0.01.
+    seed : INT, optional
+        Random seed. The default is 22.
+
+    Returns
+    -------
+    None.
+
+    '''
+    rng = random.Random(seed)
+    written = []
+    with open(path, 'w', buffering=1 << 20) as out:
+        for i in range(n_ids):
+            if written and rng.random() < duplicate_rate:
+                id_ = rng.choice(written)
+            elif rng.random() < hit_rate:
+                id_ = accession(rng.randrange(max(n_records, 1)))
+            else:
+                id_ = accession(n_records + i)
+            if len(written) < 100000:
+                written.append(id_)
+            out.write(id_ + '\n')
+    return None
+
+def kegg_conv_lines(organism, n_genes, mean_uniprot=1.5, shared_rate=0.05,
+                    numeric=True, seed=0):
+    '''
+    Returns the lines of a synthetic KEGG conv/<organism>/uniprot table, with
+    a variable number of UniProt ids per gene and a fraction of UniProt ids
+    shared by two genes.
+    '''
+    rng = random.Random('{}{}'.format(organism, seed))
+    lines = []
+    next_accession = rng.randrange(10 ** 8)
+    for gene in range(1, n_genes + 1):
+        gene_id = str(gene) if numeric else '{}_{:05d}'.format(organism, gene)
+        n_uniprot = max(1, int(rng.expovariate(1 / mean_uniprot) + 0.5))
+        for _ in range(n_uniprot):
+            if lines and rng.random() < shared_rate:
+                uniprot = rng.choice(lines).partition('\t')[0]
+            else:
+                next_accession += 1
+                uniprot = 'up:' + accession(next_accession)
+            lines.append('{}\t{}:{}'.format(uniprot, organism, gene_id))
+    return lines
+
+def write_fastq(path, size, read_length=150, compresslevel=None, seed=0):
+    '''
+    Writes a synthetic FASTQ file of about size bytes (uncompressed), made of
+    a block of 10k random reads repeated, gzipped if compresslevel is given.
+    '''
+    import zlib
+
+    rng = random.Random(seed)
+    records = []
+    for i in range(10000):
+        length = rng.randint(read_length // 2, read_length)
+        records.append('@read{}\n{}\n+\n{}\n'.format(
+            i, ''.join(rng.choice('ACGT') for _ in range(length)),
+            ''.join(chr(rng.randint(35, 73)) for _ in range(length))))
+    block = ''.join(records).encode('ascii')
+    compressor = None
+    if compresslevel is not None:
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED,
+                                      zlib.MAX_WBITS | 16)
+    n_reads = 0
+    with open(path, 'wb') as out:
+        for _ in range(max(1, size // len(block))):
+            out.write(compressor.compress(block) if compressor else block)
+            n_reads += len(records)
+        if compressor:
+            out.write(compressor.flush())
+    return n_reads
+
+def write_refseq(path, n_records, n_organisms=5000, n_functions=20000,
+                 seed=0):
+    '''
+    Writes a synthetic RefSeq protein fasta file, with headers such as
+    '>WP_000000001.1 function 12 [Organism 3]', and returns its ids.
+    '''
+    rng = random.Random(seed)
+    ids = []
+    with open(path, 'w') as out:
+        for i in range(n_records):
+            ids.append('WP_{:09d}.1'.format(i))
+            out.write('>{} function {} [Organism {}]\n{}\n'.format(
+                ids[-1], rng.randrange(n_functions),
+                rng.randrange(n_organisms),
+                ''.join(rng.choice(AMINO_ACIDS) for _ in range(60))))
+    return ids
+
+def write_diamond_tab(path, n_hits, subject_ids, seed=0):
+    '''
+    Writes a synthetic DIAMOND tabular file (12 columns) with n_hits hits of
+    subjects chosen at random from subject_ids.
+    '''
+    rng = random.Random(seed)
+    with open(path, 'w') as out:
+        for i in range(n_hits):
+            out.write('read{}\t{}\t{:.1f}\t50\t2\t0\t1\t150\t1\t50\t'
+                      '{:.1e}\t{:.1f}\n'.format(
+                          i, rng.choice(subject_ids),
+                          rng.uniform(40, 100), rng.uniform(1e-30, 1e-5),
+                          rng.uniform(30, 200)))
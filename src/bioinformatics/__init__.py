@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:02:16 2026
+
+@author: vrrodovalho
+
+Bioinformatics scripts to parse, filter and export fasta files, convert
+KEGG, UniProt and locus tag ids, and plot PubMed query timelines.
+
+The modules are imported on demand (e.g. bioinformatics.fasta_filters), so
+importing the package itself does not load pandas, numpy or matplotlib.
+
+"""
+
+__version__ = '0.1.0'
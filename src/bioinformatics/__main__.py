@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Entry point for python -m bioinformatics.
+"""
+
+import sys
+
+from .cli import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:31:52 2026
+
+@author: vrrodovalho
+
+This script contains a checkpoint store for the tasks of a pipeline, in a
+SQLite database. Each task (one stage of one sample) is recorded with a
+signature: a hash of its commands, parameters, tools and input contents. A
+task is up to date only if its signature has not changed and its outputs are
+still the ones it wrote, so only the stale tasks of a pipeline are run
+again, sample by sample.
+
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import sqlite3
+import threading
+
+
+BLOCK_SIZE = 1 << 20
+
+
+class CheckpointStore():
+    '''
+    The checkpoints of the tasks of a pipeline, in a SQLite database.
+
+    Parameters
+    ----------
+    path : STR
+        The SQLite file, created if it does not exist.
+
+    The contents of the files are hashed once: their digests are cached
+    with their size and modification time, and hashed again only if these
+    change. The store can be used by the threads of a running pipeline.
+
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS checkpoints ('
+                         'task TEXT PRIMARY KEY, stage TEXT NOT NULL, '
+                         'sample TEXT NOT NULL, signature TEXT NOT NULL, '
+                         'outputs TEXT NOT NULL, finished REAL NOT NULL)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS file_digests ('
+                         'path TEXT PRIMARY KEY, size INTEGER NOT NULL, '
+                         'mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL)')
+        self._db.commit()
+
+    def file_digest(self, path):
+        '''
+        Returns the SHA-256 digest of the contents of a file, from the cache
+        if the file has the same size and modification time.
+        '''
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._db.execute('SELECT size, mtime_ns, digest FROM '
+                                   'file_digests WHERE path = ?',
+                                   (path,)).fetchone()
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+                digest.update(block)
+        digest = digest.hexdigest()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO file_digests VALUES '
+                             '(?, ?, ?, ?)', (path, stat.st_size,
+                                              stat.st_mtime_ns, digest))
+            self._db.commit()
+        return digest
+
+    def digest(self, path):
+        '''
+        Returns the digest of a file, or of a directory: the SHA-256 of the
+        names and digests of all of its files.
+        '''
+        if not os.path.isdir(path):
+            return self.file_digest(path)
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                digest.update(os.path.relpath(file_path, path).encode(
+                    'utf-8', 'surrogateescape'))
+                digest.update(self.file_digest(file_path).encode('ascii'))
+        return digest.hexdigest()
+
+    def tool_digest(self, tool):
+        '''
+        Returns the digest of a tool (an executable, found in the PATH, or
+        a script or jar file), which changes with its version. Tools that
+        are not found are identified by their name.
+        '''
+        path = tool if os.path.isfile(tool) else shutil.which(tool)
+        if path is None:
+            return 'missing:' + tool
+        return self.file_digest(os.path.realpath(path))
+
+    def signature(self, task):
+        '''
+        Returns the signature of a task: the SHA-256 of its commands (with
+        the number of threads left out), Python step, parameters, tools,
+        input contents and the sizes and modification times of its
+        references. Since the inputs are hashed by content, a task that
+        depends on a task that was run again is only stale if its inputs
+        really changed.
+        '''
+        from .pipeline import describe_function
+
+        references = []
+        for path in task.references:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                references.append([os.path.abspath(path), stat.st_size,
+                                   stat.st_mtime_ns])
+            else:
+                references.append([os.path.abspath(path)])
+        content = {'commands': task.commands,
+                   'function': (describe_function(task.function)
+                                if task.function is not None else None),
+                   'params': task.params,
+                   'tools': [self.tool_digest(tool) for tool in task.tools],
+                   'inputs': [self.digest(path) for path in task.inputs],
+                   'references': references,
+                   'outputs': task.outputs}
+        encoded = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _output_stats(self, task):
+        stats = []
+        for path in task.outputs:
+            stat = os.stat(path)
+            stats.append([path, stat.st_size, stat.st_mtime_ns])
+        return stats
+
+    def is_current(self, task, signature):
+        '''
+        Tells whether a task is up to date: it has a checkpoint with the same
+        signature and its outputs have not changed since it was recorded.
+        '''
+        with self._lock:
+            row = self._db.execute('SELECT signature, outputs FROM '
+                                   'checkpoints WHERE task = ?',
+                                   (task.name,)).fetchone()
+        if row is None or row[0] != signature:
+            return False
+        try:
+            return self._output_stats(task) == json.loads(row[1])
+        except OSError:
+            return False
+
+    def invalidate(self, task_name):
+        '''
+        Removes the checkpoint of a task, before it is run again.
+        '''
+        with self._lock:
+            self._db.execute('DELETE FROM checkpoints WHERE task = ?',
+                             (task_name,))
+            self._db.commit()
+
+    def record(self, task, signature):
+        '''
+        Records the checkpoint of a task that has just run. Raises
+        FileNotFoundError if one of its outputs was not written.
+        '''
+        for path in task.outputs:
+            if not os.path.exists(path):
+                raise FileNotFoundError('Task {} did not write {}'
+                                        .format(task.name, path))
+        stage, _, sample = task.name.partition(':')
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO checkpoints VALUES '
+                             '(?, ?, ?, ?, ?, ?)',
+                             (task.name, stage, sample, signature,
+                              json.dumps(self._output_stats(task)),
+                              time.time()))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:10:48 2026
+
+@author: vrrodovalho
+
+This script contains the bioinformatics command line interface. Each
+subcommand imports the modules it needs only when it runs, so that the
+startup of the CLI does not pay for pandas, numpy or matplotlib.
+
+"""
+
+import argparse
+
+
+def _filter_fasta(args):
+    import pathlib
+    from .fasta_filters import (fasta_parser, list_parser, filter_sequences,
+                                fasta_dict2file)
+    
+    id_filters = []
+    if args.ids:
+        id_filters = list_parser(args.ids)
+        if isinstance(id_filters, tuple):
+            id_filters = id_filters[0]
+    filter_by = {'seq_size': args.min_len is not None,
+                 'seq_char': bool(args.forbidden),
+                 'id_list_in': bool(args.ids) and not args.exclude,
+                 'id_list_out': bool(args.ids) and args.exclude}
+    criteria = {'min_seq_len': args.min_len or 0,
+                'forbidden': list(args.forbidden or ''),
+                'id_filters': id_filters,
+                'filter_by': filter_by,
+                'id_match': args.id_match,
+                'char_mode': args.char_mode}
+    counts = {}
+    if args.workers > 1:
+        from .fasta_parallel import filter_fasta_parallel
+        filtered = filter_fasta_parallel(args.fasta, workers=args.workers,
+                                         counts=counts, **criteria)
+    else:
+        sequences = fasta_parser(args.fasta)
+        if isinstance(sequences, tuple):
+            sequences = sequences[0]
+        filtered = filter_sequences(sequences, batch=args.batch, 
+                                    counts=counts, **criteria)
+    # filtered sequences come with the ones filtered out, if any
+    if any(counts.values()):
+        filtered = filtered['in']
+    output = pathlib.Path(args.output)
+    fasta_dict2file(filtered, output_dir=output.parent,
+                    output_file=output.name, compression=args.compression)
+    return 0
+
+def _extract_fasta(args):
+    import pathlib
+    from .fasta_filters import fasta_extract, list_parser, fasta_dict2file
+    from .id_matchers import uniprot_accession
+    
+    ids = list_parser(args.ids)
+    if isinstance(ids, tuple):
+        ids = ids[0]
+    key = uniprot_accession if args.accession else None
+    sequences = fasta_extract(args.fasta, ids, key=key)
+    output = pathlib.Path(args.output)
+    fasta_dict2file(sequences, output_dir=output.parent,
+                    output_file=output.name, compression=args.compression)
+    return 0
+
+def _locustag_mapping(args):
+    '''
+    Returns the locus tag mapping of the locustag-* subcommands, from NCBI
+    protein tables or from GFF3 files.
+    '''
+    import pathlib
+    from .conversion_locustag import (construct_mapping_df, load_gff_mapping, 
+                                      load_mapping)
+    
+    if args.gff:
+        return load_gff_mapping(args.gff, cache_dir=args.cache_dir,
+                                rebuild=args.rebuild_cache)
+    columns = [args.from_id, args.to_id]
+    if args.no_cache:
+        return construct_mapping_df(input_dir=pathlib.Path(args.tables),
+                                    columns=columns)
+    return load_mapping(input_dir=pathlib.Path(args.tables), columns=columns,
+                        cache_dir=args.cache_dir, rebuild=args.rebuild_cache)
+
+def _add_mapping_arguments(sub):
+    '''
+    Adds the arguments of the locus tag mapping to a locustag-* subcommand.
+    '''
+    source = sub.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tables',
+                        help='directory with NCBI proteins_*.csv tables')
+    source.add_argument('--gff', nargs='+',
+                        help='GFF3 files (locus_tag and protein_id of the '
+                             'CDS features)')
+    sub.add_argument('--from-id', default='Locus tag',
+                     help='key column of the tables')
+    sub.add_argument('--to-id', default='Protein product',
+                     help='value column of the tables')
+    sub.add_argument('--cache-dir', default=None,
+                     help='mapping cache directory (default: a '
+                          '.mapping_cache directory next to the inputs)')
+    sub.add_argument('--rebuild-cache', action='store_true',
+                     help='rebuild the mapping cache')
+    sub.add_argument('--no-cache', action='store_true',
+                     help='read the tables without using the mapping cache')
+
+def _locustag_convert(args):
+    import pandas as pd
+    from .conversion_locustag import convert
+    
+    mapping = _locustag_mapping(args)
+    df_count = pd.read_csv(args.count_file, sep='\t', header=None)
+    df_converted = convert(df_2map=df_count, df_maping=mapping,
+                           from_id=args.from_id, to_id=args.to_id)
+    df_converted.to_csv(args.output, sep='\t', index=False, header=False)
+    return 0
+
+def _locustag_matrix(args):
+    from .conversion_locustag import convert_many, write_count_matrix
+    
+    mapping = _locustag_mapping(args)
+    matrix, unmapped = convert_many(args.count_files, mapping, 
+                                    from_id=args.from_id, to_id=args.to_id,
+                                    workers=args.workers)
+    write_count_matrix(matrix, args.output)
+    if args.unmapped:
+        with open(args.unmapped, 'w') as out:
+            out.write('sample\tid\tcount\n')
+            for sample, counts in unmapped.items():
+                for tag, count in counts.items():
+                    out.write('{}\t{}\t{}\n'.format(sample, tag, count))
+    return 0
+
+def _kegg_uniprot(args):
+    from .kegg_async import retrieve_kegg_mapping
+    from .kegg_rest import KeggRestClient
+    
+    client = KeggRestClient(base_url=args.base_url, cache_path=args.cache,
+                            ttl=args.ttl * 3600, 
+                            offline=True if args.offline else None,
+                            timeout=args.timeout)
+    with client:
+        mapping = retrieve_kegg_mapping(args.organism, 'uniprot', 
+                                        cache=client, 
+                                        concurrency=args.concurrency,
+                                        rate=args.rate or None)
+    with open(args.output, 'w') as out:
+        for item in sorted(mapping.uniprot_ids()):
+            out.write("%s\n" % item)
+    return 0
+
+def _plot_queries(args):
+    import pathlib
+    from .plot_queries import plot_queries
+    
+    output = pathlib.Path(args.output)
+    plot_queries(query_dir=args.query_dir, output_dir=output.parent,
+                 file_name=output.name, id_col='Year',
+                 legend_pos=args.legend_pos, drop_values=args.drop,
+                 cache=not args.no_cache, show=False, 
+                 file_format=args.format, dpi=args.dpi, 
+                 max_points=args.max_points)
+    return 0
+
+def _plot_queries_batch(args):
+    from .plot_queries import plot_queries_batch
+    
+    plot_queries_batch(args.manifest, workers=args.workers)
+    return 0
+
+def _fastq_count(args):
+    import json
+    from .fastq_stats import count_fastq_files, write_read_counts
+    
+    results = count_fastq_files(args.fastq, workers=args.workers,
+                                stats=args.stats is not None)
+    write_read_counts(results, args.output)
+    if args.stats is not None:
+        with open(args.stats, 'w') as output:
+            json.dump(results, output, indent=1)
+    return 0
+
+def _diamond_index(args):
+    from .diamond_counts import subject_index
+    
+    subject_index(args.reference, index_dir=args.index_dir,
+                  rebuild=args.rebuild)
+    return 0
+
+def _diamond_aggregate(args):
+    from .diamond_counts import aggregate_diamond_files
+    
+    aggregate_diamond_files(args.tab_files, args.reference,
+                            index_dir=args.index_dir, org_dir=args.org_dir,
+                            func_dir=args.func_dir, workers=args.workers)
+    return 0
+
+def _samsa(args):
+    from .samsa import samsa_config, run_samsa
+    
+    config = samsa_config(args.config, samsa=args.samsa, 
+                          input_dir=args.input_dir, out_dir=args.out_dir,
+                          tiny=True if args.tiny else None)
+    checkpoints = False if args.no_checkpoints else args.checkpoints or True
+    statuses = run_samsa(config, cores=args.cores, dry_run=args.dry_run,
+                         keep_going=not args.stop_on_error,
+                         log_dir=args.log_dir, checkpoints=checkpoints,
+                         force=args.force)
+    return 1 if 'failed' in statuses.values() else 0
+
+def build_parser():
+    '''
+    Builds the argument parser of the bioinformatics command.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='bioinformatics',
+        description='Bioinformatics scripts: fasta filtering, id '
+                    'conversion, PubMed query plots and the SAMSA2 '
+                    'pipeline.')
+    parser.add_argument('--metrics', default=None,
+                        help='write the time, records, bytes and memory '
+                             '(the peak RSS of the process, unless '
+                             '--trace-memory) of each stage to this file, as '
+                             'JSON or, for .prom files, in the Prometheus '
+                             'text format')
+    parser.add_argument('--profile', action='store_true',
+                        help='also write a cProfile profile to '
+                             '<metrics>.prof')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='trace the memory of each stage with '
+                             'tracemalloc (slower), and add the top '
+                             'allocations to the metrics')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    sub = subparsers.add_parser('filter-fasta', 
+                                help='filter a fasta file by size, '
+                                     'residues and ids')
+    sub.add_argument('fasta', help='input fasta file (may be compressed)')
+    sub.add_argument('-o', '--output', required=True, 
+                     help='output fasta file')
+    sub.add_argument('--ids', help='file with a list of ids to keep')
+    sub.add_argument('--exclude', action='store_true',
+                     help='remove the ids in the list instead of keeping '
+                          'only them')
+    sub.add_argument('--id-match', default='substring',
+                     choices=['accession', 'token', 'substring', 'naive'])
+    sub.add_argument('--min-len', type=int, default=None,
+                     help='minimum sequence length')
+    sub.add_argument('--forbidden', default=None,
+                     help='forbidden residues, e.g. BJOUXZ')
+    sub.add_argument('--char-mode', default='all', choices=['any', 'all'],
+                     help="remove the sequences with 'all' the forbidden "
+                          "characters (default) or with 'any' of them")
+    sub.add_argument('--batch', action='store_true',
+                     help='evaluate the filters with NumPy')
+    sub.add_argument('--workers', type=int, default=1,
+                     help='number of worker processes')
+    sub.add_argument('--compression', default=None,
+                     choices=['gzip', 'bgzf'])
+    sub.set_defaults(func=_filter_fasta)
+
+    sub = subparsers.add_parser('extract-fasta',
+                                help='extract sequences by id using an '
+                                     'offset index')
+    sub.add_argument('fasta', help='input fasta file (plain or BGZF)')
+    sub.add_argument('ids', help='file with a list of ids')
+    sub.add_argument('-o', '--output', required=True,
+                     help='output fasta file')
+    sub.add_argument('--accession', action='store_true',
+                     help='match the ids against UniProt accessions')
+    sub.add_argument('--compression', default=None,
+                     choices=['gzip', 'bgzf'])
+    sub.set_defaults(func=_extract_fasta)
+
+    sub = subparsers.add_parser('locustag-convert',
+                                help='map the locus tags of a count file to '
+                                     'protein ids')
+    sub.add_argument('count_file', help='tab-separated count file')
+    sub.add_argument('-o', '--output', required=True,
+                     help='output tab-separated file')
+    _add_mapping_arguments(sub)
+    sub.set_defaults(func=_locustag_convert)
+
+    sub = subparsers.add_parser('locustag-matrix',
+                                help='map the locus tags of many count files '
+                                     'to protein ids and merge them in a '
+                                     'sample x gene matrix')
+    sub.add_argument('count_files', nargs='+', 
+                     help='tab-separated count files')
+    sub.add_argument('-o', '--output', required=True,
+                     help='output matrix (.tsv, or .parquet for Parquet)')
+    sub.add_argument('--unmapped', default=None,
+                     help='output tab-separated file with the unmapped ids '
+                          'of each sample')
+    sub.add_argument('--workers', type=int, default=None,
+                     help='number of files converted at the same time')
+    _add_mapping_arguments(sub)
+    sub.set_defaults(func=_locustag_matrix)
+
+    sub = subparsers.add_parser('kegg-uniprot',
+                                help='list the UniProt ids of a KEGG '
+                                     'organism')
+    sub.add_argument('--organism', nargs='+', default=['hsa'],
+                     help='KEGG organism code(s) (default: hsa)')
+    sub.add_argument('-o', '--output', required=True,
+                     help='output list file')
+    sub.add_argument('--cache', default=None,
+                     help='KEGG cache file (default: $KEGG_CACHE or '
+                          '~/.cache/bioinformatics/kegg.sqlite)')
+    sub.add_argument('--ttl', type=float, default=24 * 7,
+                     help='hours before a cached table is revalidated '
+                          '(default: 168)')
+    sub.add_argument('--offline', action='store_true',
+                     help='only use the cache (also set by $KEGG_OFFLINE)')
+    sub.add_argument('--timeout', type=float, default=60,
+                     help='request timeout in seconds (default: 60)')
+    sub.add_argument('--base-url', default='https://rest.kegg.jp',
+                     help='KEGG REST address (default: %(default)s)')
+    sub.add_argument('--concurrency', type=int, default=3,
+                     help='most requests in flight (default: 3)')
+    sub.add_argument('--rate', type=float, default=3.0,
+                     help='most requests per second, 0 for no limit '
+                          '(default: 3)')
+    sub.set_defaults(func=_kegg_uniprot)
+
+    sub = subparsers.add_parser('plot-queries',
+                                help='plot PubMed query timelines')
+    sub.add_argument('query_dir', help='directory with PubMed csv files')
+    sub.add_argument('-o', '--output', required=True,
+                     help='output image file')
+    sub.add_argument('--legend-pos', default='below',
+                     choices=['below', 'right'])
+    sub.add_argument('--drop', nargs='*', type=int, default=[],
+                     help='years to be removed from the plot')
+    sub.add_argument('--no-cache', action='store_true',
+                     help='parse every csv file again instead of using '
+                          'the cache in the query directory')
+    sub.add_argument('--format', default=None,
+                     help='image format, e.g. png, tiff, svg or pdf '
+                          '(default: from the output extension)')
+    sub.add_argument('--dpi', type=int, default=100,
+                     help='resolution of raster images (default: 100)')
+    sub.add_argument('--max-points', type=int, default=None,
+                     help='downsample longer series to this many points')
+    sub.set_defaults(func=_plot_queries)
+
+    sub = subparsers.add_parser('plot-queries-batch',
+                                help='render many PubMed query plots from a '
+                                     'JSON manifest, in parallel')
+    sub.add_argument('manifest', 
+                     help='JSON list of {"query_dir", "output", ...} '
+                          'objects')
+    sub.add_argument('--workers', type=int, default=None,
+                     help='number of processes (default: number of CPUs)')
+    sub.set_defaults(func=_plot_queries_batch)
+
+    sub = subparsers.add_parser('fastq-count',
+                                help='count the reads of FASTQ files (plain '
+                                     'or compressed) on a process pool')
+    sub.add_argument('fastq', nargs='+', help='FASTQ files')
+    sub.add_argument('-o', '--output', required=True,
+                     help='output tab-separated table of file and reads '
+                          '(the raw_counts.txt of SAMSA2)')
+    sub.add_argument('--stats', default=None,
+                     help='also write the bases and the read length and '
+                          'quality histograms of each file to this JSON '
+                          'file')
+    sub.add_argument('--workers', type=int, default=None,
+                     help='number of processes (default: number of CPUs)')
+    sub.set_defaults(func=_fastq_count)
+
+    sub = subparsers.add_parser('diamond-index',
+                                help='index the organism and function of '
+                                     'each subject id of a RefSeq fasta '
+                                     'file')
+    sub.add_argument('reference', help='reference fasta file, such as '
+                                       'RefSeq_bac.fa (may be compressed)')
+    sub.add_argument('--index-dir', default=None,
+                     help='index directory (default: <reference>.subjects)')
+    sub.add_argument('--rebuild', action='store_true',
+                     help='build the index even if it is up to date')
+    sub.set_defaults(func=_diamond_index)
+
+    sub = subparsers.add_parser('diamond-aggregate',
+                                help='count the organisms and functions of '
+                                     'DIAMOND tabular files in one pass '
+                                     'each, on a process pool')
+    sub.add_argument('tab_files', nargs='+',
+                     help='DIAMOND tabular files (may be compressed)')
+    sub.add_argument('--reference', required=True,
+                     help='reference fasta file of the DIAMOND database')
+    sub.add_argument('--index-dir', default=None,
+                     help='index directory (default: <reference>.subjects)')
+    sub.add_argument('--org-dir', default=None,
+                     help='directory of the *_organism.tsv tables (default: '
+                          'next to each file)')
+    sub.add_argument('--func-dir', default=None,
+                     help='directory of the *_function.tsv tables (default: '
+                          'next to each file)')
+    sub.add_argument('--workers', type=int, default=None,
+                     help='number of processes (default: number of CPUs)')
+    sub.set_defaults(func=_diamond_aggregate)
+
+    sub = subparsers.add_parser('samsa',
+                                help='run the SAMSA2 pipeline of samsa5.sh, '
+                                     'with samples and annotation branches '
+                                     'in parallel')
+    sub.add_argument('--config', default=None,
+                     help='JSON file with tool paths, databases and '
+                          'threads per tool')
+    sub.add_argument('--samsa', default=None,
+                     help='SAMSA2 directory (default: $SAMSA)')
+    sub.add_argument('--input-dir', default=None,
+                     help='directory of the R1/R2 fastq files (default: '
+                          '$SAMSA/input_files)')
+    sub.add_argument('--out-dir', default=None,
+                     help='output directory (default: $SAMSA/output_files)')
+    sub.add_argument('--tiny', action='store_true',
+                     help='use the tiny test databases (also set by '
+                          '$USE_TINY)')
+    sub.add_argument('--cores', type=int, default=None,
+                     help='cores shared by all tasks (default: number of '
+                          'CPUs)')
+    sub.add_argument('--log-dir', default=None,
+                     help='directory of the task logs (default: '
+                          '<out-dir>/logs)')
+    sub.add_argument('--dry-run', action='store_true',
+                     help='print the tasks and commands without running '
+                          'them')
+    sub.add_argument('--stop-on-error', action='store_true',
+                     help='start no task after a failure')
+    sub.add_argument('--checkpoints', default=None,
+                     help='checkpoint store (default: '
+                          '<out-dir>/checkpoints.sqlite)')
+    sub.add_argument('--no-checkpoints', action='store_true',
+                     help='run every task, without checkpoints')
+    sub.add_argument('--force', action='store_true',
+                     help='run every task and record its checkpoint again')
+    sub.set_defaults(func=_samsa)
+    
+    return parser
+
+def main(argv=None):
+    '''
+    Runs the bioinformatics command.
+    '''
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.metrics is None:
+        if args.profile or args.trace_memory:
+            parser.error('--profile and --trace-memory need --metrics')
+        return args.func(args)
+    from .profiling import profiled
+    
+    with profiled(args.metrics, profile=args.profile, 
+                  trace_memory=args.trace_memory):
+        return args.func(args)
@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:40:19 2026
+
+@author: vrrodovalho
+
+This script contains helpers to read and write gzip, BGZF (blocked gzip, as
+used by samtools and tabix) and zstd compressed files. BGZF files are
+decompressed in parallel and support random access.
+
+"""
+
+import io
+import os
+import gzip
+import zlib
+import struct
+import bisect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+COMPRESSIONS = [None, 'gzip', 'bgzf']
+
+# uncompressed bytes per BGZF block, as in htslib
+BGZF_BLOCK_SIZE = 0xff00
+BGZF_HEADER = b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00'
+BGZF_EOF = BGZF_HEADER + b'\x1b\x00\x03\x00' + b'\x00' * 8
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def detect_compression(path):
+    '''
+    Detects the compression of a file from its magic bytes.
+
+    Parameters
+    ----------
+    path : PATH or FILE
+        Path of the file, or a buffered binary file, whose first bytes are
+        peeked at without being consumed (so pipes can still be read).
+
+    Returns
+    -------
+    STR
+        'bgzf', 'gzip', 'zstd' or None for uncompressed files.
+
+    '''
+    if hasattr(path, 'peek'):
+        header = path.peek(18)[:18]
+    else:
+        with open(path, 'rb') as input_file:
+            header = input_file.read(18)
+    if header.startswith(GZIP_MAGIC):
+        if len(header) >= 18 and header[3] & 4 and header[12:14] == b'BC':
+            return 'bgzf'
+        return 'gzip'
+    if header.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return None
+
+def open_input(path, mode='rb', threads=None):
+    '''
+    Opens a file for reading, decompressing it on the fly if needed.
+
+    The file is opened once and its compression detected on the same
+    handle, so pipes, FIFOs and process substitutions work as well as
+    regular files.
+
+    Parameters
+    ----------
+    path : PATH or FILE
+        Path of the file, which may be uncompressed or compressed with gzip,
+        BGZF or zstd (the latter requires the zstandard package), or a
+        buffered binary file, which is closed with the returned stream.
+    mode : STR, optional
+        'rb' for a binary stream or 'rt' for a text stream. 
+        The default is 'rb'.
+    threads : INT, optional
+        Number of threads used to decompress BGZF files. The default is
+        None, meaning the number of CPUs.
+
+    Returns
+    -------
+    FILE
+        A file-like object of the uncompressed data.
+
+    '''
+    if mode not in ['rb', 'rt']:
+        raise ValueError("mode should be 'rb' or 'rt'.")
+    is_file = hasattr(path, 'peek')
+    raw = path if is_file else open(path, 'rb')
+    try:
+        compression = detect_compression(raw)
+        if compression is None:
+            stream = raw
+        elif compression == 'bgzf' and not is_file and raw.seekable():
+            # the blocks are read by offset, from the path
+            raw.close()
+            stream = io.BufferedReader(BgzfReader(path, threads=threads), 
+                                       buffer_size=BGZF_BLOCK_SIZE)
+        elif compression in ['gzip', 'bgzf']:
+            # BGZF streams that cannot seek are read as multi-member gzip
+            stream = _GzipInput(raw)
+        else:
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("Reading zstd files requires the "
+                                  "zstandard package (pip install "
+                                  "zstandard).")
+            decompressor = zstandard.ZstdDecompressor()
+            stream = io.BufferedReader(decompressor.stream_reader(
+                raw, read_across_frames=True))
+    except BaseException:
+        raw.close()
+        raise
+    if mode == 'rt':
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return stream
+
+
+def _inflate_block(block):
+    '''
+    Decompresses one BGZF block (header and footer included).
+    '''
+    extra_length, = struct.unpack('<H', block[10:12])
+    return zlib.decompress(block[12 + extra_length:-8], -15)
+
+def _block_size(header, path):
+    '''
+    Reads the total size of a BGZF block from its header.
+    '''
+    extra_length, = struct.unpack('<H', header[10:12])
+    extra = header[12:12 + extra_length]
+    while extra:
+        sub_id, sub_length = extra[:2], struct.unpack('<H', extra[2:4])[0]
+        if sub_id == b'BC':
+            return struct.unpack('<H', extra[4:6])[0] + 1
+        extra = extra[4 + sub_length:]
+    raise ValueError("{} is not a valid BGZF file.".format(path))
+
+
+class BgzfReader(io.RawIOBase):
+    '''
+    Reads a BGZF file, decompressing the blocks in parallel on a thread pool
+    (zlib releases the GIL) while returning them in order. 
+    
+    Seeking uses the table of block offsets, which is saved in a htslib 
+    compatible '.gzi' file next to the BGZF file, and rebuilt when the BGZF 
+    file is newer.
+
+    Parameters
+    ----------
+    path : PATH
+        Path of the BGZF file.
+    threads : INT, optional
+        Number of decompression threads. The default is None, meaning the
+        number of CPUs.
+
+    '''
+
+    def __init__(self, path, threads=None):
+        super().__init__()
+        self.path = path
+        self.threads = threads or os.cpu_count() or 1
+        self._raw = open(path, 'rb')
+        self._table = None
+        self._blocks = None
+        self._chunk = b''
+        self._chunk_pos = 0
+        self._position = 0
+        self._cache = (None, b'')
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def _iter_raw_blocks(self, coffset):
+        raw = open(self.path, 'rb')
+        try:
+            raw.seek(coffset)
+            while True:
+                header = raw.read(18)
+                if not header:
+                    break
+                rest = raw.read(_block_size(header, self.path) - len(header))
+                yield header + rest
+        finally:
+            raw.close()
+
+    def _iter_blocks(self, coffset):
+        if self.threads == 1:
+            for block in self._iter_raw_blocks(coffset):
+                yield _inflate_block(block)
+            return
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            pending = deque()
+            for block in self._iter_raw_blocks(coffset):
+                pending.append(pool.submit(_inflate_block, block))
+                if len(pending) >= 4 * self.threads:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def readinto(self, buffer):
+        if self._blocks is None:
+            self._blocks = self._iter_blocks(0)
+        while self._chunk_pos >= len(self._chunk):
+            self._chunk = next(self._blocks, None)
+            self._chunk_pos = 0
+            if self._chunk is None:
+                self._chunk = b''
+                return 0
+        n = min(len(buffer), len(self._chunk) - self._chunk_pos)
+        buffer[:n] = self._chunk[self._chunk_pos:self._chunk_pos + n]
+        self._chunk_pos += n
+        self._position += n
+        return n
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.uncompressed_size()
+        coffsets, uoffsets = self.block_table()
+        block = max(bisect.bisect_right(uoffsets, offset) - 1, 0)
+        if self._blocks is not None:
+            self._blocks.close()
+        self._blocks = self._iter_blocks(coffsets[block])
+        self._chunk = next(self._blocks, None) or b''
+        self._chunk_pos = offset - uoffsets[block]
+        self._position = offset
+        return offset
+
+    def block_table(self):
+        '''
+        Returns the compressed and uncompressed start offsets of each block.
+        '''
+        if self._table is None:
+            self._table = self._read_gzi()
+        if self._table is None:
+            self._table = self._build_table()
+            self._write_gzi()
+        return self._table
+
+    def uncompressed_size(self):
+        '''
+        Returns the size of the uncompressed data.
+        '''
+        coffsets, uoffsets = self.block_table()
+        size = uoffsets[-1]
+        with open(self.path, 'rb') as raw:
+            raw.seek(coffsets[-1])
+            header = raw.read(18)
+            if header:
+                raw.seek(coffsets[-1] + _block_size(header, self.path) - 4)
+                size += struct.unpack('<I', raw.read(4))[0]
+        return size
+
+    def _build_table(self):
+        coffsets, uoffsets = [], []
+        coffset, uoffset = 0, 0
+        with open(self.path, 'rb') as raw:
+            while True:
+                raw.seek(coffset)
+                header = raw.read(18)
+                if not header:
+                    break
+                block_size = _block_size(header, self.path)
+                raw.seek(coffset + block_size - 4)
+                coffsets.append(coffset)
+                uoffsets.append(uoffset)
+                uoffset += struct.unpack('<I', raw.read(4))[0]
+                coffset += block_size
+        return (coffsets or [0], uoffsets or [0])
+
+    def _read_gzi(self):
+        gzi = str(self.path) + '.gzi'
+        if (not os.path.exists(gzi) or 
+                os.path.getmtime(gzi) < os.path.getmtime(self.path)):
+            return None
+        with open(gzi, 'rb') as input_file:
+            n_entries, = struct.unpack('<Q', input_file.read(8))
+            values = struct.unpack('<{}Q'.format(2 * n_entries), 
+                                   input_file.read(16 * n_entries))
+        return ([0] + list(values[0::2]), [0] + list(values[1::2]))
+
+    def _write_gzi(self):
+        coffsets, uoffsets = self._table
+        gzi = str(self.path) + '.gzi'
+        try:
+            with open(gzi, 'wb') as out:
+                out.write(struct.pack('<Q', len(coffsets) - 1))
+                for coffset, uoffset in zip(coffsets[1:], uoffsets[1:]):
+                    out.write(struct.pack('<QQ', coffset, uoffset))
+        except OSError:
+            pass
+
+    def read_at(self, offset, size):
+        '''
+        Reads size uncompressed bytes starting at offset, decompressing only
+        the blocks that contain them.
+        '''
+        coffsets, uoffsets = self.block_table()
+        block = max(bisect.bisect_right(uoffsets, offset) - 1, 0)
+        pieces = []
+        skip = offset - uoffsets[block]
+        while size > 0 and block < len(coffsets):
+            data = self._read_block(block)
+            piece = data[skip:skip + size]
+            if not piece and not data:
+                break
+            pieces.append(piece)
+            size -= len(piece)
+            skip = 0
+            block += 1
+        return b''.join(pieces)
+
+    def _read_block(self, block):
+        if self._cache[0] != block:
+            self._raw.seek(self.block_table()[0][block])
+            header = self._raw.read(18)
+            if not header:
+                return b''
+            rest = self._raw.read(_block_size(header, self.path) - 18)
+            self._cache = (block, _inflate_block(header + rest))
+        return self._cache[1]
+
+    def close(self):
+        if self._blocks is not None:
+            self._blocks.close()
+            self._blocks = None
+        self._raw.close()
+        super().close()
+
+
+class BgzfWriter():
+    '''
+    Writes a BGZF file: a series of gzip members of at most 64 KB each,
+    which can be decompressed independently.
+
+    Parameters
+    ----------
+    raw : FILE
+        An open binary file handle, which is closed with the writer.
+    compresslevel : INT, optional
+        zlib compression level. The default is 6.
+
+    '''
+
+    def __init__(self, raw, compresslevel=6):
+        self.raw = raw
+        self.compresslevel = compresslevel
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= BGZF_BLOCK_SIZE:
+            self._write_block(bytes(self._buffer[:BGZF_BLOCK_SIZE]))
+            del self._buffer[:BGZF_BLOCK_SIZE]
+        return len(data)
+
+    def _write_block(self, data):
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+        cdata = compressor.compress(data) + compressor.flush()
+        # BSIZE is the total block size minus 1
+        block_size = len(BGZF_HEADER) + 2 + len(cdata) + 8
+        self.raw.write(BGZF_HEADER)
+        self.raw.write(struct.pack('<H', block_size - 1))
+        self.raw.write(cdata)
+        self.raw.write(struct.pack('<II', zlib.crc32(data), len(data)))
+
+    def flush(self):
+        if self._buffer:
+            self._write_block(bytes(self._buffer))
+            self._buffer = bytearray()
+        self.raw.flush()
+
+    def close(self):
+        self.flush()
+        self.raw.write(BGZF_EOF)
+        self.raw.close()
+
+
+def open_output(raw, compression=None, compresslevel=6):
+    '''
+    Wraps a binary file handle with the requested compression.
+
+    Parameters
+    ----------
+    raw : FILE
+        An open binary file handle.
+    compression : STR, optional
+        Possible values: [None, 'gzip', 'bgzf']. The default is None.
+    compresslevel : INT, optional
+        Compression level. The default is 6.
+
+    Returns
+    -------
+    FILE
+        A binary file-like object, closing raw when closed.
+
+    '''
+    if compression is None:
+        return raw
+    elif compression == 'gzip':
+        return _GzipOutput(raw, compresslevel)
+    elif compression == 'bgzf':
+        return BgzfWriter(raw, compresslevel)
+    raise ValueError("Unknown compression '{}'. Choose one of: {}".format(
+        compression, COMPRESSIONS))
+
+
+class _GzipInput(gzip.GzipFile):
+    '''
+    GzipFile that also closes the file object it reads.
+    '''
+
+    def __init__(self, raw):
+        super().__init__(fileobj=raw, mode='rb')
+        self._raw = raw
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+
+class _GzipOutput(gzip.GzipFile):
+    '''
+    GzipFile that also closes the file object it wraps.
+    '''
+
+    def __init__(self, raw, compresslevel):
+        super().__init__(fileobj=raw, mode='wb', compresslevel=compresslevel)
+        self._raw = raw
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._raw.close()
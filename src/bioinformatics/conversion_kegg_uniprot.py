@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Apr  8 18:13:55 2021
+
+@author: vrrodovalho
+
+This script contains functions to convert KEGG and Uniprot ids.
+
+"""
+
+import gc
+import os
+import sys
+import pathlib
+from collections import defaultdict
+
+from .kegg_rest import KeggRestClient
+from .profiling import stage
+
+# prefix of the ids of each database in the KEGG conv tables
+DATABASE_PREFIXES = {'uniprot': 'up', 'ncbi-geneid': 'ncbi-geneid',
+                     'ncbi-proteinid': 'ncbi-proteinid'}
+
+
+class KeggMapping():
+    '''
+    Both directions of a KEGG id conversion table (e.g. conv/hsa/uniprot), 
+    built in a single pass. Each direction is a dictionary of tuples, and the
+    ids are interned strings shared by both directions.
+
+    Parameters
+    ----------
+    kegg2uniprot : DICT
+        The tuple of UniProt ids of each KEGG id.
+    uniprot2kegg : DICT
+        The tuple of KEGG ids of each UniProt id.
+
+    '''
+
+    def __init__(self, kegg2uniprot, uniprot2kegg):
+        self.kegg2uniprot = kegg2uniprot
+        self.uniprot2kegg = uniprot2kegg
+
+    @classmethod
+    def from_tables(cls, tables, database='uniprot', keep_prefix=False):
+        '''
+        Parses the text of one or more KEGG conv tables, in any column order.
+
+        Parameters
+        ----------
+        tables : ITERABLE
+            The text of each table, with lines such as 'up:P31946\thsa:7529'.
+        database : STR, optional
+            The database converted to or from KEGG. The default is 'uniprot'.
+        keep_prefix : BOOL, optional
+            If True, KEGG ids keep their organism prefix ('hsa:7529'), which
+            is needed when the tables come from several organisms. The 
+            default is False.
+
+        Returns
+        -------
+        KeggMapping
+
+        '''
+        intern = sys.intern
+        other_prefix = DATABASE_PREFIXES.get(database, database) + ':'
+        prefix_size = len(other_prefix)
+        kegg2other = defaultdict(list)
+        other2kegg = defaultdict(list)
+        # the garbage collector would scan the growing dicts of lists many
+        # times while they are built, without anything to collect
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for table in tables:
+                # ids have no spaces, so the table is a flat list of pairs
+                tokens = table.split()
+                if len(tokens) % 2:
+                    raise ValueError('Malformed KEGG conv table: odd number '
+                                     'of ids.')
+                if not tokens:
+                    continue
+                if tokens[0].startswith(other_prefix):
+                    pairs = zip(tokens[0::2], tokens[1::2])
+                else:
+                    pairs = zip(tokens[1::2], tokens[0::2])
+                for other, kegg in pairs:
+                    other = intern(other[prefix_size:])
+                    if not keep_prefix:
+                        kegg = kegg.partition(':')[2]
+                    kegg = intern(kegg)
+                    kegg2other[kegg].append(other)
+                    other2kegg[other].append(kegg)
+            kegg2other = {key: tuple(values) 
+                          for key, values in kegg2other.items()}
+            other2kegg = {key: tuple(values) 
+                          for key, values in other2kegg.items()}
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return cls(kegg2other, other2kegg)
+
+    @classmethod
+    def from_lines(cls, lines, database='uniprot', keep_prefix=False):
+        '''
+        Parses the lines of a KEGG conv table. See from_tables.
+        '''
+        return cls.from_tables(['\n'.join(lines)], database, keep_prefix)
+
+    @classmethod
+    def retrieve(cls, organisms='hsa', database='uniprot', client=None, 
+                 keep_prefix=None):
+        '''
+        Retrieves the conversion tables of one or more KEGG organisms and 
+        parses them in a single mapping.
+
+        Parameters
+        ----------
+        organisms : STR or LIST, optional
+            The KEGG organism code(s). The default is 'hsa'.
+        database : STR, optional
+            The database converted to or from KEGG. The default is 'uniprot'.
+        client : KeggRestClient, optional
+            The client used to retrieve the tables. The default is None, 
+            which uses a KeggRestClient with the default cache.
+        keep_prefix : BOOL, optional
+            If KEGG ids keep their organism prefix. The default is None, 
+            which keeps it only when there is more than one organism.
+
+        Returns
+        -------
+        KeggMapping
+
+        '''
+        if isinstance(organisms, str):
+            organisms = [organisms]
+        if keep_prefix is None:
+            keep_prefix = len(organisms) > 1
+        if client is None:
+            with KeggRestClient() as client:
+                return cls.retrieve(organisms, database, client, keep_prefix)
+        tables = (client.get('conv/{}/{}'.format(organism, database))
+                  .decode('utf-8') for organism in organisms)
+        return cls.from_tables(tables, database, keep_prefix)
+
+    def to_uniprot(self, kegg_ids):
+        '''
+        Returns the tuple of UniProt ids of each KEGG id (an empty tuple for
+        the ids that are not in the mapping).
+        '''
+        get = self.kegg2uniprot.get
+        return {kegg_id: get(kegg_id, ()) for kegg_id in kegg_ids}
+
+    def to_kegg(self, uniprot_ids):
+        '''
+        Returns the tuple of KEGG ids of each UniProt id (an empty tuple for
+        the ids that are not in the mapping).
+        '''
+        get = self.uniprot2kegg.get
+        return {uniprot_id: get(uniprot_id, ()) for uniprot_id in uniprot_ids}
+
+    def uniprot_ids(self):
+        '''
+        Returns a set-like view of the unique UniProt ids.
+        '''
+        return self.uniprot2kegg.keys()
+
+    def kegg_ids(self):
+        '''
+        Returns a set-like view of the unique KEGG ids.
+        '''
+        return self.kegg2uniprot.keys()
+
+    def __len__(self):
+        return sum(len(values) for values in self.kegg2uniprot.values())
+
+
+def retrieve_uniprot_2_kegg(format1='hsa', format2='uniprot', mode=1, 
+                            client=None):
+    '''
+    Retrieves the KEGG conversion table between a KEGG organism and another
+    database, from the local cache of KEGG REST responses when possible.
+    KeggMapping.retrieve gives both directions at once.
+
+    Parameters
+    ----------
+    format1 : STR, optional
+        The KEGG organism code. The default is 'hsa'.
+    format2 : STR, optional
+        The other database. The default is 'uniprot'.
+    mode : INT, optional
+        1 to map the other ids to KEGG ids, 2 to map KEGG ids to the other
+        ids. The default is 1.
+    client : KeggRestClient, optional
+        The client used to retrieve the table. The default is None, which 
+        uses a KeggRestClient with the default cache.
+
+    Returns
+    -------
+    DICT
+        The lists of ids mapped to each id.
+
+    '''
+    if mode not in (1, 2):
+        print("Choose mode 1 or 2.")
+        return None
+    print("From KEGG, retrieving map for FORMAT CONVERSION...")
+    with stage('retrieve_uniprot_2_kegg') as metrics:
+        mapping = KeggMapping.retrieve(format1, format2, client=client)
+        metrics.add(records=len(mapping))
+    if mode == 1:
+        multimap = mapping.uniprot2kegg
+    else:
+        multimap = mapping.kegg2uniprot
+    return {key: list(values) for key, values in multimap.items()}
+
+##############################################################################
+
+if __name__ == '__main__':
+
+    # DIRECTORY SYSTEM
+    package_dir = os.path.dirname(os.path.realpath(__file__))
+    src_dir = os.path.dirname(package_dir)
+    main_dir = os.path.dirname(src_dir)
+    data_dir = pathlib.Path(main_dir) / 'data'
+    input_dir = pathlib.Path(data_dir) / 'input'
+    output_dir = pathlib.Path(data_dir) / 'output'
+
+    # Redefine input and output directories
+    input_dir = input_dir / 'fasta_filters'
+
+    # Get human uniprot IDs that are in kegg
+    mapping = KeggMapping.retrieve('hsa', 'uniprot')
+    all_uniprot_ids = list(mapping.uniprot_ids())
+
+    output_file = output_dir / 'human_proteines_list.txt'
+    with open(output_file, 'w') as f:
+        for item in all_uniprot_ids:
+            f.write("%s\n" % item)
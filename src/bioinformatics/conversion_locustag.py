@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+"""
+@author: vrrodovalho
+
+"""
+
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .profiling import stage
+
+# the columns of the NCBI protein tables needed by convert
+MAPPING_COLUMNS = ['Locus tag', 'Protein product']
+CACHE_DIR = '.mapping_cache'
+GFF_CACHE_DIR = '.mapping_cache_gff'
+
+
+def read_protein_table(file, columns=MAPPING_COLUMNS):
+    '''
+    Reads only the given columns of an NCBI protein table (proteins_*.csv),
+    all of them as strings.
+
+    Parameters
+    ----------
+    file : STR
+        The path of the protein table.
+    columns : LIST, optional
+        The columns to be read. The default is MAPPING_COLUMNS.
+
+    Returns
+    -------
+    df : DATAFRAME
+        The protein table, with the given columns.
+
+    '''
+    import pandas as pd
+    
+    return pd.read_csv(file, usecols=columns, 
+                       dtype={column: str for column in columns})
+
+def construct_mapping_df(input_dir, list_of_file_paths=None, 
+                         columns=MAPPING_COLUMNS, threads=None, 
+                         verbose=True):
+    '''
+    Reads several NCBI protein tables and concatenates them in a single
+    mapping table. The tables are read concurrently, keeping only the needed
+    columns, and concatenated once. Besides the given columns, the mapping 
+    table has an 'Assembly' column with the name of the table each row came 
+    from. The id columns after the first one are categorical, since protein 
+    ids are shared by many assemblies.
+
+    Parameters
+    ----------
+    input_dir : STR
+        The directory with the protein tables. Only used when 
+        list_of_file_paths is not given, in which case all the 
+        proteins_*.csv files in it are read.
+    list_of_file_paths : LIST, optional
+        The paths of the protein tables. The default is None.
+    columns : LIST, optional
+        The columns to be read. The first one is the key of the mapping.
+        The default is MAPPING_COLUMNS.
+    threads : INT, optional
+        How many tables are read at the same time. The default is None, 
+        which lets ThreadPoolExecutor choose.
+    verbose : BOOL, optional
+        If True, reports the keys that map to different ids in different
+        assemblies. The default is True.
+
+    Returns
+    -------
+    df : DATAFRAME
+        The mapping table.
+
+    '''
+    import numpy as np
+    import pandas as pd
+    
+    if list_of_file_paths is None:
+        list_of_file_paths = sorted(str(path) for path in 
+                                    pathlib.Path(input_dir).glob(
+                                        'proteins_*.csv'))
+    columns = list(columns)
+    if not list_of_file_paths:
+        return pd.DataFrame(columns=columns + ['Assembly'])
+    
+    with stage('construct_mapping_df') as metrics:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            tables = list(executor.map(lambda file: read_protein_table(
+                file, columns), list_of_file_paths))
+        
+        assemblies = [pathlib.Path(file).stem for file in list_of_file_paths]
+        df = pd.concat(tables, ignore_index=True)
+        df['Assembly'] = pd.Categorical(np.repeat(
+            np.array(assemblies, dtype=object), 
+            [len(table) for table in tables]))
+        for column in columns[1:]:
+            df[column] = df[column].astype('category')
+        metrics.add(records=len(df), files_read=list_of_file_paths)
+    
+    if verbose:
+        conflicts = find_mapping_conflicts(df, key=columns[0], 
+                                           value=columns[1])
+        if len(conflicts):
+            n_keys = conflicts[columns[0]].nunique()
+            n_across = (conflicts.groupby(columns[0], observed=True)
+                        ['Assembly'].nunique() > 1).sum()
+            print('{} {} values map to different {} values, {} of them '
+                  'across assemblies:'.format(n_keys, columns[0], 
+                                              columns[1], n_across))
+            print(conflicts.to_string(index=False, max_rows=20))
+    return df
+
+def find_mapping_conflicts(df, key='Locus tag', value='Protein product'):
+    '''
+    Finds the keys of a mapping table that map to more than one value, 
+    ignoring missing keys and values.
+
+    Parameters
+    ----------
+    df : DATAFRAME
+        The mapping table, as returned by construct_mapping_df.
+    key : STR, optional
+        The key column. The default is 'Locus tag'.
+    value : STR, optional
+        The value column. The default is 'Protein product'.
+
+    Returns
+    -------
+    conflicts : DATAFRAME
+        The rows of the conflicting keys, sorted by key.
+
+    '''
+    pairs = df.dropna(subset=[key, value])
+    n_values = pairs.groupby(key, observed=True)[value].transform('nunique')
+    conflicts = pairs[n_values > 1]
+    return conflicts.sort_values(key, kind='stable')
+
+
+def load_mapping(input_dir, list_of_file_paths=None, columns=MAPPING_COLUMNS,
+                 cache_dir=None, rebuild=False, threads=None, verbose=True):
+    '''
+    Returns the mapping between the first two columns of several NCBI protein
+    tables, from a persistent cache when the tables did not change since it 
+    was built. Otherwise, the tables are read with construct_mapping_df and 
+    the cache is rebuilt.
+
+    Parameters
+    ----------
+    input_dir : STR
+        The directory with the protein tables. If list_of_file_paths is not 
+        given, all the proteins_*.csv files in it are used.
+    list_of_file_paths : LIST, optional
+        The paths of the protein tables. The default is None.
+    columns : LIST, optional
+        The key and value columns. The default is MAPPING_COLUMNS.
+    cache_dir : STR, optional
+        The cache directory. The default is None, which uses CACHE_DIR inside
+        input_dir.
+    rebuild : BOOL, optional
+        If True, the cache is rebuilt. The default is False.
+    threads : INT, optional
+        How many tables are read at the same time. The default is None.
+    verbose : BOOL, optional
+        If True, reports the cache use and the conflicting keys. The default 
+        is True.
+
+    Returns
+    -------
+    mapping : IdMapping
+        The mapping, which can be given to convert instead of a mapping 
+        table.
+
+    '''
+    from .mapping_cache import IdMapping, cached_mapping
+    
+    if list_of_file_paths is None:
+        list_of_file_paths = sorted(str(path) for path in 
+                                    pathlib.Path(input_dir).glob(
+                                        'proteins_*.csv'))
+    if cache_dir is None:
+        cache_dir = pathlib.Path(input_dir) / CACHE_DIR
+    columns = list(columns[:2])
+    
+    def build():
+        df = construct_mapping_df(input_dir, list_of_file_paths, columns, 
+                                  threads=threads, verbose=verbose)
+        return IdMapping.from_pairs(df[columns[0]], df[columns[1]])
+    
+    return cached_mapping(str(cache_dir), list_of_file_paths, columns, build,
+                          rebuild=rebuild, verbose=verbose)
+
+def load_gff_mapping(gff_files, key='locus_tag', value='protein_id',
+                     cache_dir=None, rebuild=False, verbose=True):
+    '''
+    Returns the mapping between two attributes of the CDS features of 
+    several GFF3 files (by default, locus tag to protein id), streaming the
+    files instead of reading NCBI protein tables. As with load_mapping, the 
+    mapping is cached and rebuilt when a file is added or changed.
+
+    Parameters
+    ----------
+    gff_files : LIST
+        The paths of the GFF3 files, which may be compressed.
+    key : STR, optional
+        The key attribute. The default is 'locus_tag'.
+    value : STR, optional
+        The value attribute. The default is 'protein_id'.
+    cache_dir : STR, optional
+        The cache directory. The default is None, which uses GFF_CACHE_DIR in
+        the directory of the first file.
+    rebuild : BOOL, optional
+        If True, the cache is rebuilt. The default is False.
+    verbose : BOOL, optional
+        If True, reports the cache use. The default is True.
+
+    Returns
+    -------
+    mapping : IdMapping
+        The mapping, which can be given to convert and convert_many.
+
+    '''
+    from .gff import iter_gff_id_pairs
+    from .mapping_cache import IdMapping, cached_mapping
+    
+    gff_files = [str(file) for file in gff_files]
+    if cache_dir is None:
+        cache_dir = pathlib.Path(gff_files[0]).parent / GFF_CACHE_DIR
+    
+    def build():
+        keys = []
+        values = []
+        for gff_file in gff_files:
+            for pair_key, pair_value in iter_gff_id_pairs(gff_file, key, 
+                                                          value):
+                keys.append(pair_key)
+                values.append(pair_value)
+        return IdMapping.from_pairs(keys, values)
+    
+    return cached_mapping(str(cache_dir), gff_files, [key, value], build,
+                          rebuild=rebuild, verbose=verbose)
+
+def convert(df_2map, df_maping, id_2map=0, counts_2map=1, from_id='', to_id=''):
+    with stage('convert') as metrics:
+        df = df_2map.copy()
+        if hasattr(df_maping, 'lookup'):
+            # an IdMapping, as returned by load_mapping
+            df['id'] = df_maping.lookup(df[0])
+        else:
+            mapping = dict(zip(df_maping[from_id], df_maping[to_id]))
+            df['id'] = df[0].map(mapping)
+        df = df[ ['id', id_2map, counts_2map] ]
+        metrics.add(records=len(df))
+    return df
+
+def read_count_file(count_file):
+    '''
+    Reads a tab-separated count file (id and count, without header), such as
+    the ones written by htseq-count. The htseq-count summary lines 
+    (__no_feature, __ambiguous, ...) are left out.
+
+    Parameters
+    ----------
+    count_file : STR
+        The path of the count file.
+
+    Returns
+    -------
+    ids : ARRAY
+        The ids, as an object array.
+    counts : ARRAY
+        The counts, as an int64 array.
+
+    '''
+    import pandas as pd
+    
+    df = pd.read_csv(count_file, sep='\t', header=None, usecols=[0, 1],
+                     names=['id', 'count'], 
+                     dtype={'id': object, 'count': 'int64'})
+    df = df[~df['id'].str.startswith('__')]
+    return df['id'].to_numpy(), df['count'].to_numpy()
+
+def _mapping_lookup(mapping, from_id, to_id):
+    '''
+    Returns a function that maps an array of ids, given an IdMapping, a dict
+    or a mapping table.
+    '''
+    import numpy as np
+    import pandas as pd
+    
+    if hasattr(mapping, 'lookup'):
+        return mapping.lookup
+    if not isinstance(mapping, dict):
+        mapping = dict(zip(mapping[from_id], mapping[to_id]))
+    # an object Series keeps the type of the values when ids are missing
+    # (a dict would turn integer values into floats)
+    mapping = pd.Series(mapping, dtype=object)
+    return lambda ids: pd.Series(ids).map(mapping).to_numpy(dtype=object,
+                                                            na_value=np.nan)
+
+def convert_many(count_files, mapping, sample_names=None, from_id='Locus tag',
+                 to_id='Protein product', workers=None, verbose=True):
+    '''
+    Converts the ids of several count files with the same mapping and merges
+    them in a single count matrix. The files are read and mapped concurrently,
+    and the counts of ids that map to the same id are summed. Files with the
+    same ids, in the same order, are mapped only once.
+
+    Parameters
+    ----------
+    count_files : LIST
+        The paths of the count files.
+    mapping : IdMapping, DICT or DATAFRAME
+        The mapping, as returned by load_mapping, a dict or a mapping table
+        as returned by construct_mapping_df.
+    sample_names : LIST, optional
+        The names of the samples. The default is None, which uses the names
+        of the count files without extension.
+    from_id : STR, optional
+        The key column, if mapping is a table. The default is 'Locus tag'.
+    to_id : STR, optional
+        The value column, if mapping is a table. The default is 
+        'Protein product'.
+    workers : INT, optional
+        How many files are converted at the same time. The default is None,
+        which lets ThreadPoolExecutor choose.
+    verbose : BOOL, optional
+        If True, prints how many ids were not mapped in each sample. The 
+        default is True.
+
+    Returns
+    -------
+    matrix : DATAFRAME
+        The sample x gene count matrix, with the smallest unsigned integer 
+        dtype that holds all the counts.
+    unmapped : DICT
+        For each sample, a Series with the counts of the ids that were not 
+        mapped.
+
+    '''
+    import numpy as np
+    import pandas as pd
+    
+    count_files = [str(file) for file in count_files]
+    if sample_names is None:
+        sample_names = [pathlib.Path(file).stem for file in count_files]
+    if len(sample_names) != len(count_files):
+        raise ValueError('There must be one sample name per count file.')
+    lookup = _mapping_lookup(mapping, from_id, to_id)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        count_tables = list(executor.map(read_count_file, count_files))
+        distinct = []
+        lookups = []
+        for ids, _ in count_tables:
+            for distinct_ids, future in distinct:
+                if np.array_equal(ids, distinct_ids):
+                    break
+            else:
+                future = executor.submit(lookup, ids)
+                distinct.append((ids, future))
+            lookups.append(future)
+        converted = [(ids, counts, future.result()) for (ids, counts), future 
+                     in zip(count_tables, lookups)]
+    
+    # the gene names are strings, whatever the type of the mapped values, 
+    # so they are cast once and the same names are looked up
+    mapped_names = [np.asarray(mapped[pd.notna(mapped)]).astype(str)
+                    for _, _, mapped in converted]
+    genes = pd.Index(np.unique(np.concatenate(mapped_names))
+                     if mapped_names else [], name='gene')
+    values = np.zeros((len(count_files), len(genes)), dtype=np.int64)
+    unmapped = {}
+    for row, (sample, (ids, counts, mapped)) in enumerate(zip(sample_names, 
+                                                               converted)):
+        is_mapped = pd.notna(mapped)
+        codes = genes.get_indexer(mapped_names[row])
+        if (codes < 0).any():
+            raise LookupError('{}: mapped ids missing from the gene index'
+                              .format(sample))
+        np.add.at(values[row], codes, counts[is_mapped])
+        unmapped[sample] = pd.Series(counts[~is_mapped], index=ids[~is_mapped],
+                                     name=sample)
+        if verbose:
+            print('{}: {} of {} ids not mapped ({} counts)'.format(
+                sample, (~is_mapped).sum(), len(ids), 
+                counts[~is_mapped].sum()))
+    
+    if values.size and values.min() >= 0:
+        dtype = np.min_scalar_type(values.max())
+    else:
+        dtype = np.int64
+    matrix = pd.DataFrame(values.astype(dtype), columns=genes,
+                          index=pd.Index(sample_names, name='sample'))
+    return matrix, unmapped
+
+def write_count_matrix(matrix, output_file, file_format=None):
+    '''
+    Writes a count matrix as a tab-separated or a Parquet file.
+
+    Parameters
+    ----------
+    matrix : DATAFRAME
+        The count matrix, as returned by convert_many.
+    output_file : STR
+        The path of the output file.
+    file_format : STR, optional
+        'tsv' or 'parquet'. The default is None, which uses 'parquet' for
+        .parquet and .pq files and 'tsv' otherwise.
+
+    '''
+    if file_format is None:
+        suffix = pathlib.Path(output_file).suffix.lower()
+        file_format = 'parquet' if suffix in ('.parquet', '.pq') else 'tsv'
+    if file_format == 'parquet':
+        matrix.to_parquet(output_file)
+    elif file_format == 'tsv':
+        matrix.to_csv(output_file, sep='\t')
+    else:
+        raise ValueError('Unknown file format: {}'.format(file_format))
+
+if __name__ == '__main__':
+
+    import pandas as pd
+    from .gff import read_gff_header
+
+    # DIRECTORY SYSTEM
+    package_dir = os.path.dirname(os.path.realpath(__file__))
+    src_dir = os.path.dirname(package_dir)
+    main_dir = os.path.dirname(src_dir)
+    data_dir = pathlib.Path(main_dir) / 'data'
+    input_dir = pathlib.Path(data_dir) / 'input'
+    output_dir = pathlib.Path(data_dir) / 'output'
+
+    # Redefine input and output directories
+    input_dir = input_dir / 'locustag'
+
+    # File paths
+    count_file = input_dir / 'NT.count'
+    ncbi_tab_file = input_dir / 'proteins_992_249994.csv'
+
+
+    ncbi_files = [f for f in os.listdir(input_dir) if os.path.isfile(
+        os.path.join(input_dir, f)) and 'proteins_' in f]
+    list_of_file_paths = [ os.path.join(input_dir, filename) \
+                          for filename in ncbi_files]
+
+    mapping = load_mapping(input_dir=input_dir,
+                           list_of_file_paths=list_of_file_paths)
+
+
+    # Read files
+    df_count = pd.read_csv(count_file, sep='\t', header=None)
+    #df_ncbi = pd.read_csv(ncbi_tab_file)
+
+    # convert
+    df_converted = convert(df_2map=df_count, df_maping=mapping)
+
+    # convert all the samples to a single count matrix
+    count_files = sorted(input_dir.glob('*.count'))
+    count_matrix, unmapped = convert_many(count_files, mapping)
+    write_count_matrix(count_matrix, output_dir / 'locustag_counts.tsv')
+
+
+
+
+    file = 'J:\\data\\Renan_RNASEQ\\14SM\\gff\\14SM.gff'
+    header = read_gff_header(file, names=['genome-build', 
+                                          'genome-build-accession'])
+    ids = header.get('genome-build', []) + \
+          header.get('genome-build-accession', [])
+    ids = list(set(ids))
+    print(ids)
+
+    ids2 = [
+            'ASM46648v1',
+            'NCBI_Assembly:GCF_000296465.1',
+            'NCBI_Assembly:GCF_900537995.1',
+            'NCBI_Assembly:GCF_001314995.1',
+            'Barn_inte_YIT_11860_V1',
+            'ASM1050923v1',
+            'NCBI_Assembly:GCF_010509575.1',
+            'NCBI_Assembly:GCF_010509235.1',
+            'ASM674234v1',
+            'NCBI_Assembly:GCF_006742345.1',
+            'NCBI_Assembly:GCF_000156375.1',
+            'NCBI_Assembly:GCF_000020605.1',
+            'Roseburia intestinalis strain L1-82',
+            'ASM1050957v1',
+            'ASM1776v1',
+            'NCBI_Assembly:GCF_000466485.1',
+            'NCBI_Assembly:GCF_000011065.1',
+            'ASM1106v1',
+            'NCBI_Assembly:GCF_002222615.2',
+            'NCBI_Assembly:GCF_000173815.1',
+            'ASM17381v1',
+            'NCBI_Assembly:GCF_000169035.1',
+            'ASM131499v1',
+            'NCBI_Assembly:GCF_000017765.1',
+            'ASM222261v2',
+            'ASM2060v1',
+            'ASM16903v1',
+            'ASM15637v1'
+            ]
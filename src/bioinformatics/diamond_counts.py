@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 02:44:17 2026
+
+@author: vrrodovalho
+
+This script contains a streaming aggregator of DIAMOND tabular results, as
+DIAMOND_analysis_counter.py of SAMSA2 does with RefSeq annotations, but
+counting organisms and functions in a single pass over each file. The
+organism and function of each subject id come from a persistent index of
+the reference fasta headers, stored as memory-mapped numpy arrays and built
+only once per reference.
+
+"""
+
+import os
+import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("diamond_counts requires the numpy package (pip "
+                      "install numpy, or pip install .[samsa]).")
+
+from .compressed_io import open_input
+from .fasta_index import build_fasta_index, read_fasta_index
+from .mapping_cache import MANIFEST_FILE, _encode, source_manifest
+
+
+INDEX_SUFFIX = '.subjects'
+LEVELS = ['organism', 'function']
+ARRAY_FILES = ['ids.npy', 'organism.npy', 'function.npy',
+               'organism_names.npy', 'function_names.npy']
+BLOCK_SIZE = 1 << 22
+# changes when the headers are parsed differently, to rebuild the indexes
+INDEX_VERSION = 2
+
+
+def parse_refseq_header(header):
+    '''
+    Splits a RefSeq fasta header, such as 'WP_000001.1 DNA polymerase
+    [Escherichia coli]', into its id, function and organism: the text in the
+    last balanced brackets, which may contain brackets themselves (as in
+    '[Bacillus [sub] x]'). Missing parts are empty strings.
+    '''
+    subject_id, _, description = header.partition(' ')
+    end = description.rfind(']')
+    depth = 0
+    for start in range(end, -1, -1):
+        if description[start] == ']':
+            depth += 1
+        elif description[start] == '[':
+            depth -= 1
+            if not depth:
+                return (subject_id, description[:start].strip(),
+                        description[start + 1:end].strip())
+    return subject_id, description.strip(), ''
+
+
+class SubjectIndex():
+    '''
+    The organism and function of each subject id of a reference database.
+
+    The ids are a sorted bytes array, and the organisms and functions are
+    integer codes into arrays of names, so the index can be memory-mapped
+    and shared by many processes.
+    '''
+
+    def __init__(self, ids, organism, function, organism_names,
+                 function_names):
+        self.ids = ids
+        self.codes = {'organism': organism, 'function': function}
+        self.names = {'organism': organism_names, 'function': function_names}
+
+    @classmethod
+    def from_headers(cls, headers):
+        '''
+        Builds an index from RefSeq fasta headers. For repeated ids, the
+        first header is kept.
+        '''
+        ids = []
+        codes = {level: [] for level in LEVELS}
+        names = {level: {} for level in LEVELS}
+        for header in headers:
+            subject_id, function, organism = parse_refseq_header(header)
+            ids.append(subject_id)
+            for level, name in (('organism', organism),
+                                ('function', function)):
+                codes[level].append(names[level].setdefault(
+                    name, len(names[level])))
+        ids = _encode(ids)
+        order = np.argsort(ids, kind='stable')
+        ids = ids[order]
+        first = np.ones(len(ids), dtype=bool)
+        first[1:] = ids[1:] != ids[:-1]
+        arrays = {level: np.array(codes[level], dtype=np.int32)[order][first]
+                  for level in LEVELS}
+        return cls(ids[first], arrays['organism'], arrays['function'],
+                   _encode(list(names['organism'])),
+                   _encode(list(names['function'])))
+
+    @classmethod
+    def load(cls, index_dir):
+        '''
+        Opens a saved index, memory-mapping its arrays.
+        '''
+        return cls(*(np.load(os.path.join(index_dir, file), mmap_mode='r')
+                     for file in ARRAY_FILES))
+
+    def save(self, index_dir, manifest):
+        '''
+        Writes the index and its manifest to a directory, each file to a
+        temporary file renamed afterwards, and the manifest last.
+        '''
+        os.makedirs(index_dir, exist_ok=True)
+        manifest_file = os.path.join(index_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_file):
+            os.remove(manifest_file)
+        arrays = [self.ids, self.codes['organism'], self.codes['function'],
+                  self.names['organism'], self.names['function']]
+        for file, array in zip(ARRAY_FILES, arrays):
+            path = os.path.join(index_dir, file)
+            with open(path + '.tmp', 'wb') as out:
+                np.save(out, array)
+            os.replace(path + '.tmp', path)
+        with open(manifest_file + '.tmp', 'w') as out:
+            json.dump(manifest, out)
+        os.replace(manifest_file + '.tmp', manifest_file)
+
+    def aggregate(self, hits):
+        '''
+        Adds up the hits of each subject id by organism and by function.
+
+        Parameters
+        ----------
+        hits : DICT
+            The number of hits of each subject id (as bytes).
+
+        Returns
+        -------
+        totals : DICT
+            The hits of each organism and of each function, as arrays
+            indexed by the codes of the names, keyed by level.
+        unmatched : INT
+            The hits of the subject ids missing from the index.
+
+        '''
+        queries = np.array(list(hits), dtype=bytes)
+        counts = np.fromiter(hits.values(), dtype=np.int64, count=len(hits))
+        if not len(self.ids) or not len(queries):
+            return ({level: np.zeros(len(self.names[level]), dtype=np.int64)
+                     for level in LEVELS}, int(counts.sum()))
+        positions = np.searchsorted(self.ids, queries)
+        positions[positions == len(self.ids)] = 0
+        found = self.ids[positions] == queries
+        totals = {}
+        for level in LEVELS:
+            totals[level] = np.bincount(
+                self.codes[level][positions[found]], weights=counts[found],
+                minlength=len(self.names[level])).astype(np.int64)
+        return totals, int(counts[~found].sum())
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def subject_index(reference, index_dir=None, rebuild=False, verbose=True):
+    '''
+    Returns the subject index of a RefSeq fasta file, from index_dir if it
+    was built from the same file, or builds it and saves it there. The
+    headers are read from the offset index of fasta_index (the .fidx file),
+    which is built if needed.
+
+    Parameters
+    ----------
+    reference : STR
+        The reference fasta file (plain or compressed), such as
+        RefSeq_bac.fa.
+    index_dir : STR, optional
+        The index directory. The default is None, which uses the reference
+        path plus '.subjects'.
+    rebuild : BOOL, optional
+        If True, the index is built even if it is up to date. The default is
+        False.
+    verbose : BOOL, optional
+        If True, prints whether the index was built. The default is True.
+
+    Returns
+    -------
+    index : SubjectIndex
+
+    '''
+    if index_dir is None:
+        index_dir = str(reference) + INDEX_SUFFIX
+    manifest = source_manifest([reference], LEVELS)
+    manifest['index_version'] = INDEX_VERSION
+    manifest_file = os.path.join(index_dir, MANIFEST_FILE)
+    if not rebuild and os.path.exists(manifest_file):
+        with open(manifest_file) as cached:
+            try:
+                cached_manifest = json.load(cached)
+            except ValueError:
+                cached_manifest = None
+        if cached_manifest == manifest:
+            return SubjectIndex.load(index_dir)
+
+    entries = read_fasta_index(reference)
+    if entries is None:
+        entries = build_fasta_index(reference, verbose=verbose)
+    index = SubjectIndex.from_headers(entries)
+    try:
+        index.save(index_dir, manifest)
+        if verbose:
+            print('Indexed {} subject ids in {}'.format(len(index),
+                                                        index_dir))
+    except OSError as error:
+        if verbose:
+            print('Could not save the subject index in {}: {}'.format(
+                index_dir, error))
+    return index
+
+def count_subject_hits(tab_file, block_size=BLOCK_SIZE):
+    '''
+    Counts the hits of each subject id (the second column) in a DIAMOND
+    tabular file, plain or compressed, reading it once in large blocks.
+
+    Returns
+    -------
+    hits : COUNTER
+        The number of hits of each subject id, as bytes.
+
+    '''
+    hits = Counter()
+    rest = b''
+    with open_input(tab_file, 'rb') as tab:
+        for block in iter(lambda: tab.read(block_size), b''):
+            lines = (rest + block).split(b'\n')
+            rest = lines.pop()
+            hits.update(line.split(b'\t', 2)[1] for line in lines
+                        if b'\t' in line)
+    if b'\t' in rest:
+        hits[rest.split(b'\t', 2)[1]] += 1
+    return hits
+
+def write_counts_table(totals, names, output_file, total=None):
+    '''
+    Writes the hits of each name as the tab-separated tables of
+    DIAMOND_analysis_counter.py: percentage of the hits, hits and name,
+    from the most to the least frequent, without a header. Hits without a
+    name (headers without an organism, for instance) are left out of the
+    table, since the DESeq2 scripts use the names as row names. The table is
+    written to a temporary file and then renamed.
+
+    Parameters
+    ----------
+    totals : ARRAY
+        The hits of each name, indexed by the codes of the names.
+    names : ARRAY
+        The names, as bytes.
+    output_file : STR
+        The output table.
+    total : INT, optional
+        The hits the percentages are relative to. The default is None, which
+        uses the sum of totals.
+
+    Returns
+    -------
+    rows : INT
+        The number of names written.
+
+    '''
+    if total is None:
+        total = totals.sum()
+    order = np.argsort(-totals, kind='stable')
+    temporary = '{}.{}.tmp'.format(output_file, os.getpid())
+    rows = 0
+    with open(temporary, 'w') as output:
+        for code in order:
+            count = int(totals[code])
+            if not count:
+                break
+            name = names[code].decode('utf-8', 'replace')
+            if not name:
+                continue
+            output.write('{}\t{}\t{}\n'.format(count / total * 100, count,
+                                                name))
+            rows += 1
+    os.replace(temporary, output_file)
+    return rows
+
+def output_files(tab_file, org_dir=None, func_dir=None):
+    '''
+    Returns the organism and function tables of a DIAMOND tabular file: its
+    name plus '_organism.tsv' and '_function.tsv', in org_dir and func_dir
+    (by default, next to it).
+    '''
+    base = os.path.basename(tab_file)
+    org_dir = os.path.dirname(tab_file) if org_dir is None else org_dir
+    func_dir = os.path.dirname(tab_file) if func_dir is None else func_dir
+    return (os.path.join(org_dir, base + '_organism.tsv'),
+            os.path.join(func_dir, base + '_function.tsv'))
+
+def aggregate_diamond_file(tab_file, index, org_dir=None, func_dir=None):
+    '''
+    Counts the organisms and functions of a DIAMOND tabular file in a single
+    pass, and writes both tables (see output_files()). As in
+    DIAMOND_analysis_counter.py, the percentages are relative to all the
+    hits of the file, including the ones of subject ids missing from the
+    index and the ones without an organism or function.
+
+    Returns
+    -------
+    summary : DICT
+        The 'file', its 'hits', the 'unmatched' hits (subject ids missing
+        from the index) and the numbers of 'organisms' and 'functions'.
+
+    '''
+    hits = count_subject_hits(tab_file)
+    n_hits = sum(hits.values())
+    totals, unmatched = index.aggregate(hits)
+    rows = {}
+    for level, output_file in zip(LEVELS, output_files(tab_file, org_dir,
+                                                       func_dir)):
+        rows[level] = write_counts_table(totals[level], index.names[level],
+                                         output_file, total=n_hits)
+    # the named organisms and functions, as in the tables
+    return {'file': tab_file, 'hits': n_hits,
+            'unmatched': unmatched,
+            'organisms': rows['organism'],
+            'functions': rows['function']}
+
+
+_worker_index = None
+
+def _init_worker(index_dir):
+    global _worker_index
+    _worker_index = SubjectIndex.load(index_dir)
+
+def _aggregate_job(tab_file, org_dir, func_dir):
+    return aggregate_diamond_file(tab_file, _worker_index, org_dir, func_dir)
+
+def aggregate_diamond_files(tab_files, reference, index_dir=None,
+                            org_dir=None, func_dir=None, workers=None,
+                            verbose=True):
+    '''
+    Counts the organisms and functions of many DIAMOND tabular files
+    (samples) in parallel, each one in a single pass.
+
+    Parameters
+    ----------
+    tab_files : LIST
+        The DIAMOND tabular files, such as the *RefSeq_annotated files of
+        SAMSA2.
+    reference : STR
+        The reference fasta file of the DIAMOND database.
+    index_dir : STR, optional
+        The directory of the subject index. The default is None, which uses
+        the reference path plus '.subjects'.
+    org_dir : STR, optional
+        The directory of the organism tables. The default is None, which
+        writes them next to the tabular files.
+    func_dir : STR, optional
+        The directory of the function tables. The default is None, which
+        writes them next to the tabular files.
+    workers : INT, optional
+        The number of processes, which share the memory-mapped index. The
+        default is None, which uses the number of CPUs (no more than the
+        number of files).
+    verbose : BOOL, optional
+        If True, prints a summary of each file. The default is True.
+
+    Returns
+    -------
+    summaries : LIST
+        The summary of each file, as returned by aggregate_diamond_file().
+
+    '''
+    if index_dir is None:
+        index_dir = str(reference) + INDEX_SUFFIX
+    index = subject_index(reference, index_dir, verbose=verbose)
+    tab_files = [str(tab_file) for tab_file in tab_files]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tab_files)))
+    if workers == 1 or not os.path.exists(os.path.join(index_dir,
+                                                       MANIFEST_FILE)):
+        summaries = [aggregate_diamond_file(tab_file, index, org_dir,
+                                            func_dir)
+                     for tab_file in tab_files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(index_dir,)) as pool:
+            summaries = list(pool.map(_aggregate_job, tab_files,
+                                      [org_dir] * len(tab_files),
+                                      [func_dir] * len(tab_files)))
+    if verbose:
+        for summary in summaries:
+            print('{file}: {hits} hits, {organisms} organisms, {functions} '
+                  'functions, {unmatched} hits not in the index'
+                  .format(**summary))
+    return summaries
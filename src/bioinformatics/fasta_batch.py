@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:11:52 2026
+
+@author: vrrodovalho
+
+This script contains batch versions of the sequence filters, which pack
+sequences into contiguous NumPy buffers and evaluate the size and alphabet
+filters with a few array operations per chunk.
+
+"""
+
+import numpy as np
+
+
+FILTERS = ['seq_size', 'seq_char', 'id_list_out', 'id_list_in']
+
+
+def pack_sequences(sequences):
+    '''
+    Packs sequences into a contiguous buffer with an offsets array.
+
+    Parameters
+    ----------
+    sequences : LIST
+        List of sequences (STR or BYTES).
+
+    Returns
+    -------
+    buffer : ARRAY
+        uint8 array with all the residues, one sequence after the other.
+    offsets : ARRAY
+        int64 array of len(sequences) + 1 positions, such that sequence i
+        is buffer[offsets[i]:offsets[i+1]].
+
+    '''
+    encoded = [s.encode('ascii') if isinstance(s, str) else s
+               for s in sequences]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64,
+                          count=len(encoded)), out=offsets[1:])
+    buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return buffer, offsets
+
+def residue_lut(chars):
+    '''
+    Builds a 256-entry lookup table marking chars, in both cases.
+    '''
+    lut = np.zeros(256, dtype=np.uint8)
+    for char in chars:
+        lut[ord(char.upper())] = 1
+        lut[ord(char.lower())] = 1
+    return lut
+
+def count_residues(buffer, offsets, lut):
+    '''
+    Counts, for each packed sequence, the residues marked in a lookup table.
+
+    Parameters
+    ----------
+    buffer : ARRAY
+        uint8 array of packed sequences (see pack_sequences).
+    offsets : ARRAY
+        Offsets of the packed sequences.
+    lut : ARRAY
+        256-entry lookup table (see residue_lut).
+
+    Returns
+    -------
+    ARRAY
+        int64 array with one count per sequence.
+
+    '''
+    n_sequences = len(offsets) - 1
+    if not len(buffer):
+        return np.zeros(n_sequences, dtype=np.int64)
+    hits = lut[buffer]
+    # reduceat needs valid indices and returns hits[i] for empty slices,
+    # so empty sequences are clipped here and zeroed below
+    starts = np.minimum(offsets[:-1], len(buffer) - 1)
+    counts = np.add.reduceat(hits, starts, dtype=np.int64)
+    counts[offsets[1:] == offsets[:-1]] = 0
+    return counts
+
+def chunk_masks(ids, buffer, offsets, filter_by, min_seq_len=35,
+                forbidden=['B','J','O','U','X','Z'], char_mode='all',
+                id_matches=None):
+    '''
+    Evaluates the filters on a chunk of packed sequences.
+
+    Parameters
+    ----------
+    ids : LIST
+        The fasta_ids of the chunk.
+    buffer : ARRAY
+        uint8 array of packed sequences (see pack_sequences).
+    offsets : ARRAY
+        Offsets of the packed sequences.
+    filter_by : DICT
+        Dictionary specifying which filters should be applied
+        (see fasta_filters.filter_sequences).
+    min_seq_len : INT, optional
+        Minimum size accepted for the sequences. The default is 35.
+    forbidden : LIST, optional
+        List of forbidden characters for the sequences.
+        The default is ['B','J','O','U','X','Z'].
+    char_mode : STR, optional
+        Whether sequences are filtered out when they contain 'any' or 'all'
+        the forbidden characters. The default is 'all'.
+    id_matches : FUNCTION, optional
+        Function telling whether a fasta_id matches the id list
+        (see id_matchers.make_id_matcher). The default is None.
+
+    Returns
+    -------
+    masks : DICT
+        One boolean array per filter, True for the sequences that the
+        filter removes, plus 'keep', True for the sequences kept in.
+
+    '''
+    n_sequences = len(ids)
+    masks = {name: np.zeros(n_sequences, dtype=bool) for name in FILTERS}
+
+    if filter_by['seq_size']:
+        masks['seq_size'] = np.diff(offsets) < min_seq_len
+
+    if filter_by['seq_char']:
+        if char_mode == 'any':
+            counts = count_residues(buffer, offsets, residue_lut(forbidden))
+            masks['seq_char'] = counts > 0
+        elif char_mode == 'all':
+            mask = np.ones(n_sequences, dtype=bool)
+            for char in forbidden:
+                mask &= count_residues(buffer, offsets, residue_lut(char)) > 0
+            masks['seq_char'] = mask
+        else:
+            raise ValueError("char_mode should be 'any' or 'all'.")
+
+    # filter out is prioritary
+    if filter_by['id_list_out']:
+        masks['id_list_out'] = np.fromiter(map(id_matches, ids), dtype=bool,
+                                           count=n_sequences)
+    elif filter_by['id_list_in']:
+        masks['id_list_in'] = ~np.fromiter(map(id_matches, ids), dtype=bool,
+                                           count=n_sequences)
+
+    removed = np.zeros(n_sequences, dtype=bool)
+    for name in FILTERS:
+        removed |= masks[name]
+    masks['keep'] = ~removed
+    return masks
+
+def filter_masks(records, filter_by, min_seq_len=35,
+                 forbidden=['B','J','O','U','X','Z'], char_mode='all',
+                 id_matches=None, chunk_size=65536):
+    '''
+    Evaluates the filters over (fasta_id, sequence) records, in chunks.
+
+    Parameters
+    ----------
+    records : ITERABLE
+        (fasta_id, sequence) tuples, e.g. dict.items() or iter_fasta().
+    chunk_size : INT, optional
+        Number of sequences packed at a time. The default is 65536.
+    Other parameters are described in chunk_masks.
+
+    Returns
+    -------
+    masks : DICT
+        One boolean array per filter for all the records, plus 'keep'.
+    counts : DICT
+        Number of sequences removed by each filter.
+
+    '''
+    chunks = []
+    ids, seqs = [], []
+    for fasta_id, sequence in records:
+        ids.append(fasta_id)
+        seqs.append(sequence)
+        if len(ids) == chunk_size:
+            buffer, offsets = pack_sequences(seqs)
+            chunks.append(chunk_masks(ids, buffer, offsets, filter_by,
+                                      min_seq_len, forbidden, char_mode,
+                                      id_matches))
+            ids, seqs = [], []
+    if ids or not chunks:
+        buffer, offsets = pack_sequences(seqs)
+        chunks.append(chunk_masks(ids, buffer, offsets, filter_by,
+                                  min_seq_len, forbidden, char_mode,
+                                  id_matches))
+    masks = {name: np.concatenate([chunk[name] for chunk in chunks])
+             for name in chunks[0]}
+    counts = {name: int(masks[name].sum()) for name in FILTERS}
+    return masks, counts
+
+def collection_masks(collection, filter_by, min_seq_len=35,
+                     forbidden=['B','J','O','U','X','Z'], char_mode='all',
+                     id_matches=None):
+    '''
+    Evaluates the filters over a SequenceCollection, using its buffers 
+    directly instead of packing the sequences again.
+
+    Parameters
+    ----------
+    collection : SequenceCollection
+        The sequences to be filtered.
+    Other parameters are described in chunk_masks.
+
+    Returns
+    -------
+    masks : DICT
+        One boolean array per filter for all the records, plus 'keep'.
+    counts : DICT
+        Number of sequences removed by each filter.
+
+    '''
+    buffer = np.frombuffer(collection.residues, dtype=np.uint8)
+    offsets = np.frombuffer(collection.offsets, dtype=np.int64)
+    masks = chunk_masks(collection, buffer, offsets, filter_by,
+                        min_seq_len, forbidden, char_mode, id_matches)
+    counts = {name: int(masks[name].sum()) for name in FILTERS}
+    return masks, counts
@@ -0,0 +1,825 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jun 12 13:48:34 2019
+
+@author: vrrodovalho
+
+This script performs fasta parsing, filtering and exporting.
+
+"""
+
+import os
+import codecs
+import pathlib
+import itertools
+from .fasta_index import FastaIndex
+from .compressed_io import open_input, open_output
+from .id_matchers import make_id_matcher
+from .profiling import stage
+from .sequence_collection import SequenceCollection, SequenceView
+
+
+# numbers the temporary files of the writers of this process
+_tmp_numbers = itertools.count()
+# sequences at least this long are wrapped with NumPy, if it is installed
+WRAP_ARRAY_MIN = 4096
+
+
+def _read_line_blocks(input_file, block_size, limit=None):
+    '''
+    Reads a binary file in blocks and yields lists of complete lines.
+
+    Parameters
+    ----------
+    input_file : FILE
+        An open binary file handle.
+    block_size : INT
+        Number of bytes read at each call.
+    limit : INT, optional
+        Maximum number of bytes to be read. The default is None (no limit).
+
+    Yields
+    ------
+    LIST
+        The complete lines (decoded, without newlines) found in each block. 
+        The last, possibly incomplete, line of a block is carried over to 
+        the next one.
+
+    '''
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    tail = ''
+    while limit is None or limit > 0:
+        size = block_size if limit is None else min(block_size, limit)
+        block = input_file.read(size)
+        if not block:
+            break
+        if limit is not None:
+            limit -= len(block)
+        lines = (tail + decoder.decode(block)).split('\n')
+        tail = lines.pop()
+        yield lines
+    tail += decoder.decode(b'', final=True)
+    if tail:
+        yield [tail]
+
+def iter_fasta(fasta_file, forbidden_lines=['',' '], duplicated_ids=None,
+               block_size=1048576, start=0, end=None):
+    '''
+    Iterates over a fasta file, yielding one record at a time.
+
+    Only the record being read is kept in memory, so files larger than RAM
+    can be streamed through the filtering and exporting functions.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        path of the fasta file, which may be compressed with gzip, BGZF or
+        zstd (see compressed_io.open_input).
+    forbidden_lines : LIST, optional
+        Lines that should be ignored. The default is ['',' '].
+    duplicated_ids : DICT, optional
+        If a dictionary is given, records whose fasta_id was already seen
+        are stored in it instead of being yielded (the last one wins). 
+        This requires keeping the set of seen ids in memory.
+        If None, duplicated ids are not checked. The default is None.
+    block_size : INT, optional
+        Number of bytes read from the file at a time. 
+        The default is 1048576.
+    start : INT, optional
+        Byte position (in the uncompressed data) where reading starts. It 
+        should be the start of a record (see fasta_parallel.split_fasta_ranges). 
+        The default is 0.
+    end : INT, optional
+        Byte position where reading stops. The default is None, meaning
+        the end of the file.
+
+    Yields
+    ------
+    TUPLE
+        A (fasta_id, sequence) tuple for each record.
+
+    '''
+    seen = set()
+    fasta_id = None
+    duplicated = False
+    pieces = []
+    
+    limit = None if end is None else end - start
+    
+    with open_input(fasta_file) as input_file:
+        if start:
+            input_file.seek(start)
+        for lines in _read_line_blocks(input_file, block_size, limit):
+            for line in lines:
+                if line.startswith(">"):
+                    if fasta_id is not None:
+                        if duplicated:
+                            duplicated_ids[fasta_id] = ''.join(pieces)
+                        else:
+                            yield fasta_id, ''.join(pieces)
+                    fasta_id = line[1:].strip()
+                    pieces = []
+                    if duplicated_ids is not None:
+                        duplicated = fasta_id in seen
+                        seen.add(fasta_id)
+                elif fasta_id is None or line in forbidden_lines:
+                    pass
+                else:
+                    pieces.append(line.strip())
+    if fasta_id is not None:
+        if duplicated:
+            duplicated_ids[fasta_id] = ''.join(pieces)
+        else:
+            yield fasta_id, ''.join(pieces)
+
+def fasta_parser(fasta_file, forbidden_lines=['',' '], verbose=True, 
+                 collection=False):
+    '''
+    Parses a fasta file into a dictionary, accounting for duplicated ids.
+
+    Parameters
+    ----------
+    fasta_file : path.
+        path of the fasta file.
+    forbidden_lines : STR, optional
+        Lines that should be ignored. The default is ['',' '].
+    verbose : BOOL, optional
+        Describe number of sequences if true. The default is True.
+    collection : BOOL, optional
+        Whether to store the unique sequences in a SequenceCollection, 
+        which uses much less memory than a dictionary for many short 
+        sequences. The default is False.
+
+    Returns
+    -------
+    final : Dictionary
+        A dictionary in which fasta_ids are the keys and the sequences
+        are the values.
+
+    '''
+
+    with stage('fasta_parser') as metrics:
+        duplicated_ids = {}
+        records = iter_fasta(fasta_file, forbidden_lines=forbidden_lines, 
+                             duplicated_ids=duplicated_ids)
+        if collection:
+            sequences = SequenceCollection.from_records(records)
+        else:
+            sequences = dict(records)
+        metrics.add(records=len(sequences), 
+                    files_read=[fasta_file])
+    if duplicated_ids:
+        final = (sequences, duplicated_ids)
+        if verbose:
+            print("\nGot {} unique fasta ids!".format(len(sequences))) 
+            print("Got {} duplicated fasta ids!".format(len(duplicated_ids)))
+    else:
+        final = sequences
+        if verbose:
+            print("\nGot {} unique fasta ids!".format(len(sequences))) 
+    return final
+
+def fasta_extract(fasta_file, ids, key=None, index_file=None, verbose=True):
+    '''
+    Extracts some sequences from a fasta file, using its offset index.
+    
+    The index is built on the first call and reused afterwards, so only the
+    requested records are read from the fasta file.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        path of the fasta file.
+    ids : LIST
+        List of ids to be extracted.
+    key : FUNCTION, optional
+        Function applied to each fasta_id to get the key matched against ids. 
+        The default is None, meaning the whole fasta_id.
+    index_file : PATH, optional
+        Path of the index file. The default is the fasta path plus '.fidx'.
+    verbose : BOOL, optional
+        Describe number of sequences if true. The default is True.
+
+    Returns
+    -------
+    sequences : DICT
+        A dictionary in which fasta_ids are the keys and the sequences
+        are the values.
+
+    '''
+    missing = []
+    with FastaIndex(fasta_file, index_file=index_file, key=key, 
+                    verbose=verbose) as index:
+        sequences = dict(index.fetch_many(ids, missing=missing))
+    if verbose:
+        print("\nExtracted {} fasta ids!".format(len(sequences)))
+        if missing:
+            print("{} ids were not found!".format(len(missing)))
+    return sequences
+
+def iter_list(list_file, forbidden_lines=['',' ']):
+    '''
+    Iterates over the ids of a list file, one per line.
+
+    Parameters
+    ----------
+    list_file : PATH
+        The path of a list file, which may be compressed with gzip, BGZF or
+        zstd (see compressed_io.open_input).
+    forbidden_lines : LIST, optional
+        Lines that should be ignored. The default is ['',' '].
+
+    Yields
+    ------
+    STR
+        Each id, stripped of surrounding whitespace.
+
+    '''
+    forbidden_lines = frozenset(forbidden_lines)
+    with open_input(list_file, 'rt') as input_file:
+        for line in input_file:
+            line = line.strip()
+            if line not in forbidden_lines:
+                yield line
+
+def list_parser(list_file, forbidden_lines=['',' '], verbose=True, 
+                as_set=False):
+    '''
+    Parse a file containing a list of ids.
+
+    Parameters
+    ----------
+    list_file : PATH
+        The path of a list file.
+    forbidden_lines : LIST, optional
+        Lines that should be ignored. The default is ['',' '].
+    verbose : BOOL, optional
+        Whether to print or not informative strings about the filtering 
+        process. The default is True.
+    as_set : BOOL, optional
+        Whether to return the unique ids as a frozenset, for O(1) membership
+        tests, instead of a list in file order. The default is False.
+
+    Returns
+    -------
+    LIST
+        The list(s) parsed from the file, with duplicated elements
+        identified, if that is the case.
+
+    '''
+    
+    # a dict keeps insertion order and gives O(1) duplicate checks
+    ids = {}
+    duplicated_ids = []
+    
+    with stage('list_parser') as metrics:
+        for line in iter_list(list_file, forbidden_lines=forbidden_lines):
+            if line in ids:
+                duplicated_ids.append(line)
+            else:
+                ids[line] = None
+        metrics.add(records=len(ids) + len(duplicated_ids), 
+                    files_read=[list_file])
+    if as_set:
+        ids = frozenset(ids)
+    else:
+        ids = list(ids)
+    len_ids = len(ids)
+    len_dup = len(duplicated_ids)
+    if duplicated_ids:
+        if verbose:
+            print("\nGot {} unique ids and {} duplicated ids".format(
+                   len_ids, len_dup))
+        return (ids, duplicated_ids)
+    else:
+        if verbose:
+            print("\nGot {} unique ids in the list.".format(len_ids))
+        return ids
+
+def filter_sequences(sequences, 
+                     min_seq_len=35,
+                     forbidden=['B','J','O','U','X','Z'],
+                     id_filters=[],
+                     filter_by={'seq_size':False,
+                                'seq_char':False,
+                                'id_list_in':False,
+                                'id_list_out':False},
+                     id_match='substring',
+                     char_mode='all',
+                     batch=False,
+                     chunk_size=65536,
+                     counts=None,
+                     explain=True,
+                     id_matches=None):
+    '''
+    Filter a dictionary containing fasta ids and sequences, based on
+    sequence size, sequence alphabet, and allowed of forbidden ids.
+
+    Parameters
+    ----------
+    sequences : DICT
+        Fasta dictionary. A SequenceCollection (or a view of one) is also 
+        accepted, in which case the results are views of it instead of 
+        new dictionaries.
+    min_seq_len : INT, optional
+        Minimum size accepted for the sequences. The default is 35.
+    forbidden : LIST, optional
+        List of forbidden characters for the sequences. 
+        The default is ['B','J','O','U','X','Z'].
+    id_filters : LIST, optional
+        List of strings to be applied in fasta_id filters. 
+        The default is [].
+    filter_by : DICT, optional
+        Dictionary specifying which filters should be applied. 
+        The default is {'seq_size':False,
+                        'seq_char':False,
+                        'id_list_in':False,
+                        'id_list_out':False}.
+        seq_size    Refers to filter by size. 
+                    If True, min_seq_len should be specified.
+        seq_char    Refers to filter out sequences containing forbidden 
+                    characters. If True, forbidden should be specified.
+        id_list_in  Filter keeping only fasta_ids containing or matching
+                    strings in id_list_in 
+        id_list_out Filter taking out only fasta_ids containing or matching
+                    strings in id_list_out
+        Attention: id_list_out is prioritary over id_list_in.
+    id_match : STR, optional
+        How fasta_ids are matched against id_filters. Possible values: 
+        ['accession','token','substring','naive'] (see make_id_matcher).
+        The default is 'substring'.
+    char_mode : STR, optional
+        Whether seq_char filters out only the sequences containing 'all' 
+        the forbidden characters (the behaviour of previous versions), or 
+        those containing 'any' of them. The default is 'all'.
+    batch : BOOL, optional
+        Whether to evaluate the filters with NumPy over packed chunks of
+        sequences (see fasta_batch). The default is False.
+    chunk_size : INT, optional
+        Number of sequences per chunk, in batch mode. The default is 65536.
+    counts : DICT, optional
+        If a dictionary is given, it is updated with the number of sequences
+        removed by each filter ('seq_size', 'seq_char', 'id_list_out' and
+        'id_list_in'). The default is None.
+    explain : BOOL, optional
+        Whether to print or not informative strings about the filtering 
+        process. The default is True.
+    id_matches : FUNCTION, optional
+        A matcher already built by make_id_matcher, used instead of building
+        one from id_filters and id_match, when the same filters are applied
+        to many dictionaries. The default is None.
+
+    Returns
+    -------
+    DICT
+        A dictionary if no filters were applied.
+        Otherwise, two dictionaries (one with the sequences filtered out 
+                                     and another with the sequences kept in.)
+
+    '''
+
+    if char_mode not in ['any', 'all']:
+        raise ValueError("char_mode should be 'any' or 'all'.")
+    if id_matches is None and (filter_by['id_list_out'] or 
+                               filter_by['id_list_in']):
+        id_matches = make_id_matcher(id_filters, mode=id_match)
+    with stage('filter_sequences') as metrics:
+        if batch:
+            filtered = _filter_sequences_batch(sequences, min_seq_len, 
+                                               forbidden, filter_by, 
+                                               id_matches, char_mode, 
+                                               chunk_size, counts, explain)
+        else:
+            filtered = _filter_sequences_loop(sequences, min_seq_len, 
+                                              forbidden, filter_by, 
+                                              id_matches, char_mode, counts,
+                                              explain)
+        metrics.add(records=len(sequences))
+    return filtered
+
+def _filter_sequences_loop(sequences, min_seq_len, forbidden, filter_by,
+                           id_matches, char_mode, counts, explain):
+    '''
+    Default mode of filter_sequences, one sequence at a time, with the same
+    parameters and returns.
+    '''
+    # collections are filtered into views, other inputs into dictionaries
+    is_collection = isinstance(sequences, (SequenceCollection, SequenceView))
+    keep = bytearray()
+    filtered_in = {}
+    filtered_out = {}
+    size_filter, char_filter, id_filter_out, id_filter_in = 0, 0, 0, 0
+    forbidden_chars = frozenset(forbidden).union(
+        char.lower() for char in forbidden)
+    for fasta_id, seq in sequences.items():
+        filter_activated = False
+        
+        seq_len = len(seq)
+        
+        # filter by sequence size
+        if filter_by['seq_size']:
+            if seq_len < min_seq_len:
+                size_filter += 1
+                filter_activated = True
+
+        # filter by sequence characters
+        if filter_by['seq_char']:
+            if char_mode == 'any':
+                forbidden_found = not forbidden_chars.isdisjoint(seq)
+            else:
+                upper_seq = seq.upper()
+                forbidden_found = all(char in upper_seq for char in forbidden)
+            if forbidden_found:
+                char_filter += 1
+                filter_activated = True
+
+        # filter by ID expressions (filter out or in)
+        # filter out is prioritary
+        if filter_by['id_list_out']:
+            if id_matches(fasta_id):
+                id_filter_out += 1
+                filter_activated = True
+        elif filter_by['id_list_in']:
+            if not id_matches(fasta_id):
+                id_filter_in += 1
+                filter_activated = True
+        
+        # if no filters out are applied, apply filter in
+        if is_collection:
+            keep.append(not filter_activated)
+        elif filter_activated:
+            filtered_out[fasta_id] = seq
+        else:
+            filtered_in[fasta_id] = seq
+        filter_activated = False
+    
+    if is_collection:
+        filtered_in = sequences.select(keep)
+        filtered_out = sequences.select([not value for value in keep])
+            
+    # Stats
+    filter_counts = {'seq_size': size_filter, 'seq_char': char_filter, 
+                     'id_list_out': id_filter_out, 'id_list_in': id_filter_in}
+    if counts is not None:
+        counts.update(filter_counts)
+    if explain:
+        explain_filtering(len(sequences), len(filtered_in), filter_counts, 
+                          min_seq_len, forbidden)
+    
+    if filtered_out:
+        return {'in' : filtered_in, 'out': filtered_out}
+    else:
+        return filtered_in
+
+def _filter_sequences_batch(sequences, min_seq_len, forbidden, filter_by,
+                            id_matches, char_mode, chunk_size, counts,
+                            explain):
+    '''
+    Batch mode of filter_sequences, with the same parameters and returns.
+    '''
+    from .fasta_batch import filter_masks, collection_masks
+    
+    if isinstance(sequences, SequenceCollection):
+        masks, filter_counts = collection_masks(sequences, filter_by, 
+                                                min_seq_len=min_seq_len, 
+                                                forbidden=forbidden,
+                                                char_mode=char_mode, 
+                                                id_matches=id_matches)
+    else:
+        masks, filter_counts = filter_masks(sequences.items(), filter_by,
+                                            min_seq_len=min_seq_len, 
+                                            forbidden=forbidden,
+                                            char_mode=char_mode, 
+                                            id_matches=id_matches,
+                                            chunk_size=chunk_size)
+    if isinstance(sequences, (SequenceCollection, SequenceView)):
+        filtered_in = sequences.select(masks['keep'])
+        filtered_out = sequences.select(~masks['keep'])
+    else:
+        filtered_in = {}
+        filtered_out = {}
+        for (fasta_id, sequence), keep in zip(sequences.items(), 
+                                              masks['keep']):
+            if keep:
+                filtered_in[fasta_id] = sequence
+            else:
+                filtered_out[fasta_id] = sequence
+    if counts is not None:
+        counts.update(filter_counts)
+    if explain:
+        explain_filtering(len(sequences), len(filtered_in), filter_counts, 
+                          min_seq_len, forbidden)
+    if filtered_out:
+        return {'in' : filtered_in, 'out': filtered_out}
+    else:
+        return filtered_in
+
+def explain_filtering(len_sequences, len_filtered, counts, min_seq_len, 
+                      forbidden):
+    '''
+    Prints informative strings about a filtering process.
+
+    Parameters
+    ----------
+    len_sequences : INT
+        Number of sequences before filtering.
+    len_filtered : INT
+        Number of sequences kept in.
+    counts : DICT
+        Number of sequences removed by each filter ('seq_size', 'seq_char',
+        'id_list_out' and 'id_list_in').
+    min_seq_len : INT
+        Minimum size accepted for the sequences.
+    forbidden : LIST
+        List of forbidden characters for the sequences.
+
+    Returns
+    -------
+    None.
+
+    '''
+    len_removed = len_sequences - len_filtered
+    pct = len_filtered * 100.00 / len_sequences if len_sequences else 0.0
+    print("\nFiltering results:")
+    print("Initially, there were {} sequences.".format(len_sequences))
+    print('Filtered out {} sequences with less than {} amino acids'.format(
+        counts['seq_size'], min_seq_len))
+    print('Filtered out {} sequences containing {} chars'.format(
+        counts['seq_char'], ','.join(forbidden)))
+    print('Filtered out {} sequences containing ids in list'.format(
+        counts['id_list_out']))
+    print('Filtered out {} sequences not containing ids in list'.format(
+        counts['id_list_in']))
+    print(">> Filtered out {} of {} sequences.".format(len_removed, 
+                                                       len_sequences))
+    print(">> Kept {} ({:.2f} %) sequences.".format(len_filtered, pct))
+    return None
+
+
+def insert_newlines(string, every=64):
+    '''
+    Insert periodic newlines in a string.
+
+    Parameters
+    ----------
+    string : STR
+        String that will be modified.
+    every : INT, optional
+        Periodic position in which the string will be modified.
+        The default is 64.
+
+    Returns
+    -------
+    STR
+        The modified string, with periodic newlines.
+
+    '''
+    return '\n'.join(string[i:i+every] for i in range(0, len(string), every))
+
+
+def wrap_sequence(sequence, every=64):
+    '''
+    Insert periodic newlines in a sequence, like insert_newlines, with a
+    shortcut for sequences that fit in one line and a fixed-width path for
+    long ones (see benchmarks/bench_wrap.py).
+    '''
+    length = len(sequence)
+    if length <= every:
+        return sequence
+    if length >= WRAP_ARRAY_MIN and sequence.isascii():
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+        else:
+            return _wrap_array(sequence, every, np)
+    return '\n'.join([sequence[i:i+every] 
+                      for i in range(0, length, every)])
+
+def _wrap_array(sequence, every, np):
+    '''
+    Wraps an ASCII sequence by copying it into the rows of an array of
+    lines of every + 1 bytes, which end in newlines.
+    '''
+    residues = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)
+    full, rest = divmod(len(residues), every)
+    lines = np.full((full + bool(rest), every + 1), ord('\n'), 
+                    dtype=np.uint8)
+    lines[:full, :every] = residues[:full * every].reshape(full, every)
+    lines[full:, :rest] = residues[full * every:]
+    # without the newline after the last line
+    size = full * (every + 1) + rest if rest else full * (every + 1) - 1
+    return lines.reshape(-1)[:size].tobytes().decode('ascii')
+
+
+class FastaWriter():
+    '''
+    Writes fasta records through a large buffer, optionally compressed.
+    
+    Records are written to a temporary file in the output directory, which
+    is renamed to the output path only when the writer is closed without
+    errors, so readers never see a half-written file.
+
+    Parameters
+    ----------
+    output_path : PATH
+        Path of the output file.
+    every : INT, optional
+        Number of residues per line. The default is 64.
+    compression : STR, optional
+        Possible values: [None, 'gzip', 'bgzf']. The default is None.
+    buffer_size : INT, optional
+        Number of characters accumulated before each write.
+        The default is 1048576.
+    atomic : BOOL, optional
+        Whether to write to a temporary file and rename it on completion.
+        The default is True.
+
+    '''
+
+    def __init__(self, output_path, every=64, compression=None, 
+                 buffer_size=1048576, atomic=True):
+        self.output_path = str(output_path)
+        self.every = every
+        self.buffer_size = buffer_size
+        if atomic:
+            # unique to each writer, even for threads writing the same path
+            self.tmp_path = '{}.tmp{}.{}'.format(self.output_path, 
+                                                 os.getpid(), 
+                                                 next(_tmp_numbers))
+            raw = open(self.tmp_path, 'xb', buffering=buffer_size)
+        else:
+            self.tmp_path = self.output_path
+            raw = open(self.tmp_path, 'wb', buffering=buffer_size)
+        try:
+            self._out = open_output(raw, compression=compression)
+        except BaseException:
+            raw.close()
+            os.remove(self.tmp_path)
+            raise
+        self._pending = []
+        self._pending_size = 0
+        self.n_records = 0
+
+    def write(self, fasta_id, sequence):
+        '''
+        Writes one record.
+        '''
+        entry = ">{}\n{}\n".format(fasta_id, 
+                                    wrap_sequence(sequence, self.every))
+        self._pending.append(entry)
+        self._pending_size += len(entry)
+        self.n_records += 1
+        if self._pending_size >= self.buffer_size:
+            self._flush_pending()
+
+    def write_records(self, records):
+        '''
+        Writes (fasta_id, sequence) records from a dictionary or any iterable.
+        '''
+        if hasattr(records, 'items'):
+            records = records.items()
+        for fasta_id, sequence in records:
+            self.write(fasta_id, sequence)
+        return self.n_records
+
+    def _flush_pending(self):
+        self._out.write(''.join(self._pending).encode())
+        self._pending = []
+        self._pending_size = 0
+
+    def close(self):
+        '''
+        Flushes the records and moves the file to its final path. If this
+        fails (on a full disk, for instance), the writer is aborted.
+        '''
+        if self._out is None:
+            return
+        try:
+            self._flush_pending()
+            self._out.close()
+            self._out = None
+            if self.tmp_path != self.output_path:
+                os.replace(self.tmp_path, self.output_path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        '''
+        Closes the writer and removes the temporary file.
+        '''
+        out, self._out = self._out, None
+        if out is not None:
+            try:
+                out.close()
+            except Exception:
+                # the file is removed anyway
+                pass
+        if (self.tmp_path != self.output_path 
+                and os.path.exists(self.tmp_path)):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def fasta_dict2file(fasta_dict, output_dir, output_file, compression=None):
+    '''
+    Exports a fasta dictionay to a fasta file.
+
+    Parameters
+    ----------
+    fasta_dict : DICT
+        Dictionary containing fasta_ids as keys and sequences as values.
+        Any iterable of (fasta_id, sequence) tuples is also accepted.
+    output_dir : PATH
+        Path of the output directory.
+    output_file : STR
+        Name of the output file.
+    compression : STR, optional
+        Possible values: [None, 'gzip', 'bgzf']. The default is None.
+
+    Returns
+    -------
+    None.
+
+    '''
+    
+    output_path = pathlib.Path(output_dir) / output_file
+    print("\nExporting sequences to file {}".format(output_path))
+    with stage('fasta_dict2file') as metrics:
+        with FastaWriter(output_path, every=64, 
+                         compression=compression) as out:
+            out.write_records(fasta_dict)
+        metrics.add(records=out.n_records, 
+                    files_written=[output_path])
+    return None
+
+
+##############################################################################
+    
+if __name__ == '__main__':
+
+    # DIRECTORY SYSTEM
+    package_dir = os.path.dirname(os.path.realpath(__file__))
+    src_dir = os.path.dirname(package_dir)
+    main_dir = os.path.dirname(src_dir)
+    data_dir = pathlib.Path(main_dir) / 'data'
+    input_dir = pathlib.Path(data_dir) / 'input'
+    output_dir = pathlib.Path(data_dir) / 'output'
+
+    # Redefine input and output directories
+    input_dir = input_dir / 'fasta_filters'
+
+    ### HUMAN PROTEINS
+    # File paths
+    fasta_file = input_dir / 'uniprot-reviewed yes+AND+proteome up000005640.fasta'
+    list_file = input_dir / 'human_proteines_list.txt'
+    # Read files
+    fasta = fasta_parser(fasta_file, forbidden_lines=['',' '], verbose=True)
+    ids_list = list_parser(list_file, forbidden_lines=['',' '], verbose=True)
+    # Filter fasta
+    filtered_fastas = filter_sequences(fasta, 
+                                      min_seq_len=35,
+                                      forbidden=['B','J','O','U','X','Z'],
+                                      id_filters=ids_list,
+                                      filter_by={'seq_size':True,
+                                                 'seq_char':True,
+                                                 'id_list_in':True,
+                                                 'id_list_out':False},
+                                      explain=True)
+    filtered_in  = filtered_fastas['in']
+    filtered_out = filtered_fastas['out']
+    # Export 
+    fasta_dict2file(filtered_in, output_dir=output_dir, 
+                    output_file='filtered_human.fasta')
+
+
+    ##### BACTERIA PROTEINS
+    fasta_file2 = input_dir / 'XXXXXX'
+    list_file2 = input_dir / 'bacteria_proteins_list.txt'
+    # Read files
+    fasta2 = fasta_parser(fasta_file2, forbidden_lines=['',' '], verbose=True)
+    ids_list2 = list_parser(list_file2, forbidden_lines=['',' '], verbose=True)
+    # Filter fasta
+    filtered_fastas = filter_sequences(fasta2, 
+                                      min_seq_len=1,
+                                      forbidden=['B','J','O','U','X','Z'],
+                                      id_filters=ids_list2,
+                                      filter_by={'seq_size':True,
+                                                 'seq_char':True,
+                                                 'id_list_in':True,
+                                                 'id_list_out':False},
+                                      explain=True)
+    filtered_in  = filtered_fastas['in']
+    filtered_out = filtered_fastas['out']
+    # Export 
+    fasta_dict2file(filtered_in, output_dir=output_dir, 
+                    output_file='filtered_bacteria.fasta')
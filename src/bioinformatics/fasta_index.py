@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:02:41 2026
+
+@author: vrrodovalho
+
+This script contains functions to build a persistent offset index of a fasta
+file (similar to samtools faidx) and to retrieve sequences by id without
+parsing the rest of the file.
+
+"""
+
+import os
+import mmap
+
+from .compressed_io import BgzfReader, detect_compression, open_input
+
+
+INDEX_SUFFIX = '.fidx'
+INDEX_MAGIC = '#fasta_index'
+
+
+def scan_fasta_records(fasta_file):
+    '''
+    Scans a fasta file, yielding the position of each record.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        Path of the fasta file, which may be compressed (see 
+        compressed_io.open_input). Offsets refer to the uncompressed data.
+
+    Yields
+    ------
+    TUPLE
+        (fasta_id, length, offset, line_bases, line_width) for each record.
+        offset is the byte position of the first residue, line_bases is the
+        number of residues per line and line_width the number of bytes per
+        line, newline included. A line_bases of 0 marks a record with
+        irregular line widths, in which case line_width holds the number of
+        bytes spanned by the whole sequence.
+
+    '''
+    fasta_id = None
+    pos = 0
+    with open_input(fasta_file) as input_file:
+        for line in input_file:
+            line_start = pos
+            pos += len(line)
+            if line.startswith(b'>'):
+                if fasta_id is not None:
+                    yield _close_record(fasta_id, length, offset, line_bases,
+                                        line_width, end, irregular)
+                fasta_id = line[1:].strip().decode()
+                length, line_bases, line_width = 0, 0, 0
+                offset, end = pos, pos
+                irregular = False
+                short_line = False
+            elif fasta_id is not None:
+                bases = len(line.rstrip(b'\r\n'))
+                if not line_bases:
+                    line_bases, line_width = bases, len(line)
+                    if not bases:
+                        irregular = True
+                elif (short_line or bases > line_bases or
+                      (len(line) != line_width and line.endswith(b'\n'))):
+                    irregular = True
+                if bases < line_bases:
+                    short_line = True
+                if bases != len(line.strip()):
+                    irregular = True
+                length += len(line.strip())
+                end = line_start + len(line)
+    if fasta_id is not None:
+        yield _close_record(fasta_id, length, offset, line_bases, line_width,
+                            end, irregular)
+
+def _close_record(fasta_id, length, offset, line_bases, line_width, end,
+                  irregular):
+    if irregular or not line_bases:
+        return (fasta_id, length, offset, 0, end - offset)
+    return (fasta_id, length, offset, line_bases, line_width)
+
+def build_fasta_index(fasta_file, index_file=None, verbose=True):
+    '''
+    Builds the offset index of a fasta file and saves it next to the file.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        Path of the fasta file.
+    index_file : PATH, optional
+        Path of the index file. The default is the fasta path plus '.fidx'.
+    verbose : BOOL, optional
+        Whether to print or not informative strings. The default is True.
+
+    Returns
+    -------
+    entries : DICT
+        A dictionary in which fasta_ids are the keys and tuples of
+        (length, offset, line_bases, line_width) are the values. For
+        duplicated fasta_ids, only the first record is indexed.
+
+    '''
+    if index_file is None:
+        index_file = str(fasta_file) + INDEX_SUFFIX
+    stat = os.stat(fasta_file)
+
+    entries = {}
+    for fasta_id, *position in scan_fasta_records(fasta_file):
+        if fasta_id not in entries:
+            entries[fasta_id] = tuple(position)
+
+    tmp_file = '{}.tmp{}'.format(index_file, os.getpid())
+    try:
+        with open(tmp_file, 'w') as out:
+            out.write('{}\t{}\t{}\n'.format(INDEX_MAGIC, stat.st_size,
+                                            stat.st_mtime_ns))
+            for fasta_id, position in entries.items():
+                out.write('{}\t{}\t{}\t{}\t{}\n'.format(fasta_id, *position))
+        os.replace(tmp_file, index_file)
+    except OSError as error:
+        # read-only locations still get an in-memory index
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        if verbose:
+            print("Could not save index {}: {}".format(index_file, error))
+    if verbose:
+        print("\nIndexed {} fasta ids from {}".format(len(entries),
+                                                     fasta_file))
+    return entries
+
+def read_fasta_index(fasta_file, index_file=None):
+    '''
+    Reads the offset index of a fasta file, if it is still up to date.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        Path of the fasta file.
+    index_file : PATH, optional
+        Path of the index file. The default is the fasta path plus '.fidx'.
+
+    Returns
+    -------
+    DICT
+        The index entries (see build_fasta_index), or None if the index
+        does not exist or if the size or modification time of the fasta
+        file changed since it was built.
+
+    '''
+    if index_file is None:
+        index_file = str(fasta_file) + INDEX_SUFFIX
+    if not os.path.exists(index_file):
+        return None
+    stat = os.stat(fasta_file)
+    with open(index_file, 'r') as input_file:
+        header = input_file.readline().rstrip('\n').split('\t')
+        if header != [INDEX_MAGIC, str(stat.st_size), str(stat.st_mtime_ns)]:
+            return None
+        entries = {}
+        for line in input_file:
+            # the fasta_id itself may contain tabs
+            fasta_id, *position = line.rstrip('\n').rsplit('\t', 4)
+            entries[fasta_id] = tuple(int(value) for value in position)
+    return entries
+
+
+class FastaIndex():
+    '''
+    Random access to the sequences of an indexed fasta file.
+
+    The index is read from the sidecar file, or (re)built when it is missing
+    or stale. The fasta file is memory-mapped, so fetching k sequences costs
+    k seeks instead of a full parse. BGZF compressed files are also 
+    supported, decompressing only the blocks holding the requested records.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        Path of the fasta file, uncompressed or compressed with BGZF.
+    index_file : PATH, optional
+        Path of the index file. The default is the fasta path plus '.fidx'.
+    key : FUNCTION, optional
+        Function applied to each fasta_id to get the key used for lookups,
+        e.g. to fetch UniProt entries by accession. The default is None,
+        meaning the whole fasta_id.
+    rebuild : BOOL, optional
+        Whether to rebuild the index even if it is up to date.
+        The default is False.
+    verbose : BOOL, optional
+        Whether to print or not informative strings. The default is True.
+
+    '''
+
+    def __init__(self, fasta_file, index_file=None, key=None, rebuild=False,
+                 verbose=True):
+        self.fasta_file = fasta_file
+        self.compression = detect_compression(fasta_file)
+        if self.compression not in [None, 'bgzf']:
+            raise ValueError("Random access is not possible in {} files, "
+                             "compress them with bgzip instead.".format(
+                                 self.compression))
+        entries = None
+        if not rebuild:
+            entries = read_fasta_index(fasta_file, index_file)
+        if entries is None:
+            entries = build_fasta_index(fasta_file, index_file, verbose)
+        self.entries = entries
+        self.keys = None
+        if key is not None:
+            self.keys = {}
+            for fasta_id in entries:
+                self.keys.setdefault(key(fasta_id), fasta_id)
+        self._file = None
+        self._map = None
+
+    def _open(self):
+        if self.compression == 'bgzf':
+            self._file = BgzfReader(self.fasta_file, threads=1)
+            self._map = self._file
+            return
+        self._file = open(self.fasta_file, 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        else:
+            self._map = b''
+
+    def _read(self, offset, size):
+        if self.compression == 'bgzf':
+            return self._file.read_at(offset, size)
+        return self._map[offset:offset + size]
+
+    def fasta_id(self, key):
+        '''
+        Returns the fasta_id indexed under a lookup key.
+        '''
+        if self.keys is None:
+            if key not in self.entries:
+                raise KeyError(key)
+            return key
+        return self.keys[key]
+
+    def fetch(self, key):
+        '''
+        Returns the sequence indexed under a lookup key.
+        '''
+        if self._map is None:
+            self._open()
+        length, offset, line_bases, line_width = self.entries[
+            self.fasta_id(key)]
+        if not length:
+            return ''
+        if line_bases:
+            n_lines = (length - 1) // line_bases
+            span = length + n_lines * (line_width - line_bases)
+            return self._read(offset, span).translate(None, b'\r\n').decode()
+        return b''.join(self._read(offset, line_width).split()).decode()
+
+    def fetch_many(self, keys, missing=None):
+        '''
+        Yields (fasta_id, sequence) for each lookup key found in the index.
+        Keys not found are appended to the missing list, if given.
+        '''
+        for key in keys:
+            try:
+                fasta_id = self.fasta_id(key)
+            except KeyError:
+                if missing is not None:
+                    missing.append(key)
+                continue
+            yield fasta_id, self.fetch(key)
+
+    def __getitem__(self, key):
+        return self.fetch(key)
+
+    def __contains__(self, key):
+        if self.keys is None:
+            return key in self.entries
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:26:10 2026
+
+@author: vrrodovalho
+
+This script contains a multi-process version of the fasta parsing and
+filtering steps, which splits the input file at record boundaries and
+filters each byte range on a process pool.
+
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .compressed_io import BgzfReader, detect_compression, open_input
+from .fasta_filters import iter_fasta, filter_sequences, explain_filtering
+from .id_matchers import make_id_matcher
+
+
+# compressions whose files can be split into byte ranges
+SPLITTABLE = (None, 'bgzf')
+
+# file, criteria and fasta_id matcher of a worker process
+_worker_state = None
+
+
+def split_fasta_ranges(fasta_file, n_ranges):
+    '''
+    Splits a fasta file into byte ranges that start at record boundaries.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        Path of the fasta file, uncompressed or compressed with BGZF. 
+        Positions refer to the uncompressed data.
+    n_ranges : INT
+        Number of ranges wanted. Fewer ranges are returned for files with
+        fewer records.
+
+    Returns
+    -------
+    LIST
+        List of (start, end) byte positions covering the whole file.
+
+    '''
+    compression = detect_compression(fasta_file)
+    if compression is None:
+        size = os.path.getsize(fasta_file)
+    elif compression == 'bgzf':
+        with BgzfReader(fasta_file) as reader:
+            size = reader.uncompressed_size()
+    else:
+        raise ValueError("{} files cannot be split, compress them with "
+                         "bgzip instead.".format(compression))
+    starts = [0]
+    with open_input(fasta_file) as input_file:
+        for i in range(1, n_ranges):
+            position = max(size * i // n_ranges, starts[-1])
+            input_file.seek(position)
+            # move to the first header starting after this position
+            if position:
+                input_file.readline()
+            while True:
+                line_start = input_file.tell()
+                line = input_file.readline()
+                if not line or line.startswith(b'>'):
+                    break
+            if line and line_start > starts[-1]:
+                starts.append(line_start)
+    ends = starts[1:] + [size]
+    return list(zip(starts, ends))
+
+def _make_matcher(criteria):
+    '''
+    Builds the fasta_id matcher of the filtering criteria, or returns None if
+    no fasta_id filter is applied.
+    '''
+    filter_by = criteria['filter_by']
+    if filter_by['id_list_out'] or filter_by['id_list_in']:
+        return make_id_matcher(criteria['id_filters'],
+                               mode=criteria['id_match'])
+    return None
+
+def _init_filter_worker(fasta_file, forbidden_lines, criteria):
+    '''
+    Keeps the file and the filtering criteria of a worker process, building
+    the fasta_id matcher once instead of once per range.
+    '''
+    global _worker_state
+    _worker_state = (fasta_file, forbidden_lines, criteria,
+                     _make_matcher(criteria))
+
+def _filter_range(start, end):
+    '''
+    Parses and filters one byte range of a fasta file, in a worker process.
+    '''
+    fasta_file, forbidden_lines, criteria, id_matches = _worker_state
+    sequences = {}
+    duplicated_ids = {}
+    for fasta_id, sequence in iter_fasta(fasta_file,
+                                         forbidden_lines=forbidden_lines,
+                                         duplicated_ids=duplicated_ids,
+                                         start=start, end=end):
+        sequences[fasta_id] = sequence
+    counts = {}
+    filtered = filter_sequences(sequences, counts=counts, explain=False,
+                                id_matches=id_matches, **criteria)
+    # every sequence filtered out is counted by at least one filter
+    if any(counts.values()):
+        filtered_in, filtered_out = filtered['in'], filtered['out']
+    else:
+        filtered_in, filtered_out = filtered, {}
+    return filtered_in, filtered_out, counts, list(sequences)
+
+def filter_fasta_parallel(fasta_file,
+                          workers=None,
+                          min_seq_len=35,
+                          forbidden=['B','J','O','U','X','Z'],
+                          id_filters=[],
+                          filter_by={'seq_size':False,
+                                     'seq_char':False,
+                                     'id_list_in':False,
+                                     'id_list_out':False},
+                          id_match='substring',
+                          char_mode='all',
+                          forbidden_lines=['',' '],
+                          ranges_per_worker=4,
+                          counts=None,
+                          explain=True):
+    '''
+    Parses and filters a fasta file using a pool of processes.
+
+    The file is split into byte ranges at record boundaries, and each range
+    is parsed and filtered with filter_sequences. The results are merged in
+    file order, so the output is the same as running fasta_parser and
+    filter_sequences on a single core. As in fasta_parser, only the first
+    record of a duplicated fasta_id is considered.
+
+    Parameters
+    ----------
+    fasta_file : PATH
+        path of the fasta file, uncompressed or compressed with BGZF. Files
+        compressed with gzip or zstd cannot be split, so they are parsed and
+        filtered on a single core.
+    workers : INT, optional
+        Number of worker processes. The default is None, meaning the
+        number of CPUs.
+    ranges_per_worker : INT, optional
+        Number of byte ranges per worker, for load balancing.
+        The default is 4.
+    counts : DICT, optional
+        If a dictionary is given, it is updated with the number of sequences
+        removed by each filter. The default is None.
+    forbidden_lines : LIST, optional
+        Lines that should be ignored. The default is ['',' '].
+    Other parameters are described in fasta_filters.filter_sequences.
+
+    Returns
+    -------
+    DICT
+        A dictionary if no filters were applied.
+        Otherwise, two dictionaries (one with the sequences filtered out
+                                     and another with the sequences kept in.)
+
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+    criteria = {'min_seq_len': min_seq_len, 'forbidden': forbidden,
+                'id_filters': id_filters, 'filter_by': filter_by,
+                'id_match': id_match, 'char_mode': char_mode}
+    id_matches = _make_matcher(criteria)
+    if detect_compression(fasta_file) not in SPLITTABLE:
+        # gzip and zstd streams are filtered on a single core
+        sequences = dict(iter_fasta(fasta_file,
+                                    forbidden_lines=forbidden_lines,
+                                    duplicated_ids={}))
+        return filter_sequences(sequences, counts=counts, explain=explain,
+                                id_matches=id_matches, **criteria)
+    ranges = split_fasta_ranges(fasta_file, workers * ranges_per_worker)
+
+    if workers == 1:
+        _init_filter_worker(fasta_file, forbidden_lines, criteria)
+        results = (_filter_range(start, end) for start, end in ranges)
+        return _merge_results(results, criteria, id_matches, counts, explain)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_filter_worker,
+                             initargs=(fasta_file, forbidden_lines,
+                                       criteria)) as executor:
+        futures = [executor.submit(_filter_range, start, end)
+                   for start, end in ranges]
+        results = (future.result() for future in futures)
+        return _merge_results(results, criteria, id_matches, counts, explain)
+
+def _merge_results(results, criteria, id_matches, counts, explain):
+    '''
+    Merges the results of _filter_range in file order, dropping the fasta_ids
+    already seen in previous ranges.
+    '''
+    filtered_in = {}
+    filtered_out = {}
+    filter_counts = {'seq_size': 0, 'seq_char': 0, 
+                     'id_list_out': 0, 'id_list_in': 0}
+    seen = set()
+    len_sequences = 0
+    for range_in, range_out, range_counts, range_ids in results:
+        duplicated = {}
+        for fasta_id in range_ids:
+            if fasta_id in seen:
+                if fasta_id in range_in:
+                    duplicated[fasta_id] = range_in.pop(fasta_id)
+                else:
+                    duplicated[fasta_id] = range_out.pop(fasta_id)
+            else:
+                seen.add(fasta_id)
+        if duplicated:
+            # take the duplicated records back out of the statistics
+            duplicated_counts = {}
+            filter_sequences(duplicated, counts=duplicated_counts,
+                             explain=False, id_matches=id_matches, 
+                             **criteria)
+            for name in filter_counts:
+                range_counts[name] -= duplicated_counts[name]
+        for name in filter_counts:
+            filter_counts[name] += range_counts[name]
+        len_sequences += len(range_ids) - len(duplicated)
+        filtered_in.update(range_in)
+        filtered_out.update(range_out)
+
+    if counts is not None:
+        counts.update(filter_counts)
+    if explain:
+        explain_filtering(len_sequences, len(filtered_in), filter_counts,
+                          criteria['min_seq_len'], criteria['forbidden'])
+    if filtered_out:
+        return {'in' : filtered_in, 'out': filtered_out}
+    else:
+        return filtered_in
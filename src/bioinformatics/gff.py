@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:05:37 2026
+
+@author: vrrodovalho
+
+This script contains functions to stream GFF3 files (plain or compressed):
+reading the header pragmas without scanning the features, iterating over the
+features with only the requested attributes and extracting id pairs, such as
+locus tag to protein id, from the features.
+
+"""
+
+from urllib.parse import unquote
+
+from .compressed_io import open_input
+
+
+def read_gff_header(gff_file, names=None):
+    '''
+    Reads the pragmas (##name value) and the NCBI header comments
+    (#!name value) of a GFF3 file. Only the header is read: the scan stops at
+    the first feature line.
+
+    Parameters
+    ----------
+    gff_file : STR
+        The path of the GFF3 file.
+    names : LIST, optional
+        The names of the pragmas to be kept, such as 'genome-build' or
+        'sequence-region'. The default is None, which keeps them all.
+
+    Returns
+    -------
+    header : DICT
+        The values of each pragma name, in file order.
+
+    '''
+    names = None if names is None else set(names)
+    header = {}
+    with open_input(gff_file, 'rt') as gff:
+        for line in gff:
+            if line.startswith('##') or line.startswith('#!'):
+                name, _, value = line[2:].rstrip('\r\n').partition(' ')
+                if name == 'FASTA':
+                    break
+                if names is None or name in names:
+                    header.setdefault(name, []).append(value.strip())
+            elif line.startswith('#') or not line.strip():
+                continue
+            else:
+                break
+    return header
+
+def _parse_attributes(column, attributes):
+    '''
+    Parses the attributes column of a GFF3 line, keeping only the requested
+    attributes (all of them if attributes is None). Values are unescaped and,
+    for multi-valued attributes, kept as a single comma-separated string.
+    '''
+    parsed = {}
+    for field in column.split(';'):
+        name, _, value = field.partition('=')
+        name = name.strip()
+        if attributes is not None and name not in attributes:
+            continue
+        parsed[name] = unquote(value) if '%' in value else value
+    return parsed
+
+def iter_gff_features(gff_file, types=None, attributes=None):
+    '''
+    Iterates over the features of a GFF3 file, one line at a time. The scan
+    stops at the ##FASTA directive, if there is one.
+
+    Parameters
+    ----------
+    gff_file : STR
+        The path of the GFF3 file.
+    types : LIST, optional
+        The feature types to be kept, such as 'gene' or 'CDS'. The default
+        is None, which keeps them all.
+    attributes : LIST, optional
+        The attributes to be parsed, such as 'locus_tag' or 'protein_id'.
+        The default is None, which parses them all.
+
+    Yields
+    ------
+    feature : TUPLE
+        (seqid, source, type, start, end, score, strand, phase, attributes),
+        with start and end as integers and attributes as a dictionary.
+
+    '''
+    types = None if types is None else set(types)
+    attributes = None if attributes is None else set(attributes)
+    with open_input(gff_file, 'rt') as gff:
+        for line in gff:
+            if line.startswith('#'):
+                if line.startswith('##FASTA'):
+                    break
+                continue
+            columns = line.rstrip('\r\n').split('\t')
+            if len(columns) != 9:
+                continue
+            if types is not None and columns[2] not in types:
+                continue
+            yield (columns[0], columns[1], columns[2], int(columns[3]),
+                   int(columns[4]), columns[5], columns[6], columns[7],
+                   _parse_attributes(columns[8], attributes))
+
+def iter_gff_id_pairs(gff_file, key='locus_tag', value='protein_id',
+                      value_type='CDS'):
+    '''
+    Iterates over the (key, value) attribute pairs of the features of a type
+    in a GFF3 file, such as the locus tag and protein id of each CDS. When a
+    feature does not have the key attribute, it is taken from its parent
+    (e.g. from the gene of a CDS), so the key of every gene is kept in
+    memory while the file is read.
+
+    Parameters
+    ----------
+    gff_file : STR
+        The path of the GFF3 file.
+    key : STR, optional
+        The key attribute. The default is 'locus_tag'.
+    value : STR, optional
+        The value attribute. The default is 'protein_id'.
+    value_type : STR, optional
+        The feature type with the value attribute. The default is 'CDS'.
+
+    Yields
+    ------
+    pair : TUPLE
+        (key, value)
+
+    '''
+    parent_keys = {}
+    for feature in iter_gff_features(gff_file,
+                                     attributes=[key, value, 'ID', 'Parent']):
+        feature_attributes = feature[8]
+        feature_key = feature_attributes.get(key)
+        if feature_key is None:
+            parent = feature_attributes.get('Parent', '').split(',')[0]
+            feature_key = parent_keys.get(parent)
+        if feature[2] == value_type:
+            feature_value = feature_attributes.get(value)
+            if feature_key is not None and feature_value is not None:
+                yield feature_key, feature_value
+        elif feature_key is not None and 'ID' in feature_attributes:
+            parent_keys[feature_attributes['ID']] = feature_key
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 12:04:37 2026
+
+@author: vrrodovalho
+
+This script contains the id matching engines used to filter fasta ids
+against lists of ids: exact accession lookups, per-token lookups and an
+Aho-Corasick automaton for substring matching.
+
+"""
+
+import re
+
+
+MATCH_MODES = ['accession', 'token', 'substring', 'naive']
+
+TOKEN_SEPARATORS = re.compile(r'[|\s]+')
+
+
+def uniprot_accession(fasta_id):
+    '''
+    Extracts the accession from a fasta_id.
+
+    Parameters
+    ----------
+    fasta_id : STR
+        A fasta_id such as 'sp|P12345|NAME_HUMAN Description'.
+
+    Returns
+    -------
+    STR
+        The accession, which is the second field of UniProt-style ids
+        ('P12345') or the first word of any other id.
+
+    '''
+    first_word = fasta_id.split(None, 1)[0] if fasta_id else ''
+    fields = first_word.split('|')
+    if len(fields) >= 3:
+        return fields[1]
+    return first_word
+
+def header_tokens(fasta_id):
+    '''
+    Splits a fasta_id into tokens, at pipes and whitespace.
+    '''
+    return TOKEN_SEPARATORS.split(fasta_id)
+
+
+class AhoCorasick():
+    '''
+    Aho-Corasick automaton that tells whether a text contains any of a set
+    of patterns, scanning the text only once.
+
+    Parameters
+    ----------
+    patterns : LIST
+        Strings to be searched for.
+
+    '''
+
+    def __init__(self, patterns):
+        goto = [{}]
+        output = [False]
+        for pattern in patterns:
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(False)
+                state = next_state
+            output[state] = True
+
+        # breadth-first construction of the failure links
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                if fail[next_state] == next_state:
+                    fail[next_state] = 0
+                output[next_state] = (output[next_state] or
+                                      output[fail[next_state]])
+        self.goto = goto
+        self.fail = fail
+        self.output = output
+
+    def __call__(self, text):
+        '''
+        Returns True if any pattern occurs in text.
+        '''
+        goto, fail, output = self.goto, self.fail, self.output
+        if output[0]:
+            return True
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return True
+        return False
+
+
+def make_id_matcher(id_filters, mode='substring'):
+    '''
+    Builds a function that tells whether a fasta_id matches a list of ids.
+
+    Parameters
+    ----------
+    id_filters : LIST
+        List of strings to be matched against fasta_ids.
+    mode : STR, optional
+        How fasta_ids are matched. The default is 'substring'.
+        accession   The accession parsed from the fasta_id (see
+                    uniprot_accession) is in id_filters.
+        token       Any token of the fasta_id (split at pipes and
+                    whitespace) is in id_filters.
+        substring   Any string of id_filters occurs inside the fasta_id,
+                    using an Aho-Corasick automaton.
+        naive       Same results as substring, testing each string of
+                    id_filters in turn (previous behaviour).
+
+    Returns
+    -------
+    FUNCTION
+        A function taking a fasta_id and returning a BOOL.
+
+    '''
+    if mode == 'accession':
+        ids = frozenset(id_filters)
+        return lambda fasta_id: uniprot_accession(fasta_id) in ids
+    elif mode == 'token':
+        ids = frozenset(id_filters)
+        return lambda fasta_id: not ids.isdisjoint(header_tokens(fasta_id))
+    elif mode == 'substring':
+        return AhoCorasick(id_filters)
+    elif mode == 'naive':
+        ids = list(id_filters)
+        return lambda fasta_id: any(s in fasta_id for s in ids)
+    else:
+        raise ValueError("Unknown id match mode '{}'. Choose one of: {}"
+                         .format(mode, ', '.join(MATCH_MODES)))
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:58:02 2026
+
+@author: vrrodovalho
+
+This script contains an asyncio KEGG REST client to retrieve many conversion
+tables (or id conversions) concurrently. It reuses keep-alive connections,
+limits both the number of requests in flight and the request rate, decodes
+the responses as they arrive and shares the cache of KeggRestClient, which
+is read and written in a worker thread so the event loop is never blocked.
+The batch functions also work inside a running event loop (IPython, Spyder
+or Jupyter), where they run in a thread of their own.
+
+"""
+
+import ssl
+import codecs
+import asyncio
+import email.message
+import urllib.parse
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from .kegg_rest import KeggRestClient
+
+
+# KEGG asks for no more than 3 requests per second
+DEFAULT_RATE = 3.0
+DEFAULT_CONCURRENCY = 3
+# the most ids KEGG accepts in a single conv request
+MAX_IDS_PER_REQUEST = 10
+READ_SIZE = 65536
+
+
+class HttpError(OSError):
+    '''
+    An HTTP response with an error status.
+    '''
+
+    def __init__(self, status, reason, path):
+        super().__init__('HTTP Error {}: {} ({})'.format(status, reason, path))
+        self.status = status
+
+
+class RateLimiter():
+    '''
+    Spaces the starts of the requests by at least 1 / rate seconds.
+    '''
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = loop.time() + self.interval
+
+
+class _Connection():
+    '''
+    A keep-alive HTTP/1.1 connection.
+    '''
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    @classmethod
+    async def open(cls, host, port, use_ssl):
+        context = ssl.create_default_context() if use_ssl else None
+        reader, writer = await asyncio.open_connection(host, port,
+                                                       ssl=context)
+        return cls(reader, writer)
+
+    async def request(self, host, target, headers):
+        '''
+        Sends a GET request and reads the response, decoding the body as it
+        arrives. Returns (status, reason, headers, body, text).
+        '''
+        lines = ['GET {} HTTP/1.1'.format(target), 'Host: {}'.format(host),
+                 'User-Agent: bioinformatics', 'Accept-Encoding: identity',
+                 'Connection: keep-alive']
+        lines.extend('{}: {}'.format(name, value)
+                     for name, value in headers.items())
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed by the server')
+        parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        status = int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+        response_headers = email.message.Message()
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip()] = value.strip()
+        if (response_headers.get('Connection', '').lower() == 'close'):
+            self.reusable = False
+
+        chunks = []
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        text = []
+        if status in (204, 304) or 100 <= status < 200:
+            pass
+        elif response_headers.get('Transfer-Encoding', '').lower() \
+                == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # trailers
+                    while (await self.reader.readline()) not in (b'\r\n',
+                                                                 b'\n', b''):
+                        pass
+                    break
+                chunk = await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+                chunks.append(chunk)
+                text.append(decoder.decode(chunk))
+        elif response_headers.get('Content-Length') is not None:
+            remaining = int(response_headers['Content-Length'])
+            while remaining:
+                chunk = await self.reader.read(min(remaining, READ_SIZE))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b''.join(chunks),
+                                                      remaining)
+                remaining -= len(chunk)
+                chunks.append(chunk)
+                text.append(decoder.decode(chunk))
+        else:
+            self.reusable = False
+            while True:
+                chunk = await self.reader.read(READ_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                text.append(decoder.decode(chunk))
+        text.append(decoder.decode(b'', final=True))
+        return status, reason, response_headers, b''.join(chunks), \
+            ''.join(text)
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class AsyncKeggClient():
+    '''
+    An asyncio KEGG REST client, with a pool of keep-alive connections and
+    the on-disk cache of a KeggRestClient.
+
+    Parameters
+    ----------
+    cache : KeggRestClient, optional
+        The client whose cache, base url, offline mode, timeout and retries
+        are used. The default is None, which creates a KeggRestClient with
+        the default cache.
+    concurrency : INT, optional
+        The most requests in flight, which is also the most connections
+        opened. The default is DEFAULT_CONCURRENCY.
+    rate : FLOAT, optional
+        The most requests started per second, or None for no limit. The
+        default is DEFAULT_RATE.
+
+    The client must be created inside the event loop that uses it.
+
+    '''
+
+    def __init__(self, cache=None, concurrency=DEFAULT_CONCURRENCY,
+                 rate=DEFAULT_RATE):
+        # a cache created here is closed with the client
+        self._owns_cache = cache is None
+        self.cache = cache if cache is not None else KeggRestClient()
+        url = urllib.parse.urlsplit(self.cache.base_url)
+        self._host = url.hostname
+        self._ssl = url.scheme == 'https'
+        self._port = url.port or (443 if self._ssl else 80)
+        self._host_header = url.netloc
+        self._prefix = url.path.rstrip('/')
+        self.concurrency = concurrency
+        self._limit = asyncio.Semaphore(concurrency)
+        self._rate = RateLimiter(rate)
+        self._idle = []
+        # a single thread, so the SQLite cache is used by one thread at once
+        self._cache_thread = ThreadPoolExecutor(max_workers=1)
+        self.requests = 0
+        self.connections = 0
+
+    async def _in_cache_thread(self, function, *args):
+        '''
+        Runs a (blocking) method of the cache in the cache thread.
+        '''
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cache_thread,
+                                          partial(function, *args))
+
+    async def _fetch(self, path, headers):
+        '''
+        Makes a request on an idle connection, or on a new one.
+        '''
+        await self._rate.wait()
+        if self._idle:
+            connection = self._idle.pop()
+        else:
+            connection = await _Connection.open(self._host, self._port,
+                                                self._ssl)
+            self.connections += 1
+        try:
+            response = await connection.request(self._host_header,
+                                                self._prefix + '/' + path,
+                                                headers)
+        except BaseException:
+            connection.close()
+            raise
+        self.requests += 1
+        if connection.reusable:
+            self._idle.append(connection)
+        else:
+            connection.close()
+        return response
+
+    async def _request(self, path, cached):
+        '''
+        Requests a path, conditionally if it is cached, retrying on network
+        and server errors. Returns (status, headers, body, text).
+        '''
+        headers = self.cache.conditional_headers(cached)
+        delay = self.cache.backoff
+        for attempt in range(self.cache.retries + 1):
+            try:
+                async with self._limit:
+                    status, reason, response_headers, body, text = \
+                        await asyncio.wait_for(self._fetch(path, headers),
+                                               self.cache.timeout)
+                if status >= 400:
+                    raise HttpError(status, reason, path)
+                return status, response_headers, body, text
+            except HttpError as error:
+                if error.status < 500 or attempt == self.cache.retries:
+                    raise
+            except (OSError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError):
+                if attempt == self.cache.retries:
+                    raise
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def get(self, path, refresh=False):
+        '''
+        Returns the text of a KEGG REST response, from the cache if it is
+        fresh and from KEGG otherwise, and caches it.
+        '''
+        path = path.strip('/')
+        body, cached = await self._in_cache_thread(self.cache.from_cache,
+                                                   path, refresh)
+        if body is not None:
+            return body.decode('utf-8')
+        self.cache._report('From KEGG, retrieving {}...'.format(path))
+        try:
+            status, headers, body, text = await self._request(path, cached)
+        except (OSError, asyncio.TimeoutError,
+                asyncio.IncompleteReadError) as error:
+            # only network and server errors fall back to the cache, not
+            # the client errors (4xx) of a bad request
+            if cached is None or (isinstance(error, HttpError)
+                                  and error.status < 500):
+                raise
+            self.cache._report('KEGG request failed ({}), using the stale '
+                               'cached response'.format(error))
+            return cached['body'].decode('utf-8')
+        body = await self._in_cache_thread(self.cache.update, path, status,
+                                           body, headers, cached)
+        return body.decode('utf-8') if status == 304 else text
+
+    async def get_many(self, paths, refresh=False):
+        '''
+        Returns the text of many KEGG REST responses, requested
+        concurrently, in a dictionary keyed by path.
+        '''
+        paths = list(dict.fromkeys(path.strip('/') for path in paths))
+        texts = await asyncio.gather(*(self.get(path, refresh)
+                                       for path in paths))
+        return dict(zip(paths, texts))
+
+    async def conv_tables(self, organisms, database='uniprot',
+                          refresh=False):
+        '''
+        Returns the text of the conv/<organism>/<database> table of each
+        organism.
+        '''
+        paths = {organism: 'conv/{}/{}'.format(organism, database)
+                 for organism in organisms}
+        texts = await self.get_many(paths.values(), refresh)
+        return {organism: texts[path] for organism, path in paths.items()}
+
+    async def conv_ids(self, ids, database='uniprot', refresh=False):
+        '''
+        Returns the texts of the conv/<database>/<ids> responses for a list
+        of KEGG ids (such as 'hsa:7529'), MAX_IDS_PER_REQUEST ids per
+        request.
+        '''
+        ids = list(dict.fromkeys(ids))
+        paths = ['conv/{}/{}'.format(database, '+'.join(
+                     ids[start:start + MAX_IDS_PER_REQUEST]))
+                 for start in range(0, len(ids), MAX_IDS_PER_REQUEST)]
+        texts = await self.get_many(paths, refresh)
+        return [texts[path] for path in paths]
+
+    async def close(self):
+        '''
+        Closes the idle connections, and the cache if it was created by the
+        client.
+        '''
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+        for connection in idle:
+            try:
+                await connection.writer.wait_closed()
+            except OSError:
+                pass
+        if self._owns_cache:
+            await self._in_cache_thread(self.cache.close)
+        self._cache_thread.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def run_coroutine(coroutine):
+    '''
+    Runs a coroutine to completion and returns its result, with asyncio.run,
+    or in a thread with its own event loop if this thread is already running
+    one (as in IPython, Spyder or Jupyter), where asyncio.run would fail.
+    '''
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+async def retrieve_kegg_mapping_async(organisms, database='uniprot',
+                                      cache=None,
+                                      concurrency=DEFAULT_CONCURRENCY,
+                                      rate=DEFAULT_RATE, keep_prefix=None,
+                                      refresh=False):
+    '''
+    The coroutine of retrieve_kegg_mapping(), to be awaited in a running
+    event loop.
+    '''
+    from .conversion_kegg_uniprot import KeggMapping
+
+    if isinstance(organisms, str):
+        organisms = [organisms]
+    if keep_prefix is None:
+        keep_prefix = len(organisms) > 1
+    async with AsyncKeggClient(cache, concurrency, rate) as client:
+        tables = await client.conv_tables(organisms, database, refresh)
+    return KeggMapping.from_tables(tables.values(), database, keep_prefix)
+
+async def convert_kegg_ids_async(ids, database='uniprot', cache=None,
+                                 concurrency=DEFAULT_CONCURRENCY,
+                                 rate=DEFAULT_RATE, refresh=False):
+    '''
+    The coroutine of convert_kegg_ids(), to be awaited in a running event
+    loop.
+    '''
+    from .conversion_kegg_uniprot import KeggMapping
+
+    async with AsyncKeggClient(cache, concurrency, rate) as client:
+        texts = await client.conv_ids(ids, database, refresh)
+    return KeggMapping.from_tables(texts, database, keep_prefix=True)
+
+def retrieve_kegg_mapping(organisms, database='uniprot', cache=None,
+                          concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                          keep_prefix=None, refresh=False):
+    '''
+    Retrieves the conversion tables of many KEGG organisms concurrently and
+    parses them in a single KeggMapping.
+
+    Parameters
+    ----------
+    organisms : LIST
+        The KEGG organism codes.
+    database : STR, optional
+        The database converted to or from KEGG. The default is 'uniprot'.
+    cache : KeggRestClient, optional
+        The client whose cache and settings are used. The default is None.
+    concurrency : INT, optional
+        The most requests in flight. The default is DEFAULT_CONCURRENCY.
+    rate : FLOAT, optional
+        The most requests started per second. The default is DEFAULT_RATE.
+    keep_prefix : BOOL, optional
+        If KEGG ids keep their organism prefix. The default is None, which
+        keeps it only when there is more than one organism.
+    refresh : BOOL, optional
+        If True, cached tables are revalidated. The default is False.
+
+    Returns
+    -------
+    KeggMapping
+
+    '''
+    return run_coroutine(retrieve_kegg_mapping_async(
+        organisms, database, cache, concurrency, rate, keep_prefix, refresh))
+
+def convert_kegg_ids(ids, database='uniprot', cache=None,
+                     concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                     refresh=False):
+    '''
+    Converts a list of KEGG ids (such as 'hsa:7529') with batched conv
+    requests made concurrently, and returns a KeggMapping of the results,
+    with the organism prefix kept in the KEGG ids.
+    '''
+    return run_coroutine(convert_kegg_ids_async(ids, database, cache,
+                                                concurrency, rate, refresh))
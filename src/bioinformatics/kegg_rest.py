@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:41:18 2026
+
+@author: vrrodovalho
+
+This script contains a client for the KEGG REST API with a persistent cache
+of the responses in a SQLite database. Cached responses are served until
+they are older than a time to live, then revalidated with ETag and
+Last-Modified headers. In offline mode, only the cache is used.
+
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import urllib.error
+import urllib.request
+
+
+KEGG_REST_URL = 'https://rest.kegg.jp'
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+def default_cache_path():
+    '''
+    Returns the default path of the KEGG cache: $KEGG_CACHE if it is set, or
+    kegg.sqlite in the user cache directory.
+    '''
+    if os.environ.get('KEGG_CACHE'):
+        return os.environ['KEGG_CACHE']
+    cache_home = os.environ.get('XDG_CACHE_HOME',
+                                os.path.join(os.path.expanduser('~'),
+                                             '.cache'))
+    return os.path.join(cache_home, 'bioinformatics', 'kegg.sqlite')
+
+
+class KeggRestClient():
+    '''
+    A KEGG REST client that caches the responses on disk.
+
+    Parameters
+    ----------
+    base_url : STR, optional
+        The address of the KEGG REST API. The default is KEGG_REST_URL.
+    cache_path : STR, optional
+        The SQLite cache file, or None to use default_cache_path(). The
+        default is None.
+    ttl : FLOAT, optional
+        How many seconds a cached response is served without revalidation.
+        The default is DEFAULT_TTL (7 days).
+    offline : BOOL, optional
+        If True, only cached responses are served, however old they are. The
+        default is None, which is True if the KEGG_OFFLINE environment
+        variable is set to a non-empty value other than 0.
+    timeout : FLOAT, optional
+        The timeout of each request, in seconds. The default is 60.
+    retries : INT, optional
+        How many times a failed request is retried. The default is 3.
+    backoff : FLOAT, optional
+        The wait before the first retry, in seconds, doubled at each retry.
+        The default is 1.
+    verbose : BOOL, optional
+        If True, prints where each response came from. The default is True.
+
+    '''
+
+    def __init__(self, base_url=KEGG_REST_URL, cache_path=None,
+                 ttl=DEFAULT_TTL, offline=None, timeout=60, retries=3,
+                 backoff=1.0, verbose=True):
+        self.base_url = base_url.rstrip('/')
+        self.cache_path = cache_path or default_cache_path()
+        self.ttl = ttl
+        if offline is None:
+            offline = os.environ.get('KEGG_OFFLINE', '') not in ('', '0')
+        self.offline = offline
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.verbose = verbose
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+            # the asyncio client of kegg_async uses it from a worker thread
+            self._db = sqlite3.connect(self.cache_path,
+                                       check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS responses ('
+                             'key TEXT PRIMARY KEY, body BLOB NOT NULL, '
+                             'etag TEXT, last_modified TEXT, '
+                             'fetched REAL NOT NULL)')
+            self._db.commit()
+        return self._db
+
+    def cached(self, path):
+        '''
+        Returns the cached response of a path as a dictionary with its
+        'body' (bytes), 'etag', 'last_modified' and 'fetched' time, or None
+        if it is not cached.
+        '''
+        row = self._connect().execute(
+            'SELECT body, etag, last_modified, fetched FROM responses '
+            'WHERE key = ?', (path,)).fetchone()
+        if row is None:
+            return None
+        return {'body': zlib.decompress(row[0]), 'etag': row[1],
+                'last_modified': row[2], 'fetched': row[3]}
+
+    def store(self, path, body, etag=None, last_modified=None, fetched=None):
+        '''
+        Stores a response in the cache, compressed.
+        '''
+        db = self._connect()
+        db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                   (path, zlib.compress(body, 6), etag, last_modified,
+                    time.time() if fetched is None else fetched))
+        db.commit()
+
+    def _touch(self, path):
+        db = self._connect()
+        db.execute('UPDATE responses SET fetched = ? WHERE key = ?',
+                   (time.time(), path))
+        db.commit()
+
+    def conditional_headers(self, cached):
+        '''
+        Returns the headers that revalidate a cached response.
+        '''
+        headers = {}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    def from_cache(self, path, refresh=False):
+        '''
+        Looks a path up in the cache.
+
+        Returns
+        -------
+        body : BYTES
+            The cached body, if it can be served without a request (it is
+            fresh, or offline mode is on), or None.
+        cached : DICT
+            The cached response, as returned by cached(), or None.
+
+        '''
+        cached = self.cached(path)
+        if self.offline:
+            if cached is None:
+                raise LookupError('{} is not in the KEGG cache {} and '
+                                  'offline mode is on.'.format(
+                                      path, self.cache_path))
+            self._report('Using cached KEGG {} (offline)'.format(path))
+            return cached['body'], cached
+        if (cached is not None and not refresh
+                and time.time() - cached['fetched'] < self.ttl):
+            self._report('Using cached KEGG {}'.format(path))
+            return cached['body'], cached
+        return None, cached
+
+    def update(self, path, status, body, headers, cached):
+        '''
+        Updates the cache with the response of a request and returns the
+        body to be served: the cached one if the response is 304 Not
+        Modified.
+        '''
+        if status == 304:
+            self._touch(path)
+            return cached['body']
+        self.store(path, body, headers.get('ETag'),
+                   headers.get('Last-Modified'))
+        return body
+
+    def _request(self, path, cached):
+        '''
+        Requests a path, conditionally if it is cached, retrying on network
+        and server errors. Returns (status, body, headers).
+        '''
+        request = urllib.request.Request(self.base_url + '/' + path,
+                                         headers=self.conditional_headers(
+                                             cached))
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                with urllib.request.urlopen(request,
+                                            timeout=self.timeout) as response:
+                    return response.status, response.read(), response.headers
+            except urllib.error.HTTPError as error:
+                if error.code == 304:
+                    return 304, b'', error.headers
+                if error.code < 500 or attempt == self.retries:
+                    raise
+            except (urllib.error.URLError, OSError):
+                if attempt == self.retries:
+                    raise
+            time.sleep(delay)
+            delay *= 2
+
+    def get(self, path, refresh=False):
+        '''
+        Returns the body of a KEGG REST response, such as 'conv/hsa/uniprot',
+        from the cache if it is fresh and from KEGG otherwise.
+
+        Parameters
+        ----------
+        path : STR
+            The operation and its arguments, without the base url.
+        refresh : BOOL, optional
+            If True, the cached response is revalidated even if it is
+            fresh. The default is False.
+
+        Returns
+        -------
+        body : BYTES
+            The body of the response.
+
+        '''
+        path = path.strip('/')
+        body, cached = self.from_cache(path, refresh)
+        if body is not None:
+            return body
+
+        self._report('From KEGG, retrieving {}...'.format(path))
+        try:
+            status, body, headers = self._request(path, cached)
+        except (urllib.error.URLError, OSError) as error:
+            # only network and server errors fall back to the cache, not
+            # the client errors (4xx) of a bad request
+            if cached is None or (isinstance(error, urllib.error.HTTPError)
+                                  and error.code < 500):
+                raise
+            self._report('KEGG request failed ({}), using the stale cached '
+                         'response'.format(error))
+            return cached['body']
+        return self.update(path, status, body, headers, cached)
+
+    def conv(self, target_db, source_db, refresh=False):
+        '''
+        Returns the lines of a KEGG id conversion table, conv/target/source.
+        '''
+        body = self.get('conv/{}/{}'.format(target_db, source_db),
+                        refresh=refresh)
+        return body.decode('utf-8').splitlines()
+
+    def _report(self, message):
+        if self.verbose:
+            print(message)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:12:06 2026
+
+@author: vrrodovalho
+
+This script contains a persistent cache of an id mapping (such as locus tag to
+protein id) built from a set of tables. The mapping is stored as two sorted,
+memory-mapped numpy arrays with a manifest of the source files, and it is
+rebuilt whenever a source file is added, removed or changed.
+
+"""
+
+import os
+import json
+
+import numpy as np
+
+
+CACHE_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+KEYS_FILE = 'keys.npy'
+VALUES_FILE = 'values.npy'
+
+
+def source_manifest(list_of_file_paths, columns):
+    '''
+    Describes the source tables of a mapping by their paths, sizes and
+    modification times, so that a cache can tell when it is stale.
+
+    Parameters
+    ----------
+    list_of_file_paths : LIST
+        The paths of the source tables.
+    columns : LIST
+        The key and value columns of the mapping.
+
+    Returns
+    -------
+    manifest : DICT
+        The description of the sources.
+
+    '''
+    sources = []
+    for file in sorted(os.path.realpath(file) for file in list_of_file_paths):
+        stat = os.stat(file)
+        sources.append([file, stat.st_size, stat.st_mtime_ns])
+    return {'version': CACHE_VERSION, 'columns': list(columns),
+            'sources': sources}
+
+def _encode(ids):
+    '''
+    Converts a sequence of string ids to a numpy bytes array.
+    '''
+    ids = np.asarray(ids, dtype=object)
+    try:
+        # fast path for ascii ids
+        return np.array(ids.tolist(), dtype=bytes)
+    except (UnicodeEncodeError, TypeError):
+        return np.char.encode(ids.astype(str), 'utf-8')
+
+
+class IdMapping():
+    '''
+    A read-only mapping between two kinds of ids, stored as a sorted array of
+    keys and an array of values, both as bytes. A value of b'' stands for a
+    missing value.
+    '''
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+    @classmethod
+    def from_pairs(cls, keys, values):
+        '''
+        Builds a mapping from parallel sequences of keys and values. Missing
+        keys are dropped and, as with dict(zip(keys, values)), the last value
+        of a repeated key wins.
+        '''
+        keys = np.asarray(keys, dtype=object)
+        values = np.asarray(values, dtype=object)
+        present = np.array([isinstance(key, str) for key in keys], dtype=bool)
+        keys = _encode(keys[present])
+        values = values[present]
+        values = _encode(np.where([isinstance(value, str)
+                                   for value in values], values, ''))
+
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        values = values[order]
+        # keep the last of each run of equal keys
+        last = np.ones(len(keys), dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+        return cls(keys[last], values[last])
+
+    @classmethod
+    def load(cls, cache_dir):
+        '''
+        Opens a cached mapping, memory-mapping its arrays.
+        '''
+        keys = np.load(os.path.join(cache_dir, KEYS_FILE), mmap_mode='r')
+        values = np.load(os.path.join(cache_dir, VALUES_FILE), mmap_mode='r')
+        return cls(keys, values)
+
+    def save(self, cache_dir, manifest):
+        '''
+        Writes the mapping and its manifest to a cache directory. Each file
+        is written to a temporary file and then renamed, and the manifest is
+        written last, so an interrupted save leaves a stale cache instead of
+        a broken one.
+        '''
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_file = os.path.join(cache_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_file):
+            os.remove(manifest_file)
+        for file, array in ((KEYS_FILE, self.keys),
+                            (VALUES_FILE, self.values)):
+            path = os.path.join(cache_dir, file)
+            with open(path + '.tmp', 'wb') as out:
+                np.save(out, array)
+            os.replace(path + '.tmp', path)
+        with open(manifest_file + '.tmp', 'w') as out:
+            json.dump(manifest, out)
+        os.replace(manifest_file + '.tmp', manifest_file)
+
+    def lookup(self, ids, missing=np.nan):
+        '''
+        Maps many ids at once.
+
+        Parameters
+        ----------
+        ids : LIST
+            The ids to be mapped.
+        missing : OBJECT, optional
+            The value given to the ids without a (non-missing) value. The
+            default is np.nan.
+
+        Returns
+        -------
+        mapped : ARRAY
+            An object array with the mapped ids.
+
+        '''
+        queries = _encode(ids)
+        mapped = np.full(len(queries), missing, dtype=object)
+        if not len(self.keys) or not len(queries):
+            return mapped
+        positions = np.searchsorted(self.keys, queries)
+        positions[positions == len(self.keys)] = 0
+        found = self.keys[positions] == queries
+        values = self.values[positions[found]]
+        found[found] = values != b''
+        values = values[values != b'']
+        mapped[found] = np.char.decode(values, 'utf-8')
+        return mapped
+
+    def get(self, key, default=None):
+        return self.lookup([key], missing=default)[0]
+
+    def __contains__(self, key):
+        queries = _encode([key])
+        position = np.searchsorted(self.keys, queries)[0]
+        return position < len(self.keys) and self.keys[position] == queries[0]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def to_dict(self):
+        '''
+        Returns the mapping as a dict, with None for missing values.
+        '''
+        keys = np.char.decode(self.keys, 'utf-8')
+        values = np.char.decode(self.values, 'utf-8')
+        return {key: value if value else None
+                for key, value in zip(keys.tolist(), values.tolist())}
+
+
+def cached_mapping(cache_dir, list_of_file_paths, columns, build,
+                   rebuild=False, verbose=True):
+    '''
+    Returns the mapping cached in cache_dir if it was built from the same
+    source tables, or builds it again and caches it.
+
+    Parameters
+    ----------
+    cache_dir : STR
+        The cache directory.
+    list_of_file_paths : LIST
+        The paths of the source tables.
+    columns : LIST
+        The key and value columns of the mapping.
+    build : FUNCTION
+        Called without arguments when the cache is stale, it must return an
+        IdMapping.
+    rebuild : BOOL, optional
+        If True, the cache is rebuilt even if it is up to date. The default
+        is False.
+    verbose : BOOL, optional
+        If True, prints whether the cache was used. The default is True.
+
+    Returns
+    -------
+    mapping : IdMapping
+        The mapping.
+
+    '''
+    manifest = source_manifest(list_of_file_paths, columns)
+    manifest_file = os.path.join(cache_dir, MANIFEST_FILE)
+    if not rebuild and os.path.exists(manifest_file):
+        with open(manifest_file) as cached:
+            try:
+                cached_manifest = json.load(cached)
+            except ValueError:
+                cached_manifest = None
+        if cached_manifest == manifest:
+            if verbose:
+                print('Using cached mapping in {}'.format(cache_dir))
+            return IdMapping.load(cache_dir)
+
+    mapping = build()
+    try:
+        mapping.save(cache_dir, manifest)
+        if verbose:
+            print('Cached mapping of {} ids in {}'.format(len(mapping),
+                                                          cache_dir))
+    except OSError as error:
+        if verbose:
+            print('Could not cache the mapping in {}: {}'.format(cache_dir,
+                                                                 error))
+    return mapping
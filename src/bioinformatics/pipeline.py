@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:12:40 2026
+
+@author: vrrodovalho
+
+This script contains a small DAG runner for pipelines of command line tools.
+Tasks declare their dependencies and how many threads they can use, and the
+runner starts every task whose dependencies are done as soon as a global
+budget of cores allows it, giving each one its share of threads.
+
+"""
+
+import os
+import time
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+THREADS_PLACEHOLDER = '{threads}'
+
+
+def describe_function(function):
+    '''
+    Returns a short description of a Python step: the first line of its
+    docstring, or its name and the arguments given to it with
+    functools.partial.
+    '''
+    arguments = getattr(function, 'args', ())
+    function = getattr(function, 'func', function)
+    if arguments:
+        return '{}({})'.format(function.__name__,
+                               ', '.join(str(argument)
+                                         for argument in arguments))
+    doc = (function.__doc__ or '').strip()
+    return doc.split('\n')[0] if doc else function.__name__
+
+
+class Task():
+    '''
+    A step of a pipeline.
+
+    Parameters
+    ----------
+    name : STR
+        The unique name of the task, such as 'trim:sample1'.
+    commands : LIST, optional
+        The commands run in order, each one as a list of arguments. The
+        argument '{threads}' (or any argument containing it) is replaced by
+        the number of threads given to the task. The default is ().
+    function : FUNCTION, optional
+        Called as function(task, threads) after the commands, for steps done
+        in Python (moving or merging files). The default is None.
+    deps : LIST, optional
+        The names of the tasks that must be done first. The default is ().
+    threads : INT, optional
+        The most threads the task can use well. The default is 1.
+    min_threads : INT, optional
+        The fewest threads the task is started with. The default is 1.
+    inputs : LIST, optional
+        The files (or directories) read by the task. The default is ().
+    outputs : LIST, optional
+        The files written by the task. The outputs named in the commands
+        (as arguments, or by a prefix the tool adds a suffix to) are written
+        to temporary files and renamed when all the commands have succeeded,
+        so a task that fails never leaves a partial output. The default is
+        ().
+    tools : LIST, optional
+        The executables and scripts run by the task, whose versions are part
+        of its checkpoint. The default is ().
+    references : LIST, optional
+        Large files read by the task, such as databases, which are checked
+        by size and modification time instead of by content. The default is
+        ().
+    params : DICT, optional
+        Parameters of the task that change its outputs. The default is None.
+    cwd : STR, optional
+        The working directory of the commands. The default is None.
+
+    '''
+
+    def __init__(self, name, commands=(), function=None, deps=(), threads=1,
+                 min_threads=1, inputs=(), outputs=(), tools=(), references=(),
+                 params=None, cwd=None):
+        self.name = name
+        self.commands = [list(command) for command in commands]
+        self.function = function
+        self.deps = list(deps)
+        self.threads = max(1, threads)
+        self.min_threads = max(1, min(min_threads, self.threads))
+        self.inputs = [str(path) for path in inputs]
+        self.outputs = [str(path) for path in outputs]
+        self.tools = [str(tool) for tool in tools]
+        self.references = [str(path) for path in references]
+        self.params = params or {}
+        self.cwd = cwd
+
+    def command_lines(self, threads):
+        '''
+        Returns the commands with the number of threads filled in.
+        '''
+        return [[str(argument).replace(THREADS_PLACEHOLDER, str(threads))
+                 for argument in command] for command in self.commands]
+
+    def _staged_commands(self, threads):
+        '''
+        Returns the commands with the arguments that name outputs (an output
+        itself, or a prefix of outputs such as the -o of PEAR) replaced by
+        hidden temporary paths in the same directories, and a dictionary of
+        the temporary file of each of these outputs. Inputs, references,
+        directories and existing files that are not outputs are read by the
+        task, so they are never replaced.
+        '''
+        cwd = self.cwd or ''
+
+        def absolute(path):
+            return os.path.abspath(os.path.join(cwd, path))
+
+        outputs = [absolute(path) for path in self.outputs]
+        read = {absolute(path) for path in self.inputs + self.references}
+        staged = {}
+        commands = []
+        for command in self.command_lines(threads):
+            staged_command = []
+            for argument in command:
+                path = absolute(argument)
+                if path in read:
+                    matches = []
+                elif path in outputs:
+                    matches = [path]
+                elif os.path.exists(path):
+                    matches = []
+                else:
+                    matches = [output for output in outputs
+                               if output.startswith(path)
+                               and output[len(path)] in '._']
+                if not argument or not matches:
+                    staged_command.append(argument)
+                    continue
+                directory, name = os.path.split(argument)
+                argument = os.path.join(directory, '.tmp{}.{}'.format(
+                    os.getpid(), name))
+                temporary = absolute(argument)
+                for output in matches:
+                    staged[temporary + output[len(path):]] = output
+                staged_command.append(argument)
+            commands.append(staged_command)
+        return commands, staged
+
+    def run(self, threads, log_file=None):
+        '''
+        Runs the commands and then the function. Raises
+        subprocess.CalledProcessError if a command fails, after removing
+        the temporary outputs.
+        '''
+        commands, staged = self._staged_commands(threads)
+        log = open(log_file, 'a') if log_file else subprocess.DEVNULL
+        try:
+            for command in commands:
+                if log_file:
+                    log.write('$ {}\n'.format(' '.join(command)))
+                    log.flush()
+                subprocess.run(command, check=True, cwd=self.cwd,
+                               stdout=log, stderr=subprocess.STDOUT)
+        except BaseException:
+            for temporary in staged:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+            raise
+        finally:
+            if log_file:
+                log.close()
+        for temporary, output in staged.items():
+            if os.path.exists(temporary):
+                os.replace(temporary, output)
+            elif os.path.exists(output):
+                # not written this time, so it is stale
+                os.remove(output)
+        if self.function is not None:
+            self.function(self, threads)
+
+    def __repr__(self):
+        return 'Task({!r})'.format(self.name)
+
+
+class Pipeline():
+    '''
+    A directed acyclic graph of tasks.
+    '''
+
+    def __init__(self):
+        self.tasks = {}
+
+    def add(self, task):
+        '''
+        Adds a task and returns it.
+        '''
+        if task.name in self.tasks:
+            raise ValueError('Duplicated task name: {}'.format(task.name))
+        self.tasks[task.name] = task
+        return task
+
+    def order(self):
+        '''
+        Returns the tasks in a topological order, keeping the order in which
+        they were added where possible. Raises ValueError for unknown
+        dependencies and cycles.
+        '''
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError('Task {} depends on unknown task {}'
+                                     .format(task.name, dep))
+        ordered = []
+        state = {}
+
+        def visit(task):
+            if state.get(task.name) == 'done':
+                return
+            if state.get(task.name) == 'visiting':
+                raise ValueError('Dependency cycle at task {}'
+                                 .format(task.name))
+            state[task.name] = 'visiting'
+            for dep in task.deps:
+                visit(self.tasks[dep])
+            state[task.name] = 'done'
+            ordered.append(task)
+
+        for task in self.tasks.values():
+            visit(task)
+        return ordered
+
+    def run(self, cores=None, dry_run=False, keep_going=True, log_dir=None,
+            checkpoints=None, force=False, verbose=True):
+        '''
+        Runs the tasks, starting each task whose dependencies are done as
+        soon as there are enough free cores. A task gets up to its threads,
+        and at least its min_threads, out of the free cores. The tasks that
+        depend on a failed task are skipped.
+
+        With a checkpoint store, the tasks that are up to date are not run,
+        and a task is recorded only once it has finished and written all of
+        its outputs, so a task that was interrupted is run again.
+
+        Parameters
+        ----------
+        cores : INT, optional
+            The global budget of cores. The default is None, which uses the
+            number of CPUs.
+        dry_run : BOOL, optional
+            If True, prints the tasks, with their threads and commands, in
+            the order they would start, without running anything. The
+            default is False.
+        keep_going : BOOL, optional
+            If False, no task is started after a failure. The default is
+            True.
+        log_dir : STR, optional
+            If given, the output of each task is written to <task>.log in
+            this directory. The default is None.
+        checkpoints : CheckpointStore, optional
+            The checkpoints of the tasks. The default is None, which runs
+            every task.
+        force : BOOL, optional
+            If True, the tasks are run even if they are up to date, and
+            recorded again. The default is False.
+        verbose : BOOL, optional
+            If True, prints when each task starts and ends. The default is
+            True.
+
+        Returns
+        -------
+        statuses : DICT
+            The status of each task: 'done', 'current' (up to date),
+            'failed' or 'skipped' (or 'dry-run').
+
+        '''
+        if cores is None:
+            cores = os.cpu_count() or 1
+        pending = self.order()
+        if dry_run:
+            return self._dry_run(pending, cores, checkpoints, force)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+        statuses = {}
+        running = {}
+        free = cores
+        stopped = False
+        print_lock = threading.Lock()
+
+        def report(message):
+            if verbose:
+                with print_lock:
+                    print(message, flush=True)
+
+        def execute(task, threads):
+            log_file = None
+            if log_dir:
+                log_file = os.path.join(log_dir, task.name.replace(
+                    os.sep, '_').replace(':', '_') + '.log')
+            signature = None
+            if checkpoints is not None:
+                signature = checkpoints.signature(task)
+                if not force and checkpoints.is_current(task, signature):
+                    return None
+                checkpoints.invalidate(task.name)
+            report('Started {} with {} thread(s)'.format(task.name, threads))
+            start = time.perf_counter()
+            task.run(threads, log_file)
+            if checkpoints is not None:
+                checkpoints.record(task, signature)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+            while pending or running:
+                for task in list(pending):
+                    dep_statuses = [statuses.get(dep) for dep in task.deps]
+                    if stopped or any(status in ('failed', 'skipped')
+                                      for status in dep_statuses):
+                        statuses[task.name] = 'skipped'
+                        pending.remove(task)
+                        report('Skipped {}'.format(task.name))
+                        continue
+                    if not all(status in ('done', 'current')
+                               for status in dep_statuses):
+                        continue
+                    min_threads = min(task.min_threads, cores)
+                    if free < min_threads:
+                        continue
+                    threads = min(task.threads, free)
+                    free -= threads
+                    pending.remove(task)
+                    future = pool.submit(execute, task, threads)
+                    running[future] = (task, threads)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task, threads = running.pop(future)
+                    free += threads
+                    try:
+                        elapsed = future.result()
+                    except Exception as error:
+                        statuses[task.name] = 'failed'
+                        report('FAILED {}: {}'.format(task.name, error))
+                        if not keep_going:
+                            stopped = True
+                    else:
+                        if elapsed is None:
+                            statuses[task.name] = 'current'
+                            report('Up to date: {}'.format(task.name))
+                        else:
+                            statuses[task.name] = 'done'
+                            report('Finished {} in {:.1f} s'.format(
+                                task.name, elapsed))
+        return statuses
+
+    def _dry_run(self, ordered, cores, checkpoints=None, force=False):
+        '''
+        Prints the tasks in a topological order, as they would be started.
+        With a checkpoint store, the tasks found to be up to date are only
+        listed (a task whose inputs do not exist yet is taken as stale).
+        '''
+        statuses = {}
+        for task in ordered:
+            if (checkpoints is not None and not force
+                    and all(statuses[dep] == 'current' for dep in task.deps)):
+                try:
+                    current = checkpoints.is_current(
+                        task, checkpoints.signature(task))
+                except OSError:
+                    current = False
+                if current:
+                    print('{} (up to date)'.format(task.name))
+                    statuses[task.name] = 'current'
+                    continue
+            threads = min(task.threads, cores)
+            print('{} (threads: {}{})'.format(
+                task.name, threads,
+                ', after: ' + ', '.join(task.deps) if task.deps else ''))
+            # the commands as they run, writing to temporary outputs
+            for command in task._staged_commands(threads)[0]:
+                print('    ' + ' '.join(command))
+            if task.function is not None:
+                print('    [python] ' + describe_function(task.function))
+            statuses[task.name] = 'dry-run'
+        return statuses
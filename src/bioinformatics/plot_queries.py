@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jun 12 13:48:34 2019
+
+@author: vrrodovalho
+
+This script contains a function for generating a line plot of number of 
+publications in a year series from at least 2 csv files generated from
+Pubmed queries, and a batch mode to render many such plots without a display.
+
+"""
+
+import os
+import json
+import pathlib
+import glob
+import random
+from textwrap import wrap
+
+from .profiling import is_enabled, stage
+
+
+QUERY_CACHE_FILE = '.plot_queries_cache.json'
+
+
+def read_query_csv(query_file, id_col='Year'):
+    '''
+    Reads a csv file of a Pubmed query (a 'Search query:' line followed by
+    the id_col and Count columns) in a single pass.
+
+    Parameters
+    ----------
+    query_file : STR
+        The path of the csv file.
+    id_col : STR, optional
+        The name of the column containing ID values. The default is 'Year'.
+
+    Returns
+    -------
+    query_id : STR
+        The search query.
+    ids : LIST
+        The ID values.
+    counts : LIST
+        The publication count of each ID value.
+
+    '''
+    import pandas as pd
+    
+    with open(query_file, 'r') as f:
+        query_id = f.readline().strip().split('Search query: ')[1]
+        df = pd.read_csv(f, usecols=[id_col, 'Count'])
+    return query_id, df[id_col].tolist(), df['Count'].tolist()
+
+def load_queries(query_dir, id_col='Year', cache=True, verbose=True):
+    '''
+    Reads all the csv files of Pubmed queries in a directory and merges them
+    in a single table, with one column per query and one row per ID value,
+    filling the missing ID values in between with zeros. The parsed files 
+    are cached in QUERY_CACHE_FILE inside query_dir, keyed by their size and
+    modification time, so only new or changed files are parsed again.
+
+    Parameters
+    ----------
+    query_dir : STR
+        The directory with the csv files from Pubmed queries.
+    id_col : STR, optional
+        The name of the column containing ID values. The default is 'Year'.
+    cache : BOOL, optional
+        If the parsed files are cached. The default is True.
+    verbose : BOOL, optional
+        If True, prints how many files were parsed. The default is True.
+
+    Returns
+    -------
+    merged : DataFrame
+        The merged table, with id_col as the first column.
+
+    '''
+    import pandas as pd
+    import numpy as np
+    
+    cache_file = os.path.join(query_dir, QUERY_CACHE_FILE)
+    cached = {}
+    if cache and os.path.exists(cache_file):
+        with open(cache_file, 'r') as f:
+            try:
+                cached = json.load(f)
+            except ValueError:
+                cached = {}
+        if cached.get('id_col') != id_col:
+            cached = {}
+    cached_files = cached.get('files', {})
+    
+    files = {}
+    parsed = 0
+    for filename in sorted(glob.glob(os.path.join(query_dir, '*.csv'))):
+        stat = os.stat(filename)
+        name = os.path.basename(filename)
+        entry = cached_files.get(name)
+        if entry is None or entry['stamp'] != [stat.st_size, 
+                                                stat.st_mtime_ns]:
+            query_id, ids, counts = read_query_csv(filename, id_col)
+            entry = {'stamp': [stat.st_size, stat.st_mtime_ns],
+                     'query': query_id, 'ids': ids, 'counts': counts}
+            parsed += 1
+        files[name] = entry
+    if verbose:
+        print('Parsed {} of {} query files'.format(parsed, len(files)))
+    if cache and (parsed or len(files) != len(cached_files)):
+        try:
+            with open(cache_file + '.tmp', 'w') as f:
+                json.dump({'id_col': id_col, 'files': files}, f)
+            os.replace(cache_file + '.tmp', cache_file)
+        except OSError as error:
+            if verbose:
+                print('Could not cache the query files: {}'.format(error))
+    
+    # merge, reindex over all the ID values in between and fill in one step
+    entries = list(files.values())
+    if not entries:
+        return pd.DataFrame({id_col: []})
+    ids = np.concatenate([entry['ids'] for entry in entries])
+    all_ids = np.arange(ids.min(), ids.max() + 1)
+    values = np.zeros((len(all_ids), len(entries)), 
+                      dtype=np.result_type(*[np.asarray(entry['counts']) 
+                                             for entry in entries]))
+    for column, entry in enumerate(entries):
+        values[np.asarray(entry['ids']) - all_ids[0], column] = entry['counts']
+    merged = pd.DataFrame(values, columns=[entry['query'] 
+                                           for entry in entries])
+    merged.insert(0, id_col, all_ids)
+    return merged
+
+
+def downsample_queries(df, id_col='Year', max_points=200):
+    '''
+    Reduces a merged table of queries to at most max_points rows, averaging
+    the counts of consecutive ID values. Each row is labelled by the first 
+    ID value of its bin.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The merged table, as returned by load_queries.
+    id_col : STR, optional
+        The name of the column containing ID values. The default is 'Year'.
+    max_points : INT, optional
+        The most rows of the result. The default is 200.
+
+    Returns
+    -------
+    df : DataFrame
+        The downsampled table.
+
+    '''
+    if max_points is None or len(df) <= max_points:
+        return df
+    bin_size = -(-len(df) // max_points)
+    bins = (df[id_col] - df[id_col].min()) // bin_size
+    downsampled = df.groupby(bins, sort=True).mean()
+    downsampled[id_col] = df.groupby(bins, sort=True)[id_col].min()
+    return downsampled.reset_index(drop=True)
+
+def render_queries(df, output_file, id_col='Year', legend_pos='below',
+                   file_format=None, dpi=100, max_points=None, show=False):
+    '''
+    Draws the line plot of a merged table of queries and saves it. The 
+    figure is closed afterwards, so that many plots can be rendered without
+    accumulating figures.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The merged table, as returned by load_queries.
+    output_file : STR
+        The path of the output image.
+    id_col : STR, optional
+        The name of the column containing ID values. The default is 'Year'.
+    legend_pos : STR, optional
+        The position of the legend. Possible values: ['below','right'].
+        The default is 'below'.
+    file_format : STR, optional
+        The image format, raster (png, tiff, jpg) or vector (svg, pdf, eps).
+        The default is None, which uses the extension of output_file.
+    dpi : INT, optional
+        The resolution of raster images. The default is 100.
+    max_points : INT, optional
+        If given, longer series are downsampled to this many points (see
+        downsample_queries). The default is None.
+    show : BOOL, optional
+        If True, the figure is shown before being closed, which needs an
+        interactive backend. The default is False.
+
+    '''
+    import matplotlib.pyplot as plt
+    
+    if file_format is None:
+        file_format = pathlib.Path(output_file).suffix.lstrip('.').lower() \
+            or 'png'
+    df = downsample_queries(df, id_col, max_points)
+
+    # prepare legend positions
+    legend_pos_map = {'below' : {'dims' : (0, -0.55), 'wrap' : 80 }, 
+                      'right' : {'dims' : (1.05, 0.5), 'wrap' : 30 }}
+    bbox_to_anchor = legend_pos_map[legend_pos]['dims']
+    legend_wrap = legend_pos_map[legend_pos]['wrap']
+
+    # plot, in the darkgrid style set by plot_queries or _init_plot_worker
+    random.seed(22)
+    fig, ax = plt.subplots()
+    try:
+        labels = [ '\n'.join(wrap(l, legend_wrap)) \
+                  for l in df.columns if l != id_col ]
+        df.plot.line(x=id_col, ax=ax)
+        ax.legend(labels, 
+                  title="Search query", 
+                  fontsize=8,
+                  title_fontsize=10,
+                  bbox_to_anchor=bbox_to_anchor, 
+                  loc='lower left', 
+                  borderaxespad=0.)
+        ax.set_ylabel('Publications count')
+        ax.set_xlabel(id_col)
+        # plt.subplots_adjust(left=0.1, right = 0.7)
+        if show:
+            plt.show()
+        
+        fig.savefig(output_file, 
+                    format=file_format, 
+                    dpi=dpi, 
+                    bbox_inches="tight")
+    finally:
+        plt.close(fig)
+
+def plot_queries(query_dir, output_dir, file_name='plot.tiff', id_col='Year',
+                 legend_pos='below', drop_values=[], cache=True, show=True,
+                 file_format=None, dpi=100, max_points=None):
+    '''
+    Generates a line plot from at least 2 csv files of Pubmed queries.
+
+    Parameters
+    ----------
+    query_dir : STR
+        The directory with the csv files from Pubmed queries.
+    output_dir : STR
+        The directory where the output graph will be generated.
+    file_name : STR, optional
+        The name of the output file. The default is 'plot.tiff'.
+    id_col : STR, optional
+        The name of the column containing ID values. The default is 'Year'.
+    legend_pos : STR, optional
+        The position of the legend. Possible values: ['below','right'].
+        The default is 'below'.
+    drop_values : LIST, optional
+        List of ID values to be removed from the graph. The default is [].
+    cache : BOOL, optional
+        If the parsed csv files are cached (see load_queries). The default 
+        is True.
+    show : BOOL, optional
+        If True, the figure is shown, which needs a display. The default is
+        True.
+    file_format : STR, optional
+        The image format. The default is None, which uses the extension of
+        file_name.
+    dpi : INT, optional
+        The resolution of raster images. The default is 100.
+    max_points : INT, optional
+        If given, longer series are downsampled to this many points. The 
+        default is None.
+
+    Returns
+    -------
+    new_merged : DataFrame
+        A DataFrame containining all the data used to plot the graph.
+
+    '''
+    import seaborn as sns
+    
+    sns.set_style('darkgrid')
+    output_file = pathlib.Path(output_dir) / file_name
+    with stage('plot_queries') as metrics:
+        df = load_queries(query_dir, id_col, cache=cache)
+        new_merged = df[~df[id_col].isin(drop_values)]
+        render_queries(new_merged, output_file, id_col=id_col, 
+                       legend_pos=legend_pos, file_format=file_format, 
+                       dpi=dpi, max_points=max_points, show=show)
+        if is_enabled():
+            metrics.add(records=len(new_merged), files_read=glob.glob(
+                os.path.join(query_dir, '*.csv')), files_written=[output_file])
+    return new_merged
+
+def read_plot_manifest(manifest_file):
+    '''
+    Reads a manifest of plots: a JSON list with one object per plot, with
+    the 'query_dir' and 'output' paths and, optionally, the 'legend_pos', 
+    'drop_values', 'file_format', 'dpi' and 'max_points' of plot_queries.
+    Relative paths are relative to the manifest file.
+
+    Parameters
+    ----------
+    manifest_file : STR
+        The path of the manifest.
+
+    Returns
+    -------
+    jobs : LIST
+        The plots, as dictionaries with absolute paths.
+
+    '''
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    with open(manifest_file, 'r') as f:
+        jobs = json.load(f)
+    for job in jobs:
+        for key in ('query_dir', 'output'):
+            job[key] = os.path.join(base_dir, job[key])
+    return jobs
+
+def _init_plot_worker():
+    '''
+    Prepares a process to render plots: selects the non-interactive Agg 
+    backend and loads pyplot, the style and the fonts once.
+    '''
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    sns.set_style('darkgrid')
+    # the first text drawn loads the font cache
+    fig, ax = plt.subplots()
+    ax.set_title('Search query')
+    fig.canvas.draw()
+    plt.close(fig)
+
+def _render_job(job):
+    '''
+    Renders one plot of a manifest and returns its output path.
+    '''
+    id_col = job.get('id_col', 'Year')
+    df = load_queries(job['query_dir'], id_col, 
+                      cache=job.get('cache', True), verbose=False)
+    df = df[~df[id_col].isin(job.get('drop_values', []))]
+    render_queries(df, job['output'], id_col=id_col,
+                   legend_pos=job.get('legend_pos', 'below'),
+                   file_format=job.get('file_format'), 
+                   dpi=job.get('dpi', 100),
+                   max_points=job.get('max_points'))
+    return job['output']
+
+def plot_queries_batch(jobs, workers=None, verbose=True):
+    '''
+    Renders many plots without a display, on a pool of processes.
+
+    Parameters
+    ----------
+    jobs : LIST or STR
+        The plots, as returned by read_plot_manifest, or the path of a 
+        manifest.
+    workers : INT, optional
+        The number of processes. The default is None, which uses the number
+        of CPUs.
+    verbose : BOOL, optional
+        If True, prints each plot as it is saved. The default is True.
+
+    Returns
+    -------
+    outputs : LIST
+        The paths of the plots, in the order of the jobs.
+
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if isinstance(jobs, (str, pathlib.Path)):
+        jobs = read_plot_manifest(jobs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    
+    if workers == 1:
+        _init_plot_worker()
+        results = map(_render_job, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, 
+                                       initializer=_init_plot_worker)
+        results = executor.map(_render_job, jobs)
+    outputs = []
+    try:
+        for output in results:
+            if verbose:
+                print('Saved {}'.format(output))
+            outputs.append(output)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return outputs
+
+##############################################################################
+    
+if __name__ == '__main__':
+
+    # DIRECTORY SYSTEM
+    package_dir = os.path.dirname(os.path.realpath(__file__))
+    src_dir = os.path.dirname(package_dir)
+    main_dir = os.path.dirname(src_dir)
+    data_dir = pathlib.Path(main_dir) / 'data'
+    input_dir = pathlib.Path(data_dir) / 'input'
+    output_dir = pathlib.Path(data_dir) / 'output'
+
+    # DIRECTORY CONTAINING THE CSV FILES
+    query_dir = input_dir / 'queries'
+
+    # CALL PLOT FUNCTION
+    final_table = plot_queries(query_dir=query_dir, 
+                               output_dir=output_dir, 
+                               file_name='plot.png', 
+                               id_col='Year',
+                               legend_pos='right',
+                               drop_values=['2021'])
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 04:05:37 2026
+
+@author: vrrodovalho
+
+This script contains a lightweight instrumentation of the main steps of the
+scripts (parsing, filtering, exporting, id conversion, KEGG retrieval and
+plotting). Each step runs inside a stage, which records its calls, time,
+records, bytes read and written and memory: the peak memory of the stage
+with tracemalloc, and otherwise the peak resident memory of the whole process
+when the stage ended. Stages cost a function call while profiling is
+disabled, which is the default. The metrics are written
+as JSON or as a Prometheus textfile, and a cProfile profile and the top
+tracemalloc allocations can be captured as well.
+
+Only the stages of the current process are recorded: the ones run by the
+process pools of the batch modes are not.
+
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+PROMETHEUS_PREFIX = 'bioinformatics_stage_'
+PROMETHEUS_SUFFIXES = ('.prom', '.txt')
+TOP_ALLOCATIONS = 25
+# the memory metric of the stages, with tracemalloc and without it, and its
+# Prometheus name and description
+TRACED_MEMORY = ('traced_peak_memory', 'traced_peak_memory_bytes',
+                 'Peak memory allocated by Python during each stage, traced '
+                 'by tracemalloc.')
+PROCESS_MEMORY = ('process_max_rss', 'process_max_rss_bytes',
+                  'Peak resident memory of the whole process at the end of '
+                  'each stage (not of the stage itself).')
+
+# the active session, or None while profiling is disabled
+_session = None
+
+
+class _DisabledStage():
+    '''
+    The stage returned while profiling is disabled, which records nothing.
+    '''
+
+    def add(self, records=0, bytes_read=0, bytes_written=0, files_read=(),
+            files_written=()):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_DISABLED = _DisabledStage()
+
+
+def _max_rss():
+    '''
+    Returns the peak resident memory of the process so far, in bytes, or
+    None where the resource module is not available.
+    '''
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+def file_size(path):
+    '''
+    Returns the size of a file, or 0 if path is not the path of a file (an
+    open file or a stream, for instance).
+    '''
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+class Stage():
+    '''
+    One run of a stage, as a context manager. Its counters are added to the
+    totals of the stage in the session when it ends.
+    '''
+
+    def __init__(self, session, name):
+        self.session = session
+        self.name = name
+        self.records = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.peak_memory = 0
+
+    def add(self, records=0, bytes_read=0, bytes_written=0, files_read=(),
+            files_written=()):
+        '''
+        Counts records processed and bytes read and written by the stage.
+        The sizes of files_read and files_written (paths) are added to the
+        bytes, so that the files are only stat'ed while profiling.
+        '''
+        self.records += records
+        self.bytes_read += bytes_read + sum(map(file_size, files_read))
+        self.bytes_written += bytes_written + sum(map(file_size,
+                                                      files_written))
+
+    def __enter__(self):
+        self.session._enter(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.seconds = time.perf_counter() - self.start
+        self.session._exit(self, failed=exc_type is not None)
+        return False
+
+
+class Session():
+    '''
+    The metrics of the stages run while profiling is enabled.
+
+    Parameters
+    ----------
+    profile : BOOL, optional
+        If True, the whole session runs under cProfile. The default is False.
+    trace_memory : BOOL, optional
+        If True, the memory allocated by Python is traced with tracemalloc,
+        which gives the peak memory of each stage (instead of the peak
+        resident memory of the process) and the top allocations (the lines
+        that allocated the most memory still in use at the end of the stage
+        that held the most), but makes everything slower. The default is
+        False.
+
+    '''
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.stages = {}
+        self.trace_memory = trace_memory
+        self.profiler = None
+        self.allocations = None
+        self._snapshot = None
+        self._snapshot_memory = -1
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started = time.time()
+        self.seconds = None
+        self.memory_metric = TRACED_MEMORY if trace_memory else PROCESS_MEMORY
+        if trace_memory:
+            tracemalloc.start()
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, stage):
+        stack = self._stack()
+        if self.trace_memory:
+            # the peak so far belongs to the enclosing stage
+            peak = tracemalloc.get_traced_memory()[1]
+            if stack:
+                stack[-1].peak_memory = max(stack[-1].peak_memory, peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        stack.append(stage)
+
+    def _exit(self, stage, failed=False):
+        stack = self._stack()
+        if stack and stack[-1] is stage:
+            stack.pop()
+        if self.trace_memory:
+            stage.peak_memory = max(stage.peak_memory,
+                                    tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1].peak_memory = max(stack[-1].peak_memory,
+                                            stage.peak_memory)
+            else:
+                # the allocations of the outermost stage that ends holding
+                # the most memory
+                current = tracemalloc.get_traced_memory()[0]
+                if current > self._snapshot_memory:
+                    self._snapshot_memory = current
+                    self._snapshot = tracemalloc.take_snapshot()
+        else:
+            stage.peak_memory = _max_rss()
+        memory = self.memory_metric[0]
+        with self._lock:
+            totals = self.stages.setdefault(stage.name, {
+                'calls': 0, 'failures': 0, 'seconds': 0.0, 'records': 0,
+                'bytes_read': 0, 'bytes_written': 0, memory: None})
+            totals['calls'] += 1
+            totals['failures'] += failed
+            totals['seconds'] += stage.seconds
+            totals['records'] += stage.records
+            totals['bytes_read'] += stage.bytes_read
+            totals['bytes_written'] += stage.bytes_written
+            if stage.peak_memory is not None:
+                totals[memory] = max(totals[memory] or 0, stage.peak_memory)
+
+    def stop(self):
+        '''
+        Stops the profiler and the memory tracing, keeping the top
+        allocations.
+        '''
+        if self.seconds is not None:
+            return
+        self.seconds = time.time() - self.started
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_memory:
+            snapshot = self._snapshot or tracemalloc.take_snapshot()
+            self._snapshot = None
+            tracemalloc.stop()
+            self.allocations = [
+                {'location': '{}:{}'.format(stat.traceback[0].filename,
+                                            stat.traceback[0].lineno),
+                 'size': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]]
+
+    def to_dict(self):
+        '''
+        Returns the metrics of each stage, with its records per second.
+        Its memory is 'traced_peak_memory' with tracemalloc, and otherwise
+        'process_max_rss', the peak resident memory of the process when
+        the stage ended.
+        '''
+        stages = {}
+        for name, totals in sorted(self.stages.items()):
+            stage = dict(totals)
+            stage['records_per_second'] = (
+                totals['records'] / totals['seconds']
+                if totals['records'] and totals['seconds'] else None)
+            stages[name] = stage
+        metrics = {'started': self.started, 'seconds': self.seconds,
+                   'stages': stages}
+        if self.allocations is not None:
+            metrics['allocations'] = self.allocations
+        return metrics
+
+    def prometheus_lines(self):
+        '''
+        Returns the metrics in the Prometheus text format.
+        '''
+        metrics = [('calls', 'calls_total', 'counter', 'Runs of each stage.'),
+                   ('failures', 'failures_total', 'counter',
+                    'Runs of each stage that raised an error.'),
+                   ('seconds', 'seconds_total', 'counter',
+                    'Time spent in each stage.'),
+                   ('records', 'records_total', 'counter',
+                    'Records processed by each stage.'),
+                   ('bytes_read', 'read_bytes_total', 'counter',
+                    'Bytes read by each stage.'),
+                   ('bytes_written', 'written_bytes_total', 'counter',
+                    'Bytes written by each stage.'),
+                   ('records_per_second', 'records_per_second', 'gauge',
+                    'Records processed per second by each stage.')]
+        memory, metric, description = self.memory_metric
+        metrics.append((memory, metric, 'gauge', description))
+        stages = self.to_dict()['stages']
+        lines = []
+        for key, metric, metric_type, description in metrics:
+            name = PROMETHEUS_PREFIX + metric
+            lines.append('# HELP {} {}'.format(name, description))
+            lines.append('# TYPE {} {}'.format(name, metric_type))
+            for stage, values in stages.items():
+                if values[key] is not None:
+                    lines.append('{}{{stage="{}"}} {}'.format(
+                        name, stage, values[key]))
+        return lines
+
+    def write(self, output_file, file_format=None):
+        '''
+        Writes the metrics to a file, as JSON or in the Prometheus text
+        format (for the textfile collector of node_exporter). The file is
+        written to a temporary file and then renamed. With cProfile, the
+        profile is written to output_file plus '.prof', to be read with
+        pstats or snakeviz.
+
+        Parameters
+        ----------
+        output_file : STR
+            The output file.
+        file_format : STR, optional
+            'json' or 'prometheus'. The default is None, which writes the
+            Prometheus format for .prom and .txt files and JSON otherwise.
+
+        '''
+        output_file = str(output_file)
+        if file_format is None:
+            file_format = ('prometheus' if output_file.endswith(
+                PROMETHEUS_SUFFIXES) else 'json')
+        if file_format not in ('json', 'prometheus'):
+            raise ValueError("file_format should be 'json' or 'prometheus'.")
+        temporary = '{}.{}.tmp'.format(output_file, os.getpid())
+        with open(temporary, 'w') as output:
+            if file_format == 'json':
+                json.dump(self.to_dict(), output, indent=1)
+            else:
+                output.write('\n'.join(self.prometheus_lines()) + '\n')
+        os.replace(temporary, output_file)
+        if self.profiler is not None:
+            self.profiler.dump_stats(output_file + '.prof')
+
+
+def stage(name):
+    '''
+    Returns a context manager that records a stage, such as 'fasta_parser':
+
+        with stage('fasta_parser') as metrics:
+            ...
+            metrics.add(records=n, files_read=[fasta_file])
+
+    While profiling is disabled, the same stage that records nothing is
+    returned.
+    '''
+    if _session is None:
+        return _DISABLED
+    return Stage(_session, name)
+
+def enable(profile=False, trace_memory=False):
+    '''
+    Starts recording the stages, in a new session, and returns it (see
+    Session for the parameters).
+    '''
+    global _session
+    if _session is not None:
+        _session.stop()
+    _session = Session(profile=profile, trace_memory=trace_memory)
+    return _session
+
+def disable():
+    '''
+    Stops recording the stages and returns the session, or None if
+    profiling was not enabled.
+    '''
+    global _session
+    session = _session
+    _session = None
+    if session is not None:
+        session.stop()
+    return session
+
+def is_enabled():
+    '''
+    Tells whether the stages are being recorded.
+    '''
+    return _session is not None
+
+@contextmanager
+def profiled(output_file, profile=False, trace_memory=False):
+    '''
+    Records the stages run inside a with block and writes their metrics to
+    output_file (see Session.write()) at the end, even after an error.
+
+    Parameters
+    ----------
+    output_file : STR
+        The metrics file (.json, or .prom for the Prometheus format).
+    profile : BOOL, optional
+        If True, also writes a cProfile profile to output_file plus '.prof'.
+        The default is False.
+    trace_memory : BOOL, optional
+        If True, traces the memory with tracemalloc (see Session). The
+        default is False.
+
+    '''
+    session = enable(profile=profile, trace_memory=trace_memory)
+    try:
+        yield session
+    finally:
+        disable()
+        session.write(output_file)
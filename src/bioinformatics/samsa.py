@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:40:15 2026
+
+@author: vrrodovalho
+
+This script contains the SAMSA2 metatranscriptomics pipeline of samsa5.sh
+as a graph of tasks per sample: trimming, merging, raw read counts, rRNA
+removal, DIAMOND annotation against RefSeq and Subsystems, aggregation and
+the DESeq2 analyses. Independent samples and the RefSeq and Subsystems
+branches run at the same time, within a global budget of cores.
+
+The tools are found as in samsa5.sh, from the SAMSA, TRIMMOMATIC, PEAR,
+SORTMERNA, SORTMERNA_DIR, DIAMOND, PY_DIR and R_DIR environment variables,
+and any of them can be overridden by a JSON configuration file (stub
+executables included, to test the pipeline without the real tools).
+
+"""
+
+import os
+import sys
+import glob
+import json
+import shutil
+import importlib.util
+from functools import partial
+
+from .pipeline import Pipeline, Task, describe_function
+from .checkpoints import CheckpointStore
+
+
+# the threads each tool can use well; DIAMOND gets the most, since the
+# RefSeq and Subsystems annotations of each sample share the cores
+DEFAULT_THREADS = {'trimmomatic': 8, 'pear': 8, 'sortmerna': 16,
+                   'diamond': 24, 'read_counter': 8, 'python': 1,
+                   'rscript': 1}
+TRIMMOMATIC_STEPS = ['SLIDINGWINDOW:4:15', 'MINLEN:70']
+SORTMERNA_REFERENCE = ('{sortmerna_dir}/rRNA_databases/silva-bac-16s-id90'
+                       '.fasta,{sortmerna_dir}/index/silva-bac-16s-db')
+FASTQ_SUFFIXES = ('q', 'q.gz')
+PEAR_SUFFIXES = ['.assembled.fastq', '.unassembled.forward.fastq',
+                 '.unassembled.reverse.fastq', '.discarded.fastq']
+CHECKPOINTS_FILE = 'checkpoints.sqlite'
+
+
+def samsa_config(config_file=None, **overrides):
+    '''
+    Returns the configuration of the SAMSA2 pipeline: the defaults of
+    samsa5.sh, read from the environment, updated by a JSON file and then
+    by keyword arguments (None values are ignored).
+
+    Parameters
+    ----------
+    config_file : STR, optional
+        A JSON file with any of the keys of the configuration, such as
+        {"samsa": "/opt/samsa2", "diamond": "/opt/bin/diamond",
+        "threads": {"diamond": 16}}. The default is None.
+
+    Returns
+    -------
+    config : DICT
+        The configuration, with the input and output directories and the
+        databases filled in from the SAMSA directory when they are not
+        given.
+
+    '''
+    environ = os.environ
+    config = {'samsa': environ.get('SAMSA', '.'),
+              'input_dir': None,
+              'out_dir': None,
+              'work_dir': '.',
+              'tiny': environ.get('USE_TINY', '') != '',
+              'java': 'java',
+              'python': 'python',
+              'rscript': 'Rscript',
+              'trimmomatic': environ.get('TRIMMOMATIC', 'trimmomatic.jar'),
+              'pear': environ.get('PEAR', 'pear'),
+              'sortmerna': environ.get('SORTMERNA', 'sortmerna'),
+              'sortmerna_dir': environ.get('SORTMERNA_DIR', 'sortmerna'),
+              'diamond': environ.get('DIAMOND', 'diamond'),
+              'py_dir': environ.get('PY_DIR', 'python_scripts'),
+              'r_dir': environ.get('R_DIR', 'R_scripts'),
+              'diamond_database': None,
+              'diamond_subsys_db': None,
+              'refseq_db': None,
+              'refseq_index': None,
+              'subsys_db': None,
+              'threads': dict(DEFAULT_THREADS)}
+    updates = {}
+    if config_file is not None:
+        with open(config_file) as file:
+            updates.update(json.load(file))
+    updates.update({key: value for key, value in overrides.items()
+                    if value is not None})
+    for key, value in updates.items():
+        if key not in config:
+            raise ValueError('Unknown SAMSA2 configuration key: {}'
+                             .format(key))
+        if key == 'threads':
+            config['threads'].update(value)
+        else:
+            config[key] = value
+
+    samsa = config['samsa']
+    if config['input_dir'] is None:
+        config['input_dir'] = os.path.join(samsa, 'input_files')
+    if config['out_dir'] is None:
+        config['out_dir'] = os.path.join(samsa, 'output_files')
+    if config['tiny']:
+        databases = os.path.join(samsa, 'setup_and_test', 'tiny_databases')
+        refseq = os.path.join(databases, 'RefSeq_bac_TINY_24MB')
+        subsys = os.path.join(databases, 'subsys_db_TINY_24MB')
+    else:
+        databases = os.path.join(samsa, 'full_databases')
+        refseq = os.path.join(databases, 'RefSeq_bac')
+        subsys = os.path.join(databases, 'subsys_db')
+    for key, value in [('diamond_database', refseq),
+                       ('diamond_subsys_db', subsys),
+                       ('refseq_db', refseq + '.fa'),
+                       ('subsys_db', subsys + '.fa')]:
+        if config[key] is None:
+            config[key] = value
+    if config['refseq_index'] is None:
+        config['refseq_index'] = config['refseq_db'] + '.subjects'
+    return config
+
+def step_dirs(config):
+    '''
+    Returns the output directory of each step (step_1 to step_5), with the
+    _test suffix of samsa5.sh for the tiny databases.
+    '''
+    suffix = '_test' if config['tiny'] else ''
+    return {step: os.path.join(config['out_dir'],
+                               'step_{}_output{}'.format(step, suffix))
+            for step in range(1, 6)}
+
+def find_samples(input_dir):
+    '''
+    Finds the samples of the input directory: every fastq file (plain or
+    gzipped) with R1 in its name, paired with the file with R2 in its place
+    when there is one.
+
+    Returns
+    -------
+    samples : LIST
+        (name, forward file, reverse file or None) tuples, sorted by name,
+        where the name is the file name up to _R1.
+
+    '''
+    samples = []
+    for file_name in sorted(os.listdir(input_dir)):
+        if 'R1' not in file_name or not file_name.endswith(FASTQ_SUFFIXES):
+            continue
+        forward = os.path.join(input_dir, file_name)
+        reverse = os.path.join(input_dir, file_name.replace('R1', 'R2', 1))
+        if not os.path.isfile(reverse):
+            reverse = None
+        if '_R1' in file_name:
+            name = file_name.split('_R1')[0]
+        else:
+            name = file_name.split('R1')[0].rstrip('._-')
+        samples.append((name, forward, reverse))
+    names = [sample[0] for sample in samples]
+    if len(set(names)) != len(names):
+        raise ValueError('Two input files have the same sample name in {}'
+                         .format(input_dir))
+    return samples
+
+def copy_file(source, destination, task=None, threads=None):
+    '''
+    Copies a file, atomically.
+    '''
+    temporary = destination + '.tmp'
+    shutil.copyfile(source, temporary)
+    os.replace(temporary, destination)
+
+def move_files(patterns, destination, task=None, threads=None):
+    '''
+    Moves the files that match glob patterns to a directory.
+    '''
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            shutil.move(path, os.path.join(destination,
+                                           os.path.basename(path)))
+
+def remove_files(patterns, task=None, threads=None):
+    '''
+    Removes the files that match glob patterns.
+    '''
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            os.remove(path)
+
+def count_raw_reads(sources, destination, task=None, threads=None):
+    '''
+    Counts the reads of FASTQ files on a process pool, into a raw counts
+    table.
+    '''
+    from .fastq_stats import count_fastq_files, write_read_counts
+
+    write_read_counts(count_fastq_files(sources, workers=threads),
+                      destination)
+
+def _chain(*functions):
+    '''
+    Returns a function that calls functions in order.
+    '''
+    def chained(task, threads):
+        for function in functions:
+            function(task, threads)
+    chained.__doc__ = '; '.join(describe_function(function)
+                                for function in functions)
+    return chained
+
+def output_dirs(config, samples):
+    '''
+    Returns the directories the pipeline writes to.
+    '''
+    steps = step_dirs(config)
+    dirs = [steps[1], steps[2], steps[3], steps[4],
+            os.path.join(steps[4], 'daa_binary_files'),
+            os.path.join(steps[5], 'RefSeq_results', 'org_results'),
+            os.path.join(steps[5], 'RefSeq_results', 'func_results'),
+            os.path.join(steps[5], 'Subsystems_results', 'receipts')]
+    dirs.extend(os.path.join(steps[4], 'tmp', name)
+                for name, _, _ in samples)
+    return dirs
+
+def build_samsa_pipeline(config, samples=None):
+    '''
+    Builds the SAMSA2 pipeline of samsa5.sh as a graph of tasks.
+
+    Each sample has its own trimming, merging, rRNA removal, annotation and
+    aggregation tasks, so samples do not wait for each other, and the RefSeq
+    and Subsystems branches of a sample are independent. Only
+    combining_unmerged.R, which works on the whole step 2 directory, waits
+    for the merging of every sample, the raw reads of all samples are
+    counted by a single task (with fastq_stats, on a process pool) and the
+    DESeq2 analyses wait for every sample. The RefSeq organisms and
+    functions of each sample are counted in a single pass by diamond_counts,
+    from an index of the RefSeq database built once for all samples. The
+    outputs are written straight to their step directories, instead of being
+    moved there after each step.
+
+    Parameters
+    ----------
+    config : DICT
+        The configuration returned by samsa_config().
+    samples : LIST, optional
+        (name, forward file, reverse file or None) tuples. The default is
+        None, which finds them in the input directory.
+
+    Returns
+    -------
+    pipeline : Pipeline
+
+    '''
+    if samples is None:
+        samples = find_samples(config['input_dir'])
+    if not samples:
+        raise ValueError('No R1 fastq files in {}'
+                         .format(config['input_dir']))
+    # checked here rather than in the log of the first RefSeq task
+    if importlib.util.find_spec('numpy') is None:
+        raise ImportError('The RefSeq aggregation of the SAMSA2 pipeline '
+                          '(diamond_counts) requires the numpy package (pip '
+                          'install numpy, or pip install .[samsa]).')
+    steps = step_dirs(config)
+    threads = config['threads']
+    python = config['python']
+    rscript = config['rscript']
+    py_dir = config['py_dir']
+    r_dir = config['r_dir']
+    org_results = os.path.join(steps[5], 'RefSeq_results', 'org_results')
+    func_results = os.path.join(steps[5], 'RefSeq_results', 'func_results')
+    subsys_results = os.path.join(steps[5], 'Subsystems_results')
+    receipts = os.path.join(subsys_results, 'receipts')
+    # the RefSeq aggregation runs diamond_counts in its own processes
+    aggregator = [sys.executable, '-m', __package__]
+    aggregator_tools = [sys.executable,
+                        os.path.join(os.path.dirname(__file__),
+                                     'diamond_counts.py')]
+    refseq_index = config['refseq_index']
+    index_manifest = os.path.join(refseq_index, 'manifest.json')
+    daa_dir = os.path.join(steps[4], 'daa_binary_files')
+    raw_counts = os.path.join(steps[2], 'raw_counts.txt')
+    merged_outputs = {}
+    counted_files = []
+    pipeline = Pipeline()
+
+    for name, forward, reverse in samples:
+        # STEP 1: trimming with Trimmomatic
+        cleaned = os.path.join(steps[1], name + '.cleaned')
+        trimmomatic = [config['java'], '-jar', config['trimmomatic']]
+        if reverse is not None:
+            trimmed = [cleaned + '.forward', cleaned + '.forward_unpaired',
+                       cleaned + '.reverse', cleaned + '.reverse_unpaired']
+            command = trimmomatic + ['PE', '-phred33', '-threads',
+                                     '{threads}', forward, reverse] + \
+                trimmed + TRIMMOMATIC_STEPS
+            counted = cleaned + '.forward'
+        else:
+            trimmed = [cleaned]
+            command = trimmomatic + ['SE', '-phred33', '-threads',
+                                     '{threads}', forward, cleaned] + \
+                TRIMMOMATIC_STEPS
+            counted = cleaned
+        pipeline.add(Task('trim:' + name, [command],
+                          threads=threads['trimmomatic'],
+                          inputs=[forward] + ([reverse] if reverse else []),
+                          outputs=trimmed,
+                          tools=[config['java'], config['trimmomatic']]))
+
+        # STEP 2: merging the pairs with PEAR
+        merged = os.path.join(steps[2], name + '.merged')
+        if reverse is not None:
+            merged_outputs[name] = [merged + suffix
+                                    for suffix in PEAR_SUFFIXES]
+            pipeline.add(Task('merge:' + name,
+                              [[config['pear'], '-f', trimmed[0], '-r',
+                                trimmed[2], '-j', '{threads}', '-o',
+                                merged]],
+                              deps=['trim:' + name], threads=threads['pear'],
+                              inputs=[trimmed[0], trimmed[2]],
+                              outputs=merged_outputs[name],
+                              tools=[config['pear']]))
+        else:
+            merged_outputs[name] = [merged + '.assembled.fastq']
+            pipeline.add(Task('merge:' + name,
+                              function=partial(copy_file, cleaned,
+                                               merged + '.assembled.fastq'),
+                              deps=['trim:' + name], inputs=[cleaned],
+                              outputs=merged_outputs[name]))
+
+        counted_files.append(counted)
+
+    names = [sample[0] for sample in samples]
+    script = os.path.join(r_dir, 'combining_unmerged.R')
+    pipeline.add(Task('combine_unmerged', [[rscript, script, steps[2]]],
+                      deps=['merge:' + name for name in names],
+                      threads=threads['rscript'],
+                      inputs=[path for name in names
+                              for path in merged_outputs[name]],
+                      outputs=[os.path.join(steps[2], name +
+                                            '.merged.assembled2.fastq')
+                               for name in names],
+                      tools=[rscript, script]))
+    # STEP 2.9: raw read counts of every sample, in a single task
+    pipeline.add(Task('raw_counts',
+                      function=partial(count_raw_reads, counted_files,
+                                       raw_counts),
+                      deps=['trim:' + name for name in names],
+                      threads=min(len(names), threads['read_counter']),
+                      inputs=counted_files, outputs=[raw_counts]))
+
+    # organism and function of each subject id of RefSeq, indexed once
+    pipeline.add(Task('refseq_index',
+                      [aggregator + ['diamond-index', config['refseq_db'],
+                                     '--index-dir', refseq_index]],
+                      outputs=[index_manifest], tools=aggregator_tools,
+                      references=[config['refseq_db']]))
+
+    for name in names:
+        # STEP 3: rRNA removal with SortMeRNA
+        assembled = os.path.join(steps[2], name + '.merged.assembled2.fastq')
+        ribodepleted = os.path.join(steps[3], name + '.merged.ribodepleted')
+        reference = SORTMERNA_REFERENCE.format(
+            sortmerna_dir=config['sortmerna_dir'])
+        pipeline.add(Task('ribo:' + name,
+                          [[config['sortmerna'], '-a', '{threads}', '--ref',
+                            reference, '--reads', assembled, '--aligned',
+                            assembled + '.ribosomes', '--other',
+                            ribodepleted, '--fastx', '--log', '-v']],
+                          deps=['combine_unmerged'],
+                          threads=threads['sortmerna'], inputs=[assembled],
+                          outputs=[ribodepleted + '.fastq'],
+                          tools=[config['sortmerna']],
+                          references=reference.split(',')[:1]))
+
+        # STEPS 4 and 4.1: annotation with DIAMOND against both databases
+        annotated = {}
+        for branch, database, suffix in [
+                ('refseq', config['diamond_database'], 'RefSeq'),
+                ('subsys', config['diamond_subsys_db'], 'Subsys')]:
+            daa = os.path.join(daa_dir, '{}.merged.ribodepleted.fastq.{}'
+                               .format(name, suffix))
+            annotated[branch] = os.path.join(
+                steps[4], '{}.merged.{}_annotated'.format(
+                    name, 'RefSeq' if branch == 'refseq' else 'subsys'))
+            pipeline.add(Task(
+                '{}_annot:{}'.format(branch, name),
+                [[config['diamond'], 'blastx', '--db', database, '-q',
+                  ribodepleted + '.fastq', '-a', daa, '-t',
+                  os.path.join(steps[4], 'tmp', name), '-k', '1', '-p',
+                  '{threads}'],
+                 [config['diamond'], 'view', '--daa', daa + '.daa', '-o',
+                  annotated[branch], '-f', 'tab', '-p', '{threads}']],
+                deps=['ribo:' + name], threads=threads['diamond'],
+                inputs=[ribodepleted + '.fastq'],
+                outputs=[daa + '.daa', annotated[branch]],
+                tools=[config['diamond']],
+                references=[database if database.endswith('.dmnd')
+                            else database + '.dmnd']))
+
+        # STEP 5: RefSeq organism and function aggregation, in one pass
+        org_table, func_table = [
+            os.path.join(results, '{}_{}.tsv'.format(
+                os.path.basename(annotated['refseq']), level))
+            for results, level in [(org_results, 'organism'),
+                                   (func_results, 'function')]]
+        pipeline.add(Task(
+            'refseq_aggreg:' + name,
+            [aggregator + ['diamond-aggregate', annotated['refseq'],
+                           '--reference', config['refseq_db'],
+                           '--index-dir', refseq_index, '--org-dir',
+                           org_results, '--func-dir', func_results,
+                           '--workers', '1']],
+            deps=['refseq_index', 'refseq_annot:' + name],
+            threads=threads['python'], inputs=[annotated['refseq']],
+            outputs=[org_table, func_table], tools=aggregator_tools,
+            references=[index_manifest]))
+
+        # STEP 5.1: Subsystems aggregation
+        hierarchy = annotated['subsys'] + '.hierarchy'
+        receipt = annotated['subsys'] + '.receipt'
+        counter = os.path.join(py_dir,
+                               'DIAMOND_subsystems_analysis_counter.py')
+        reducer = os.path.join(py_dir, 'subsys_reducer.py')
+        pipeline.add(Task(
+            'subsys_aggreg:' + name,
+            [[python, counter, '-I', annotated['subsys'], '-D',
+              config['subsys_db'], '-O', hierarchy, '-P', receipt],
+             [python, reducer, '-I', hierarchy]],
+            function=_chain(partial(move_files, [hierarchy + '*.reduced'],
+                                    subsys_results),
+                            partial(move_files, [receipt], receipts),
+                            partial(remove_files, [hierarchy])),
+            deps=['subsys_annot:' + name], threads=threads['python'],
+            inputs=[annotated['subsys']],
+            outputs=[os.path.join(subsys_results, os.path.basename(
+                         hierarchy) + '.reduced'),
+                     os.path.join(receipts, os.path.basename(receipt))],
+            tools=[python, counter, reducer],
+            references=[config['subsys_db']]))
+
+    # STEP 6: DESeq2 analyses
+    for task_name, script, results, output, extra, aggregation in [
+            ('deseq_org', 'run_DESeq_stats.R', org_results,
+             'RefSeq_org_DESeq_results.tab', [], 'refseq_aggreg'),
+            ('deseq_func', 'run_DESeq_stats.R', func_results,
+             'RefSeq_func_DESeq_results.tab', [], 'refseq_aggreg'),
+            ('deseq_subsys', 'Subsystems_DESeq_stats.R', subsys_results,
+             'Subsystems_level-1_DESeq_results.tab', ['-L', '1'],
+             'subsys_aggreg')]:
+        script = os.path.join(r_dir, script)
+        pipeline.add(Task(
+            task_name,
+            [[rscript, script, '-I', results, '-O', output] + extra +
+             ['-R', raw_counts]],
+            deps=['raw_counts'] + ['{}:{}'.format(aggregation, name)
+                                   for name in names],
+            threads=threads['rscript'], inputs=[results, raw_counts],
+            outputs=[os.path.join(config['work_dir'], output)],
+            tools=[rscript, script], cwd=config['work_dir']))
+    return pipeline
+
+def run_samsa(config, cores=None, dry_run=False, keep_going=True,
+              log_dir=None, checkpoints=True, force=False, verbose=True):
+    '''
+    Runs the SAMSA2 pipeline.
+
+    Parameters
+    ----------
+    config : DICT
+        The configuration returned by samsa_config().
+    cores : INT, optional
+        The global budget of cores shared by the tasks. The default is None,
+        which uses the number of CPUs.
+    dry_run : BOOL, optional
+        If True, only prints the tasks and their commands. The default is
+        False.
+    keep_going : BOOL, optional
+        If False, no task is started after a failure. The default is True.
+    log_dir : STR, optional
+        The directory of the log of each task. The default is None, which
+        uses logs in the output directory.
+    checkpoints : BOOL or STR, optional
+        If True, the tasks that are up to date are not run again, using the
+        checkpoint store checkpoints.sqlite in the output directory; a path
+        uses another store, and False runs every task. The default is True.
+    force : BOOL, optional
+        If True, every task is run and its checkpoint recorded again. The
+        default is False.
+    verbose : BOOL, optional
+        If True, prints when each task starts and ends. The default is True.
+
+    Returns
+    -------
+    statuses : DICT
+        The status of each task, as returned by Pipeline.run().
+
+    '''
+    samples = find_samples(config['input_dir'])
+    pipeline = build_samsa_pipeline(config, samples)
+    if log_dir is None:
+        log_dir = os.path.join(config['out_dir'], 'logs')
+    if not dry_run:
+        for directory in output_dirs(config, samples):
+            os.makedirs(directory, exist_ok=True)
+    store = None
+    if checkpoints is True:
+        checkpoints = os.path.join(config['out_dir'], CHECKPOINTS_FILE)
+    if checkpoints and (not dry_run or os.path.exists(checkpoints)):
+        store = CheckpointStore(checkpoints)
+    try:
+        return pipeline.run(cores=cores, dry_run=dry_run,
+                            keep_going=keep_going, log_dir=log_dir,
+                            checkpoints=store, force=force, verbose=verbose)
+    finally:
+        if store is not None:
+            store.close()
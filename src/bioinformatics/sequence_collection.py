@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:08:33 2026
+
+@author: vrrodovalho
+
+This script contains a compact container for fasta records, which stores
+ids and residues in contiguous buffers instead of one string per sequence,
+and exposes the same interface as a dictionary of fasta_ids and sequences.
+
+"""
+
+from array import array
+from collections.abc import Mapping
+
+
+class SequenceRecord():
+    '''
+    Light view of one record of a SequenceCollection.
+    '''
+    __slots__ = ('collection', 'index')
+
+    def __init__(self, collection, index):
+        self.collection = collection
+        self.index = index
+
+    @property
+    def id(self):
+        return self.collection.id_at(self.index)
+
+    @property
+    def seq(self):
+        return self.collection.sequence_at(self.index)
+
+    def __len__(self):
+        return self.collection.length_at(self.index)
+
+    def __repr__(self):
+        return 'SequenceRecord({!r}, {} residues)'.format(self.id, len(self))
+
+
+class SequenceCollection(Mapping):
+    '''
+    Fasta records stored in two contiguous buffers (ids and residues) plus
+    two arrays of offsets.
+
+    It behaves as a read-only dictionary in which fasta_ids are the keys and
+    the sequences are the values, so it can be passed to filter_sequences
+    or fasta_dict2file. Lookups by fasta_id build an id -> position table on
+    first use; iterating and filtering do not need it.
+
+    '''
+    __slots__ = ('_ids', '_id_offsets', '_residues', '_offsets', '_lookup')
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._id_offsets = array('q', [0])
+        self._residues = bytearray()
+        self._offsets = array('q', [0])
+        self._lookup = None
+
+    @classmethod
+    def from_records(cls, records):
+        '''
+        Builds a collection from a dictionary or an iterable of
+        (fasta_id, sequence) tuples.
+        '''
+        collection = cls()
+        if hasattr(records, 'items'):
+            records = records.items()
+        for fasta_id, sequence in records:
+            collection.append(fasta_id, sequence)
+        return collection
+
+    def append(self, fasta_id, sequence):
+        '''
+        Adds a record at the end of the collection.
+        '''
+        self._ids += fasta_id.encode()
+        self._id_offsets.append(len(self._ids))
+        self._residues += sequence.encode()
+        self._offsets.append(len(self._residues))
+        if self._lookup is not None:
+            self._lookup.setdefault(fasta_id, len(self._offsets) - 2)
+
+    def id_at(self, index):
+        '''
+        Returns the fasta_id of the record at a position.
+        '''
+        return self._ids[self._id_offsets[index]:
+                         self._id_offsets[index + 1]].decode()
+
+    def sequence_at(self, index):
+        '''
+        Returns the sequence of the record at a position.
+        '''
+        return self._residues[self._offsets[index]:
+                              self._offsets[index + 1]].decode()
+
+    def length_at(self, index):
+        '''
+        Returns the length of the record at a position.
+        '''
+        return self._offsets[index + 1] - self._offsets[index]
+
+    def record(self, index):
+        '''
+        Returns a SequenceRecord view of the record at a position.
+        '''
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return SequenceRecord(self, index % len(self))
+
+    @property
+    def residues(self):
+        '''
+        The buffer with all residues, one sequence after the other.
+        '''
+        return self._residues
+
+    @property
+    def offsets(self):
+        '''
+        Array of len(self) + 1 positions, such that sequence i is
+        residues[offsets[i]:offsets[i+1]].
+        '''
+        return self._offsets
+
+    def index_of(self, fasta_id):
+        '''
+        Returns the position of a fasta_id (the first one, if duplicated).
+        '''
+        if self._lookup is None:
+            self._lookup = {}
+            for index, key in enumerate(self._iter_ids()):
+                self._lookup.setdefault(key, index)
+        return self._lookup[fasta_id]
+
+    def select(self, mask):
+        '''
+        Returns a view of some records.
+
+        Parameters
+        ----------
+        mask : LIST
+            One boolean per record, True for the records selected. 
+            A bytearray or a NumPy boolean array are also accepted.
+
+        Returns
+        -------
+        SequenceView
+            A dict-like view of the selected records, sharing the buffers.
+
+        '''
+        return SequenceView(self, _mask_to_indices(mask, len(self)))
+
+    def take(self, indices):
+        '''
+        Returns a view of the records at some positions (see select).
+        '''
+        return SequenceView(self, array('q', (int(i) for i in indices)))
+
+    def _iter_ids(self):
+        ids, id_offsets = self._ids, self._id_offsets
+        for index in range(len(self)):
+            yield ids[id_offsets[index]:id_offsets[index + 1]].decode()
+
+    def __getitem__(self, fasta_id):
+        return self.sequence_at(self.index_of(fasta_id))
+
+    def __contains__(self, fasta_id):
+        try:
+            self.index_of(fasta_id)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return self._iter_ids()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def items(self):
+        return ((self.id_at(index), self.sequence_at(index))
+                for index in range(len(self)))
+
+    def values(self):
+        return (self.sequence_at(index) for index in range(len(self)))
+
+    def __repr__(self):
+        return 'SequenceCollection({} records, {} residues)'.format(
+            len(self), len(self._residues))
+
+
+class SequenceView(Mapping):
+    '''
+    Dict-like view of some records of a SequenceCollection, as returned by
+    SequenceCollection.select.
+    '''
+    __slots__ = ('collection', 'indices', '_lookup')
+
+    def __init__(self, collection, indices):
+        self.collection = collection
+        self.indices = indices
+        self._lookup = None
+
+    def record(self, position):
+        return self.collection.record(self.indices[position])
+
+    def select(self, mask):
+        '''
+        Returns a view of some records of this view (see
+        SequenceCollection.select).
+        '''
+        selected = _mask_to_indices(mask, len(self))
+        return SequenceView(self.collection,
+                            array('q', (self.indices[i] for i in selected)))
+
+    def take(self, indices):
+        '''
+        Returns a view of the records at some positions of this view.
+        '''
+        return SequenceView(self.collection,
+                            array('q', (self.indices[int(i)] for i in indices)))
+
+    def __getitem__(self, fasta_id):
+        if self._lookup is None:
+            self._lookup = {}
+            for index in self.indices:
+                self._lookup.setdefault(self.collection.id_at(index), index)
+        return self.collection.sequence_at(self._lookup[fasta_id])
+
+    def __iter__(self):
+        return (self.collection.id_at(index) for index in self.indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def items(self):
+        return ((self.collection.id_at(index),
+                 self.collection.sequence_at(index))
+                for index in self.indices)
+
+    def values(self):
+        return (self.collection.sequence_at(index) for index in self.indices)
+
+    def __repr__(self):
+        return 'SequenceView({} of {} records)'.format(len(self),
+                                                      len(self.collection))
+
+
+def _mask_to_indices(mask, length):
+    '''
+    Converts a boolean mask to an array of the selected positions.
+    '''
+    if len(mask) != length:
+        raise ValueError("The mask has {} values for {} records.".format(
+            len(mask), length))
+    if hasattr(mask, 'nonzero'):
+        return array('q', mask.nonzero()[0].tolist())
+    return array('q', (i for i, keep in enumerate(mask) if keep))
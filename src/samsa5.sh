@@ -68,8 +68,7 @@ fi
 ####################################################################
 #
 # STEP 1: CLEANING FILES WITH TRIMMOMATIC ## PASS
-Step=$(grep "TRIMMO" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "TRIMMO" ]
+if ! grep -qx "TRIMMO" "$INPUT_DIR/checkpoints"
   then
 
 if ls $INPUT_DIR/*.gz &>/dev/null; then
@@ -114,8 +113,7 @@ fi
 #       Example: control_1.R1.fastq
 #                control_1.R2.fastq
 
-Step=$(grep "MERGING" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "MERGING" ]
+if ! grep -qx "MERGING" "$INPUT_DIR/checkpoints"
   then
 
 $MKDIR $STEP_2
@@ -147,8 +145,7 @@ fi
 #
 # STEP 2.9: GETTING RAW SEQUENCES COUNTS # PASS
 # Note: These are used later for statistical analysis.
-Step=$(grep "RAW" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "RAW" ]
+if ! grep -qx "RAW" "$INPUT_DIR/checkpoints"
   then
 
 if [[ -f $STEP_2/raw_counts.txt ]]; then
@@ -179,8 +176,7 @@ fi
 # STEP 3: REMOVING RIBOSOMAL READS WITH SORTMERNA # PASS
 # Note: this step assumes that the SortMeRNA databases are indexed.  If not,
 # do that first (see the SortMeRNA user manual for details).
-Step=$(grep "RIBO" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "RIBO" ]
+if ! grep -qx "RIBO" "$INPUT_DIR/checkpoints"
   then
 
 for file in $STEP_2/*.assembled2.fastq
@@ -206,8 +202,7 @@ fi
 # STEP 4: ANNOTATING WITH DIAMOND AGAINST REFSEQ
 # Note: this step assumes that the DIAMOND database is already built.  If not,
 # do that first before running this step.
-Step=$(grep "REFSEQ_ANNOT" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "REFSEQ_ANNOT" ]
+if ! grep -qx "REFSEQ_ANNOT" "$INPUT_DIR/checkpoints"
   then
 
 echo "Now starting on DIAMOND org annotations at: "; date
@@ -237,8 +232,7 @@ fi
 ####################################################################
 #
 # STEP 5: AGGREGATING WITH ANALYSIS_COUNTER
-Step=$(grep "REFSEQ_AGGREG" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "REFSEQ_AGGREG" ]
+if ! grep -qx "REFSEQ_AGGREG" "$INPUT_DIR/checkpoints"
   then
 
 # BEFORE: for file in $STEP_4/*RefSeq_annotated
@@ -263,8 +257,7 @@ fi
 ####################################################################
 #
 # STEP 4.1: ANNOTATING WITH DIAMOND AGAINST SUBSYSTEMS
-Step=$(grep "SUBSYS_ANNOT" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "SUBSYS_ANNOT" ]
+if ! grep -qx "SUBSYS_ANNOT" "$INPUT_DIR/checkpoints"
   then
 
 echo "Now starting on DIAMOND Subsystems annotations at: "; date
@@ -291,8 +284,7 @@ fi
 ##################################################################
 #
 # STEP 5.1: PYTHON SUBSYSTEMS ANALYSIS COUNTER
-Step=$(grep "SUBSYS_AGGREG" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "SUBSYS_AGGREG" ]
+if ! grep -qx "SUBSYS_AGGREG" "$INPUT_DIR/checkpoints"
   then
 
 for file in $STEP_4/*subsys_annotated
@@ -326,8 +318,7 @@ fi
 # STEP 6: R ANALYSIS
 # Note: For R to properly identify files to compare/contrast, they must include
 # the appropriate prefix (either "control_$file" or experimental_$file")!
-Step=$(grep "R_ANALYSIS" $INPUT_DIR/checkpoints)
-if [ "${Step}" != "R_ANALYSIS" ]
+if ! grep -qx "R_ANALYSIS" "$INPUT_DIR/checkpoints"
   then
 
 checked Rscript $R_DIR/run_DESeq_stats.R \
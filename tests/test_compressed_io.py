@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:12:48 2026
+
+@author: vrrodovalho
+
+Tests of the transparent decompression of compressed_io, from files and
+from pipes, whose first bytes cannot be read twice.
+
+"""
+
+import os
+import threading
+
+import pytest
+
+from bioinformatics.compressed_io import (detect_compression, open_input,
+                                          open_output)
+
+
+DATA = b''.join(b'>seq%d\nMKVLAAGL\n' % i for i in range(5000))
+
+
+def compress(path, compression):
+    with open(str(path), 'wb') as raw:
+        output = open_output(raw, compression=compression)
+        output.write(DATA)
+        output.close()
+
+def pipe_of(path):
+    '''
+    Returns a pipe from which the contents of a file can be read.
+    '''
+    read_end, write_end = os.pipe()
+
+    def feed():
+        with open(str(path), 'rb') as source, open(write_end, 'wb') as pipe:
+            pipe.write(source.read())
+
+    threading.Thread(target=feed, daemon=True).start()
+    return '/dev/fd/{}'.format(read_end), read_end
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'bgzf'])
+def test_open_input(tmp_path, compression):
+    path = tmp_path / 'seqs.fa'
+    compress(path, compression)
+    assert detect_compression(str(path)) == compression
+    with open_input(str(path)) as stream:
+        assert stream.read() == DATA
+    with open_input(str(path), 'rt') as stream:
+        assert stream.readline() == '>seq0\n'
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'bgzf'])
+def test_open_input_pipe(tmp_path, compression):
+    path = tmp_path / 'seqs.fa'
+    compress(path, compression)
+    pipe, read_end = pipe_of(path)
+    try:
+        with open_input(pipe) as stream:
+            assert stream.read() == DATA
+    finally:
+        os.close(read_end)
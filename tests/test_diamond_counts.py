@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 03:20:41 2026
+
+@author: vrrodovalho
+
+Tests of the DIAMOND aggregator of diamond_counts: the parsing of RefSeq
+headers, and the organism and function tables of a tabular file, with
+unnamed and unmatched hits, in one process and on a process pool.
+
+"""
+
+import pytest
+
+from bioinformatics.diamond_counts import (parse_refseq_header,
+                                           aggregate_diamond_files)
+
+
+REFSEQ = ('>WP_1.1 DNA polymerase [Escherichia coli]\nMKV\n'
+          '>WP_2.1 helicase [Bacillus [sub] x]\nMKL\n'
+          '>WP_3.1 hypothetical protein\nMKA\n')
+HITS = ['WP_1.1', 'WP_1.1', 'WP_2.1', 'WP_3.1', 'XX_9.1']
+
+
+def read_table(path):
+    with open(str(path)) as table:
+        return [line.rstrip('\n').split('\t') for line in table]
+
+@pytest.mark.parametrize('header, parts', [
+    ('WP_1.1 DNA polymerase [Escherichia coli]',
+     ('WP_1.1', 'DNA polymerase', 'Escherichia coli')),
+    ('WP_2.1 helicase [Bacillus [sub] x]',
+     ('WP_2.1', 'helicase', 'Bacillus [sub] x')),
+    ('WP_3.1 [2Fe-2S] ferredoxin [Vibrio cholerae]',
+     ('WP_3.1', '[2Fe-2S] ferredoxin', 'Vibrio cholerae')),
+    ('WP_4.1 hypothetical protein', ('WP_4.1', 'hypothetical protein', '')),
+    ('WP_5.1', ('WP_5.1', '', ''))])
+def test_parse_refseq_header(header, parts):
+    assert parse_refseq_header(header) == parts
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_aggregate(tmp_path, workers):
+    reference = tmp_path / 'RefSeq_bac.fa'
+    reference.write_text(REFSEQ)
+    tab_files = []
+    for sample in ['A', 'B']:
+        tab_file = tmp_path / '{}.RefSeq_annotated'.format(sample)
+        tab_file.write_text(''.join('r{}\t{}\t90\n'.format(i, hit)
+                                    for i, hit in enumerate(HITS)))
+        tab_files.append(str(tab_file))
+    summaries = aggregate_diamond_files(tab_files, str(reference),
+                                        workers=workers, verbose=False)
+    # the organism of WP_3.1 has no name, and XX_9.1 is not in the index
+    assert summaries[0] == {'file': tab_files[0], 'hits': 5, 'unmatched': 1,
+                            'organisms': 2, 'functions': 3}
+    organisms = read_table(tab_files[1] + '_organism.tsv')
+    assert organisms == [['40.0', '2', 'Escherichia coli'],
+                         ['20.0', '1', 'Bacillus [sub] x']]
+    functions = read_table(tab_files[1] + '_function.tsv')
+    assert [row[2] for row in functions] == ['DNA polymerase', 'helicase',
+                                             'hypothetical protein']
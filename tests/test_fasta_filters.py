@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:02:51 2026
+
+@author: vrrodovalho
+
+Tests of the sequence filters of fasta_filters, one sequence at a time and
+in batch mode: both modes of the forbidden characters filter give the same
+results, and the default is the behaviour of previous versions.
+
+"""
+
+import pytest
+
+from bioinformatics.fasta_filters import filter_sequences
+
+
+SEQUENCES = {'clean': 'MKVLAAGLLL',
+             'one': 'MKVLXAGLLL',
+             'both': 'MKVLXAGLBL',
+             'lower': 'mkvlxaglbl'}
+FILTER_BY = {'seq_size': False, 'seq_char': True,
+             'id_list_in': False, 'id_list_out': False}
+
+
+def removed(batch, **kwargs):
+    counts = {}
+    filtered = filter_sequences(SEQUENCES, forbidden=['X', 'B'],
+                                filter_by=FILTER_BY, batch=batch,
+                                counts=counts, explain=False, **kwargs)
+    return sorted(filtered['out']), counts['seq_char']
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_char_mode(batch):
+    # by default, only the sequences with all the forbidden characters
+    assert removed(batch) == (['both', 'lower'], 2)
+    assert removed(batch, char_mode='all') == (['both', 'lower'], 2)
+    assert removed(batch, char_mode='any') == (['both', 'lower', 'one'], 3)
+
+def test_unknown_char_mode():
+    with pytest.raises(ValueError):
+        removed(False, char_mode='some')
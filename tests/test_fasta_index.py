@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 05:02:17 2026
+
+@author: vrrodovalho
+
+Tests of the offset index of fasta_index: the saved index is read back as
+it was built, fasta_ids with tabs included, and random access returns the
+sequences of regular and irregular records.
+
+"""
+
+from bioinformatics.fasta_index import (FastaIndex, build_fasta_index,
+                                        read_fasta_index)
+
+
+FASTA = ('>sp|P1|A\tdescription\twith tabs\nMKVL\nAAGL\nLL\n'
+         '>sp|P2|B irregular\nMK\nVLAAG\nL\n'
+         '>sp|P3|C\nMKV\n')
+SEQUENCES = {'sp|P1|A\tdescription\twith tabs': 'MKVLAAGLLL',
+             'sp|P2|B irregular': 'MKVLAAGL',
+             'sp|P3|C': 'MKV'}
+
+
+def test_index_round_trip(tmp_path):
+    fasta_file = tmp_path / 'seqs.fa'
+    fasta_file.write_text(FASTA)
+    entries = build_fasta_index(fasta_file, verbose=False)
+    assert list(entries) == list(SEQUENCES)
+    assert read_fasta_index(fasta_file) == entries
+    with FastaIndex(fasta_file, verbose=False) as index:
+        assert {fasta_id: index.fetch(fasta_id)
+                for fasta_id in index} == SEQUENCES
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:40:12 2026
+
+@author: vrrodovalho
+
+Tests of the multi-process filtering of fasta_parallel against the single
+core fasta_parser and filter_sequences, for plain and gzip files.
+
+"""
+
+import gzip
+
+import pytest
+
+from bioinformatics.fasta_filters import fasta_parser, filter_sequences
+from bioinformatics.fasta_parallel import filter_fasta_parallel
+
+
+CRITERIA = {'min_seq_len': 20,
+            'forbidden': ['X'],
+            'id_filters': ['sp|P1', 'sp|P3'],
+            'filter_by': {'seq_size': True, 'seq_char': True,
+                          'id_list_in': False, 'id_list_out': True},
+            'id_match': 'substring',
+            'char_mode': 'any'}
+
+
+@pytest.fixture
+def fasta_file(tmp_path):
+    lines = []
+    for i in range(300):
+        sequence = 'M' + 'ACDEFGHIKL' * (i % 5) + ('X' if i % 7 == 0 else '')
+        lines.append('>sp|P{}|PROT_{} protein {}'.format(i, i, i))
+        lines.append(sequence)
+    # a duplicated fasta_id, of which only the first record is kept
+    lines.extend(['>sp|P2|PROT_2 protein 2', 'M' * 50])
+    path = tmp_path / 'proteins.fa'
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+def serial_filter(fasta_file):
+    sequences = fasta_parser(str(fasta_file), verbose=False)
+    if isinstance(sequences, tuple):
+        sequences = sequences[0]
+    counts = {}
+    filtered = filter_sequences(sequences, counts=counts, explain=False,
+                                **CRITERIA)
+    return filtered, counts
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parallel_matches_serial(fasta_file, workers):
+    expected, expected_counts = serial_filter(fasta_file)
+    counts = {}
+    filtered = filter_fasta_parallel(str(fasta_file), workers=workers,
+                                     counts=counts, explain=False,
+                                     **CRITERIA)
+    assert counts == expected_counts
+    assert list(filtered['in'].items()) == list(expected['in'].items())
+    assert filtered['out'] == expected['out']
+
+def test_gzip_falls_back_to_serial(fasta_file, tmp_path):
+    expected, expected_counts = serial_filter(fasta_file)
+    gzip_file = tmp_path / 'proteins.fa.gz'
+    gzip_file.write_bytes(gzip.compress(fasta_file.read_bytes()))
+    counts = {}
+    filtered = filter_fasta_parallel(str(gzip_file), workers=2,
+                                     counts=counts, explain=False,
+                                     **CRITERIA)
+    assert counts == expected_counts
+    assert list(filtered['in'].items()) == list(expected['in'].items())
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:05:31 2026
+
+@author: vrrodovalho
+
+Tests of FastaWriter: the wrapping of the sequences, and atomic writes, whose
+temporary files are removed when the writer cannot be opened or closed, and
+are not shared by writers of the same path in different threads.
+
+"""
+
+import errno
+import threading
+
+import pytest
+
+from bioinformatics.fasta_filters import (FastaWriter, fasta_parser,
+                                          insert_newlines, wrap_sequence)
+
+
+class FullDisk():
+    '''
+    Wraps the output of a writer, failing like a full disk on writes.
+    '''
+
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, data):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    def close(self):
+        self.out.close()
+
+
+@pytest.mark.parametrize('length', [0, 1, 64, 65, 4095, 4096, 4160, 4161,
+                                    100000])
+def test_wrap_sequence(length):
+    sequence = ('MKVLAAGLLL' * 10001)[:length]
+    assert wrap_sequence(sequence) == insert_newlines(sequence)
+    assert wrap_sequence(sequence, 60) == insert_newlines(sequence, 60)
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'bgzf'])
+def test_writer(tmp_path, compression):
+    output = tmp_path / 'out.fa'
+    with FastaWriter(output, every=4, compression=compression) as writer:
+        writer.write_records({'a': 'MKVLAAG', 'b': 'MK'})
+    sequences = fasta_parser(str(output), verbose=False)
+    assert sequences == {'a': 'MKVLAAG', 'b': 'MK'}
+    assert [path.name for path in tmp_path.iterdir()] == ['out.fa']
+
+def test_failed_close_leaves_no_file(tmp_path):
+    writer = FastaWriter(tmp_path / 'out.fa', compression='gzip')
+    writer.write('a', 'MKVLAAG')
+    writer._out = FullDisk(writer._out)
+    with pytest.raises(OSError):
+        writer.close()
+    assert list(tmp_path.iterdir()) == []
+
+def test_failed_open_leaves_no_file(tmp_path):
+    with pytest.raises(ValueError):
+        FastaWriter(tmp_path / 'out.fa', compression='rar')
+    assert list(tmp_path.iterdir()) == []
+
+def test_threads_writing_same_path(tmp_path):
+    output = tmp_path / 'out.fa'
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def write(number):
+        try:
+            with FastaWriter(output) as writer:
+                barrier.wait()
+                for i in range(1000):
+                    writer.write('seq{}_{}'.format(number, i), 'M' * 100)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [path.name for path in tmp_path.iterdir()] == ['out.fa']
+    # the file is the complete output of one of the writers
+    sequences = fasta_parser(str(output), verbose=False)
+    assert len(sequences) == 1000
+    assert len({fasta_id.split('_')[0] for fasta_id in sequences}) == 1
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 02:21:30 2026
+
+@author: vrrodovalho
+
+Tests of the FASTQ read counter of fastq_stats, on plain, gzip and
+multi-member gzip files, and on pipes.
+
+"""
+
+import os
+import gzip
+import threading
+
+import pytest
+
+from bioinformatics.fastq_stats import count_fastq_reads
+
+
+READS = b'@r\nACGT\n+\nIIII\n' * 1000
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'members'])
+def test_count_fastq_reads(tmp_path, compression):
+    path = tmp_path / 'reads.fastq'
+    if compression is None:
+        data = READS
+    elif compression == 'gzip':
+        data = gzip.compress(READS)
+    else:
+        data = gzip.compress(READS[:600]) + gzip.compress(READS[600:])
+    path.write_bytes(data)
+    assert count_fastq_reads(str(path), block_size=1024) == 1000
+
+    # the same file from a pipe
+    read_end, write_end = os.pipe()
+
+    def feed():
+        with open(write_end, 'wb') as pipe:
+            pipe.write(data)
+
+    threading.Thread(target=feed, daemon=True).start()
+    try:
+        assert count_fastq_reads('/dev/fd/{}'.format(read_end)) == 1000
+    finally:
+        os.close(read_end)
+
+def test_truncated(tmp_path):
+    path = tmp_path / 'reads.fastq'
+    path.write_bytes(READS[:-5])
+    with pytest.raises(ValueError, match='multiple of 4'):
+        count_fastq_reads(str(path))
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 05:12:44 2026
+
+@author: vrrodovalho
+
+Tests of the asyncio KEGG client of kegg_async against a local mock KEGG
+REST server: keep-alive connections, rate limiting, chunked bodies, 304
+revalidation of the cache, retries on 503, stale responses and closing.
+
+"""
+
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bioinformatics.kegg_rest import KeggRestClient
+from bioinformatics.kegg_async import (AsyncKeggClient, HttpError,
+                                       convert_kegg_ids,
+                                       retrieve_kegg_mapping)
+
+
+TABLES = {'hsa': 'hsa:7529\tup:P31946\nhsa:7531\tup:P62258\n',
+          'eco': 'eco:b0001\tup:P0AD86\n'}
+# a 2-byte character split between two chunks
+CHUNKS = ['hsa:1\tup:Q\xc3'.encode('latin-1'),
+          '\xa9\nhsa:2\tup:P1\n'.encode('latin-1')]
+
+
+class MockKegg(BaseHTTPRequestHandler):
+    '''
+    A KEGG REST server with conv tables, a chunked table, a table that
+    fails with 503 a few times and ETag revalidation.
+    '''
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((time.monotonic(), self.path,
+                                    self.headers.get('If-None-Match')))
+        parts = self.path.strip('/').split('/')
+        if parts[:1] != ['conv'] or len(parts) != 3:
+            return self._send(404, b'')
+        if parts[1] == 'chunked':
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in CHUNKS:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+            return
+        if parts[1] == 'flaky':
+            with server.lock:
+                server.failures -= 1
+                fail = server.failures >= 0
+            if fail:
+                return self._send(503, b'busy')
+            return self._send(200, TABLES['hsa'].encode())
+        if parts[1] == 'uniprot':
+            # per-id conversion, such as conv/uniprot/hsa:7529+hsa:7531
+            lines = ['{}\tup:P{}\n'.format(kegg_id, kegg_id.split(':')[1])
+                     for kegg_id in parts[2].split('+')]
+            return self._send(200, ''.join(lines).encode())
+        table = TABLES.get(parts[1])
+        if table is None:
+            return self._send(404, b'')
+        etag = '"{}-v1"'.format(parts[1])
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, None, etag)
+        return self._send(200, table.encode(), etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        if body is not None:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockKegg)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = []
+    server.failures = 0
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def cache(server, tmp_path):
+    client = KeggRestClient(
+        base_url='http://127.0.0.1:{}'.format(server.server_address[1]),
+        cache_path=str(tmp_path / 'kegg.sqlite'), offline=False, timeout=5,
+        retries=3, backoff=0.01, verbose=False)
+    yield client
+    client.close()
+
+def run_client(cache, function, concurrency=3, rate=None):
+    '''
+    Runs function(client) with a new AsyncKeggClient and returns its result
+    and the client.
+    '''
+    async def main():
+        async with AsyncKeggClient(cache, concurrency, rate) as client:
+            return await function(client), client
+    return asyncio.run(main())
+
+def test_connections_are_reused(server, cache):
+    paths = ['conv/uniprot/hsa:{}'.format(i) for i in range(6)]
+    texts, client = run_client(cache, lambda client: client.get_many(paths),
+                               concurrency=1)
+    assert texts[paths[0]] == 'hsa:0\tup:P0\n'
+    assert client.requests == 6
+    assert client.connections == 1
+    assert server.connections == 1
+
+def test_rate_limit(server, cache):
+    rate = 20.0
+    paths = ['conv/uniprot/hsa:{}'.format(i) for i in range(5)]
+    run_client(cache, lambda client: client.get_many(paths), concurrency=5,
+               rate=rate)
+    times = sorted(request[0] for request in server.requests)
+    assert len(times) == 5
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    # some slack for the scheduling of the server threads
+    assert min(gaps) > 0.8 / rate
+    assert times[-1] - times[0] >= 4 * 0.9 / rate
+
+def test_chunked_body(server, cache):
+    text, _ = run_client(cache, lambda client: client.get('conv/chunked/x'))
+    assert text == 'hsa:1\tup:Q\xe9\nhsa:2\tup:P1\n'
+    # the decoded text is cached as received
+    assert cache.cached('conv/chunked/x')['body'].decode('utf-8') == text
+
+def test_304_revalidation(server, cache):
+    first, _ = run_client(cache, lambda client: client.get('conv/hsa/uniprot'))
+    fetched = cache.cached('conv/hsa/uniprot')['fetched']
+    # fresh: served from the cache, without a request
+    run_client(cache, lambda client: client.get('conv/hsa/uniprot'))
+    assert len(server.requests) == 1
+    time.sleep(0.01)
+    second, _ = run_client(cache, lambda client: client.get(
+        'conv/hsa/uniprot', refresh=True))
+    assert second == first == TABLES['hsa']
+    assert len(server.requests) == 2
+    assert server.requests[1][2] == '"hsa-v1"'
+    assert cache.cached('conv/hsa/uniprot')['fetched'] > fetched
+
+def test_retry_on_503(server, cache):
+    server.failures = 2
+    text, client = run_client(cache, lambda client: client.get(
+        'conv/flaky/uniprot'))
+    assert text == TABLES['hsa']
+    assert len(server.requests) == 3
+
+def test_no_retry_on_404(server, cache):
+    with pytest.raises(HttpError) as error:
+        run_client(cache, lambda client: client.get('conv/none/uniprot'))
+    assert error.value.status == 404
+    assert len(server.requests) == 1
+
+def test_stale_response_only_on_server_errors(server, cache):
+    cache.store('conv/flaky/uniprot', b'stale\n', fetched=0)
+    cache.store('conv/none/uniprot', b'stale\n', fetched=0)
+    server.failures = 10
+    text, _ = run_client(cache, lambda client: client.get(
+        'conv/flaky/uniprot'))
+    assert text == 'stale\n'
+    with pytest.raises(HttpError) as error:
+        run_client(cache, lambda client: client.get('conv/none/uniprot'))
+    assert error.value.status == 404
+
+def test_close(server, cache, tmp_path, monkeypatch):
+    monkeypatch.setenv('KEGG_CACHE', str(tmp_path / 'default.sqlite'))
+
+    async def main():
+        async with AsyncKeggClient(cache) as client:
+            await client.get('conv/hsa/uniprot')
+            writers = [connection.writer for connection in client._idle]
+        # the default cache is created, and closed, by the client
+        async with AsyncKeggClient() as default:
+            default.cache.cached('conv/hsa/uniprot')
+        return writers, default.cache
+
+    writers, default_cache = asyncio.run(main())
+    assert len(writers) == 1 and writers[0].is_closing()
+    assert default_cache._db is None
+    # a cache given to the client is left open
+    assert cache.cached('conv/hsa/uniprot') is not None
+
+def test_batch_functions(server, cache):
+    mapping = retrieve_kegg_mapping(['hsa', 'eco'], cache=cache, rate=None)
+    assert mapping.to_uniprot(['hsa:7529', 'eco:b0001']) == {
+        'hsa:7529': ('P31946',), 'eco:b0001': ('P0AD86',)}
+    ids = ['hsa:{}'.format(i) for i in range(25)]
+    mapping = convert_kegg_ids(ids, cache=cache, rate=None)
+    assert len(mapping.kegg_ids()) == 25
+    # 10 ids per request, and the tables of the first call are cached
+    assert len(server.requests) == 2 + 3
+
+def test_inside_running_loop(server, cache):
+    async def notebook_cell():
+        # as in IPython or Spyder, where an event loop is already running
+        return retrieve_kegg_mapping('hsa', cache=cache, rate=None)
+    mapping = asyncio.run(notebook_cell())
+    assert len(mapping.uniprot_ids()) == 2
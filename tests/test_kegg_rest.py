@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:30:06 2026
+
+@author: vrrodovalho
+
+Tests of the cache of the KEGG REST client of kegg_rest against a local stub
+KEGG server: time to live, 304 revalidation, stale responses when KEGG
+fails, client errors and offline mode.
+
+"""
+
+import time
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from bioinformatics.kegg_rest import KeggRestClient
+
+
+TABLE = b'hsa:7529\tup:P31946\nhsa:7531\tup:P62258\n'
+ETAG = '"hsa-v1"'
+
+
+class StubKegg(BaseHTTPRequestHandler):
+    '''
+    Serves conv/hsa/uniprot with an ETag, or the error status set in
+    server.status.
+    '''
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get('If-None-Match'))
+        if self.server.status is not None:
+            return self._send(self.server.status, b'error')
+        if self.path != '/conv/hsa/uniprot':
+            return self._send(404, b'')
+        if self.headers.get('If-None-Match') == ETAG:
+            return self._send(304, None)
+        self._send(200, TABLE)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('ETag', ETAG)
+        if body is not None:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = HTTPServer(('127.0.0.1', 0), StubKegg)
+    server.requests = []
+    server.status = None
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(server, tmp_path):
+    client = KeggRestClient(
+        base_url='http://127.0.0.1:{}'.format(server.server_address[1]),
+        cache_path=str(tmp_path / 'kegg.sqlite'), offline=False, timeout=5,
+        retries=1, backoff=0.01, verbose=False)
+    yield client
+    client.close()
+
+def test_fresh_responses_are_cached(server, client):
+    assert client.conv('hsa', 'uniprot') == TABLE.decode().splitlines()
+    assert client.get('conv/hsa/uniprot') == TABLE
+    assert server.requests == [None]
+    assert client.cached('conv/hsa/uniprot')['etag'] == ETAG
+
+def test_revalidation(server, client):
+    client.get('conv/hsa/uniprot')
+    fetched = time.time() - 30
+    client.store('conv/hsa/uniprot', TABLE, ETAG, fetched=fetched)
+    client.ttl = 10
+    assert client.get('conv/hsa/uniprot') == TABLE
+    # a 304 answers the conditional request, and restarts the time to live
+    assert server.requests == [None, ETAG]
+    assert client.cached('conv/hsa/uniprot')['fetched'] > fetched
+    assert client.get('conv/hsa/uniprot') == TABLE
+    assert len(server.requests) == 2
+
+def test_refresh(server, client):
+    client.get('conv/hsa/uniprot')
+    assert client.get('conv/hsa/uniprot', refresh=True) == TABLE
+    assert server.requests == [None, ETAG]
+
+def test_stale_response_on_server_error(server, client):
+    client.get('conv/hsa/uniprot')
+    client.ttl = 0
+    server.status = 503
+    assert client.get('conv/hsa/uniprot') == TABLE
+    # the request was retried before falling back to the cache
+    assert len(server.requests) == 3
+
+def test_stale_response_on_network_error(server, client):
+    client.get('conv/hsa/uniprot')
+    unreachable = KeggRestClient(base_url='http://127.0.0.1:9',
+                                 cache_path=client.cache_path, ttl=0,
+                                 offline=False, timeout=1, retries=0,
+                                 verbose=False)
+    with unreachable:
+        assert unreachable.get('conv/hsa/uniprot') == TABLE
+        with pytest.raises(urllib.error.URLError):
+            unreachable.get('conv/eco/uniprot')
+
+def test_client_errors_are_raised(server, client):
+    client.get('conv/hsa/uniprot')
+    client.ttl = 0
+    server.status = 400
+    with pytest.raises(urllib.error.HTTPError) as error:
+        client.get('conv/hsa/uniprot')
+    assert error.value.code == 400
+    # client errors are not retried
+    assert len(server.requests) == 2
+
+def test_offline(server, client):
+    client.get('conv/hsa/uniprot')
+    client.offline = True
+    client.ttl = 0
+    assert client.get('conv/hsa/uniprot') == TABLE
+    with pytest.raises(LookupError):
+        client.get('conv/eco/uniprot')
+    assert len(server.requests) == 1
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 06:02:15 2026
+
+@author: vrrodovalho
+
+Tests of the task graph runner of pipeline and of the SAMSA2 pipeline of
+samsa, with stub executables in place of the real tools: the core budget,
+failures, dependency errors, dry runs, a whole run of the pipeline and its
+checkpoints.
+
+"""
+
+import os
+import sys
+import stat
+import time
+import threading
+
+import pytest
+
+from bioinformatics.pipeline import Pipeline, Task
+from bioinformatics.samsa import samsa_config, run_samsa
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src')
+TOOLS = ['java', 'pear', 'Rscript', 'sortmerna', 'diamond', 'python']
+# the tools of SAMSA2, writing small outputs where the real ones would
+STUB = '''#!{python}
+import os, sys
+name = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+if os.environ.get('STUB_LOG'):
+    with open(os.environ['STUB_LOG'], 'a') as log:
+        log.write(' '.join([name] + args) + '\\n')
+
+def opt(flag):
+    return args[args.index(flag) + 1]
+
+def touch(path, text='@r\\nACGT\\n+\\nIIII\\n'):
+    with open(path, 'w') as output:
+        output.write(text)
+
+if name == 'java':
+    if args[2] == 'PE':
+        for path in args[8:12]:
+            touch(path)
+    else:
+        touch(args[7])
+elif name == 'pear':
+    for suffix in ['.assembled.fastq', '.unassembled.forward.fastq',
+                   '.unassembled.reverse.fastq', '.discarded.fastq']:
+        touch(opt('-o') + suffix)
+elif name == 'Rscript':
+    if os.path.basename(args[0]) == 'combining_unmerged.R':
+        for file_name in os.listdir(args[1]):
+            if file_name.endswith('.assembled.fastq'):
+                touch(os.path.join(args[1], file_name.replace(
+                    '.assembled.fastq', '.assembled2.fastq')))
+    else:
+        touch(opt('-O'), 'DESeq2\\n')
+elif name == 'sortmerna':
+    touch(opt('--other') + '.fastq')
+elif name == 'diamond':
+    if args[0] == 'blastx':
+        touch(opt('-a') + '.daa', 'daa\\n')
+    else:
+        touch(opt('-o'), 'r1\\tWP_1.1\\t90\\nr2\\tWP_2.1\\t90\\n'
+                         'r3\\tWP_1.1\\t80\\n')
+elif name == 'python':
+    script = os.path.basename(args[0])
+    if script == 'DIAMOND_subsystems_analysis_counter.py':
+        touch(opt('-O'), 'hierarchy\\n')
+        touch(opt('-P'), 'receipt\\n')
+    elif script == 'subsys_reducer.py':
+        touch(opt('-I') + '.reduced', 'reduced\\n')
+'''
+REFSEQ = ('>WP_1.1 DNA polymerase [Escherichia coli]\nMKV\n'
+          '>WP_2.1 helicase [Bacillus subtilis]\nMKL\n')
+
+
+def write_stub(directory, name, source):
+    path = os.path.join(str(directory), name)
+    with open(path, 'w') as stub:
+        stub.write(source)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+def write_fastq(path):
+    with open(str(path), 'w') as fastq:
+        fastq.write('@r1\nACGT\n+\nIIII\n')
+
+@pytest.fixture
+def samsa(tmp_path, monkeypatch):
+    '''
+    A SAMSA2 directory with the default layout of the databases, two
+    samples (one paired, one single) and stub tools.
+    '''
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    for tool in TOOLS:
+        write_stub(bin_dir, tool, STUB.format(python=sys.executable))
+    databases = tmp_path / 'samsa' / 'full_databases'
+    databases.mkdir(parents=True)
+    (databases / 'RefSeq_bac.fa').write_text(REFSEQ)
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    for file_name in ['A_R1.fastq', 'A_R2.fastq', 'B_R1.fastq']:
+        write_fastq(input_dir / file_name)
+    out_dir = tmp_path / 'output'
+    monkeypatch.setenv('STUB_LOG', str(tmp_path / 'calls.log'))
+    # the RefSeq aggregation runs python -m bioinformatics
+    monkeypatch.setenv('PYTHONPATH', SRC_DIR)
+    tools = {tool.lower(): str(bin_dir / tool) for tool in TOOLS}
+    return samsa_config(samsa=str(tmp_path / 'samsa'),
+                        input_dir=str(input_dir), out_dir=str(out_dir),
+                        work_dir=str(out_dir), **tools)
+
+def tracking(log, lock, running, peak, delay=0.05):
+    '''
+    Returns a task function that records its threads and how many threads
+    are in use while it runs.
+    '''
+    def function(task, threads):
+        with lock:
+            log[task.name] = threads
+            running[0] += threads
+            peak[0] = max(peak[0], running[0])
+        time.sleep(delay)
+        with lock:
+            running[0] -= threads
+    return function
+
+def test_core_budget():
+    log, lock, running, peak = {}, threading.Lock(), [0], [0]
+    function = tracking(log, lock, running, peak)
+    pipeline = Pipeline()
+    pipeline.add(Task('big', function=function, threads=16))
+    for name in ['a', 'b', 'c']:
+        pipeline.add(Task(name, function=function, threads=2, deps=['big']))
+    pipeline.add(Task('small', function=function, threads=3, min_threads=3,
+                      deps=['a']))
+    statuses = pipeline.run(cores=4, verbose=False)
+    assert set(statuses.values()) == {'done'}
+    assert peak[0] <= 4
+    # a task gets its threads, up to the free cores
+    assert log['big'] == 4
+    assert log['a'] == log['b'] == 2
+    # and starts only once its min_threads are free
+    assert log['small'] == 3
+
+def test_threads_placeholder(tmp_path):
+    stub = write_stub(tmp_path, 'tool', '#!{}\nimport sys\nopen(sys.argv[2], '
+                      "'w').write(sys.argv[1])\n".format(sys.executable))
+    output = tmp_path / 'threads.txt'
+    pipeline = Pipeline()
+    pipeline.add(Task('tool', [[stub, '-p{threads}', str(output)]],
+                      threads=8, outputs=[str(output)]))
+    assert pipeline.run(cores=3, verbose=False) == {'tool': 'done'}
+    assert output.read_text() == '-p3'
+
+def test_failed_task_skips_dependents(tmp_path):
+    fail = write_stub(tmp_path, 'fail', '#!/bin/sh\nexit 1\n')
+    done = []
+    pipeline = Pipeline()
+    pipeline.add(Task('broken', [[fail]]))
+    pipeline.add(Task('after', function=lambda task, threads: done.append(1),
+                      deps=['broken']))
+    pipeline.add(Task('later', function=lambda task, threads: done.append(2),
+                      deps=['after']))
+    pipeline.add(Task('other', function=lambda task, threads: done.append(3)))
+    statuses = pipeline.run(cores=2, verbose=False)
+    assert statuses == {'broken': 'failed', 'after': 'skipped',
+                        'later': 'skipped', 'other': 'done'}
+    assert done == [3]
+
+def test_keep_going_false(tmp_path):
+    fail = write_stub(tmp_path, 'fail', '#!/bin/sh\nexit 1\n')
+    done = []
+    pipeline = Pipeline()
+    pipeline.add(Task('broken', [[fail]]))
+    pipeline.add(Task('other', function=lambda task, threads: done.append(1)))
+    # with one core, other waits for broken, and is not started after it
+    statuses = pipeline.run(cores=1, keep_going=False, verbose=False)
+    assert statuses == {'broken': 'failed', 'other': 'skipped'}
+    assert done == []
+
+def test_unknown_dependency():
+    pipeline = Pipeline()
+    pipeline.add(Task('a', deps=['missing']))
+    with pytest.raises(ValueError, match='unknown task missing'):
+        pipeline.run(verbose=False)
+
+def test_cycle():
+    pipeline = Pipeline()
+    pipeline.add(Task('a', deps=['c']))
+    pipeline.add(Task('b', deps=['a']))
+    pipeline.add(Task('c', deps=['b']))
+    with pytest.raises(ValueError, match='cycle'):
+        pipeline.order()
+    with pytest.raises(ValueError):
+        pipeline.add(Task('a'))
+
+def test_dry_run(tmp_path, capsys):
+    output = tmp_path / 'out.txt'
+    pipeline = Pipeline()
+    pipeline.add(Task('first', [['tool', '-t', '{threads}', '-o',
+                                 str(output)]], threads=8,
+                      outputs=[str(output)]))
+    pipeline.add(Task('second', [['tool', str(output)]], deps=['first'],
+                      inputs=[str(output)]))
+    statuses = pipeline.run(cores=2, dry_run=True)
+    assert statuses == {'first': 'dry-run', 'second': 'dry-run'}
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        'first (threads: 2)',
+        '    tool -t 2 -o {}'.format(tmp_path / '.tmp{}.out.txt'.format(
+            os.getpid())),
+        'second (threads: 1, after: first)',
+        '    tool {}'.format(output)]
+    assert not output.exists()
+
+def test_samsa_pipeline(samsa):
+    statuses = run_samsa(samsa, cores=4, verbose=False)
+    failed = {name: status for name, status in statuses.items()
+              if status != 'done'}
+    assert failed == {}
+    out_dir = samsa['out_dir']
+    org_results = os.path.join(out_dir, 'step_5_output', 'RefSeq_results',
+                               'org_results')
+    with open(os.path.join(org_results, 'A.merged.RefSeq_annotated_'
+                           'organism.tsv')) as table:
+        rows = [line.split('\t')[1:] for line in table]
+    assert rows == [['2', 'Escherichia coli\n'],
+                    ['1', 'Bacillus subtilis\n']]
+    for output in ['RefSeq_org_DESeq_results.tab',
+                   'RefSeq_func_DESeq_results.tab',
+                   'Subsystems_level-1_DESeq_results.tab']:
+        assert os.path.exists(os.path.join(out_dir, output))
+    temporaries = [name for _, _, files in os.walk(out_dir)
+                   for name in files if name.startswith('.tmp')]
+    assert temporaries == []
+
+def test_staging_keeps_read_arguments(tmp_path):
+    reference = tmp_path / 'RefSeq_bac.fa'
+    reference.write_text(REFSEQ)
+    index = str(reference) + '.subjects'
+    merged = str(tmp_path / 'sample.merged')
+    task = Task('stage', [['index', str(reference), '--index-dir', index],
+                          ['pear', '-o', merged]],
+                outputs=[os.path.join(index, 'manifest.json'),
+                         merged + '.assembled.fastq'],
+                references=[str(reference)])
+    commands, staged = task._staged_commands(1)
+    temporary = str(tmp_path / '.tmp{}.sample.merged'.format(os.getpid()))
+    # the reference is a prefix of an output, but is only read
+    assert commands == [['index', str(reference), '--index-dir', index],
+                        ['pear', '-o', temporary]]
+    assert staged == {temporary + '.assembled.fastq':
+                      merged + '.assembled.fastq'}
+
+def test_samsa_checkpoints(samsa, tmp_path):
+    calls = tmp_path / 'calls.log'
+    assert set(run_samsa(samsa, cores=4, verbose=False).values()) == {'done'}
+    calls.unlink()
+    # nothing is run again while everything is up to date
+    statuses = run_samsa(samsa, cores=4, verbose=False)
+    assert set(statuses.values()) == {'current'}
+    assert not calls.exists()
+
+    # a new sample runs its own tasks and the ones of all samples
+    write_fastq(os.path.join(samsa['input_dir'], 'C_R1.fastq'))
+    statuses = run_samsa(samsa, cores=4, verbose=False)
+    done = sorted(name for name, status in statuses.items()
+                  if status == 'done')
+    assert done == ['combine_unmerged', 'deseq_func', 'deseq_org',
+                    'deseq_subsys', 'merge:C', 'raw_counts',
+                    'refseq_aggreg:C', 'refseq_annot:C', 'ribo:C',
+                    'subsys_aggreg:C', 'subsys_annot:C', 'trim:C']
+    assert {status for name, status in statuses.items()
+            if name not in done} == {'current'}
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 04:41:12 2026
+
+@author: vrrodovalho
+
+Tests of the stages of profiling: the files are only stat'ed while
+profiling, and the memory of the stages is labelled as the peak resident
+memory of the process unless it is traced by tracemalloc.
+
+"""
+
+import os
+import json
+
+import pytest
+
+from bioinformatics import profiling
+from bioinformatics.fasta_filters import fasta_parser
+
+
+FASTA = '>a\nMKVLAAG\n>b\nMK\n'
+
+
+@pytest.fixture
+def fasta_file(tmp_path):
+    path = tmp_path / 'seqs.fa'
+    path.write_text(FASTA)
+    return str(path)
+
+def test_disabled_stages_do_not_stat(fasta_file, monkeypatch):
+    stats = []
+    getsize = os.path.getsize
+    monkeypatch.setattr(os.path, 'getsize',
+                        lambda path: stats.append(path) or getsize(path))
+    assert not profiling.is_enabled()
+    fasta_parser(fasta_file, verbose=False)
+    assert stats == []
+    session = profiling.enable()
+    try:
+        fasta_parser(fasta_file, verbose=False)
+    finally:
+        profiling.disable()
+    assert stats == [fasta_file]
+    assert session.stages['fasta_parser']['bytes_read'] == len(FASTA)
+
+@pytest.mark.parametrize('trace_memory, memory, metric', [
+    (False, 'process_max_rss', 'process_max_rss_bytes'),
+    (True, 'traced_peak_memory', 'traced_peak_memory_bytes')])
+def test_memory_metric(tmp_path, fasta_file, trace_memory, memory, metric):
+    json_file = tmp_path / 'metrics.json'
+    with profiling.profiled(str(json_file), trace_memory=trace_memory):
+        fasta_parser(fasta_file, verbose=False)
+    stage = json.loads(json_file.read_text())['stages']['fasta_parser']
+    assert stage['records'] == 2
+    assert stage[memory] > 0
+    assert 'peak_memory' not in stage
+    prom_file = tmp_path / 'metrics.prom'
+    with profiling.profiled(str(prom_file), trace_memory=trace_memory):
+        fasta_parser(fasta_file, verbose=False)
+    lines = prom_file.read_text().splitlines()
+    assert any(line.startswith('{}{}{{stage="fasta_parser"}}'.format(
+        profiling.PROMETHEUS_PREFIX, metric)) for line in lines)
+    assert not any('_peak_memory_bytes' in line and 'traced' not in line
+                   for line in lines)